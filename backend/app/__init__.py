@@ -1,34 +1,198 @@
-"""Flask application factory"""
+"""Flask application factory
+
+Services are imported inside create_app, so database-only apps (migrations,
+tests) never load them and startup can time their import.
+"""
+import time
 from flask import Flask
-from flask_cors import CORS
-from app.models import db
+from app.models import db, SCHEMA_VERSION
+from app.database import apply_sqlite_pragmas, missing_indexes, schema_version, stamp_schema
 from app.config import config
-from app.blocker import WebsiteBlocker
-from app.timer import FocusTimer
 
-def create_app(config_name='development'):
-    """Create and configure Flask app"""
+class StartupTimer:
+    """Milliseconds spent in each phase of create_app"""
+    
+    def __init__(self, started=None):
+        self.started = started or time.perf_counter()
+        self.phases = {}
+        self._last = self.started
+    
+    def mark(self, phase):
+        """Close the current phase under this name"""
+        now = time.perf_counter()
+        self.phases[phase] = round((now - self._last) * 1000, 1)
+        self._last = now
+    
+    @property
+    def total(self):
+        """Milliseconds across all phases so far"""
+        return round(sum(self.phases.values()), 1)
+    
+    def summary(self):
+        """Phases as 'name ms' pairs, in order"""
+        return ', '.join(f"{phase} {ms}" for phase, ms in self.phases.items())
+
+def create_blocking_backend(settings):
+    """Build the configured blocking backend (None means the hosts file)"""
+    if settings['BLOCKING_BACKEND'] == 'dns':
+        from app.blocker import REDIRECT_IP
+        from app.sinkhole import DnsSinkhole, DnsSinkholeBackend
+        sinkhole = DnsSinkhole(
+            settings['DNS_SINKHOLE_HOST'],
+            settings['DNS_SINKHOLE_PORT'],
+            (settings['DNS_UPSTREAM_HOST'], settings['DNS_UPSTREAM_PORT']),
+            REDIRECT_IP
+        )
+        # Not bound until blocking is first enabled
+        return DnsSinkholeBackend(sinkhole)
+    if settings['BLOCKING_BACKEND'] != 'hosts':
+        raise ValueError(f"Unknown blocking backend: {settings['BLOCKING_BACKEND']}")
+    return None
+
+def start_landing_server(app, blocker, ingestor):
+    """Serve the block page on the redirect address, if enabled"""
+    if not app.config['LANDING_SERVER']:
+        return None
+    from app.blocker import REDIRECT_IP
+    from app.landing import LandingServer
+    landing = LandingServer(REDIRECT_IP, app.config['LANDING_PORT'])
+    
+    def on_attempt(host):
+        # localhost and local dev sites on port 80 land here too
+        if blocker.is_blocked(host):
+            ingestor.submit(host)
+    
+    landing.on_attempt = on_attempt
+    try:
+        landing.start()
+    except OSError as e:
+        # Blocking still works without it; browsers just get connection errors
+        app.logger.warning("Block page server not started: %s", e)
+        return None
+    return landing
+
+def recover_sessions(app, registry, save, reconcile):
+    """Resume or persist sessions that were running at the last shutdown"""
+    with app.app_context():
+        expired = registry.recover()
+        for result in expired:
+            save(result)
+        try:
+            # Leftover hosts entries from a crash are cleared here too
+            reconcile()
+        except Exception as e:
+            app.logger.warning("Blocking not reconciled at startup: %s", e)
+    if expired:
+        app.logger.info("Finalized %d sessions that ended while stopped", len(expired))
+
+def ensure_schema(app, lock):
+    """Create missing tables and indexes unless the database already has this schema version"""
+    from app.rollups import backfill_daily_stats
+    with app.app_context():
+        # The index check is one read of sqlite_master; it also repairs files
+        # stamped before indexes were created here
+        if schema_version(db.engine) == SCHEMA_VERSION and not missing_indexes(db.engine, db.metadata):
+            return False
+        # Once, when several workers start together
+        with lock:
+            if schema_version(db.engine) == SCHEMA_VERSION and not missing_indexes(db.engine, db.metadata):
+                return False
+            db.create_all()
+            # create_all skips tables that already exist, indexes and all, so
+            # older databases would never get the ones later migrations added
+            for index in missing_indexes(db.engine, db.metadata):
+                index.create(db.engine)
+            backfill_daily_stats()
+            stamp_schema(db.engine, SCHEMA_VERSION)
+            print("✅ Database initialized")
+    return True
+
+def create_database_app(config_name='development', database_uri=None):
+    """Flask app with only the database configured, for migrations and tests
+    
+    Starts no services and leaves the hosts file and the schema alone.
+    """
+    from app.archive import Archive, archive_root
     app = Flask(__name__)
     app.config.from_object(config[config_name])
+    if database_uri:
+        app.config['SQLALCHEMY_DATABASE_URI'] = database_uri
+    db.init_app(app)
+    with app.app_context():
+        apply_sqlite_pragmas(db.engine, app.config['SQLITE_PRAGMAS'])
+        app.extensions['archive'] = Archive(archive_root(app.config, db.engine))
+    return app
+
+def create_app(config_name='development'):
+    """Create and configure Flask app"""
+    timer = StartupTimer()
+    # Only the first app in a process pays for importing the services
+    from flask_cors import CORS
+    from app.blocker import WebsiteBlocker
+    from app.registry import SessionRegistry
+    from app.session_store import ProcessLock, SessionStore
+    from app.scheduler import TimerScheduler
+    from app.cache import AnalyticsCache
+    from app.ingest import AttemptIngestor
+    from app.metrics import RequestMetrics
+    timer.mark('imports')
+    
+    # Initialize database
+    app = create_database_app(config_name)
     
     # Enable CORS
     CORS(app)
     
-    # Initialize database
-    db.init_app(app)
+    with app.app_context():
+        store = SessionStore(db.engine, app.config['STATE_POLL_SECONDS'])
+        metrics = RequestMetrics(app.config['SERVER_TIMING'])
+        metrics.instrument(db.engine)
+    timer.mark('database')
     
     # Initialize services
-    blocker = WebsiteBlocker()
-    timer = FocusTimer(blocker)
+    blocker = WebsiteBlocker(app.config['HOSTS_FILE'], create_blocking_backend(app.config))
+    scheduler = TimerScheduler()
+    registry = SessionRegistry(blocker, scheduler, app.config['MAX_IDLE_TIMERS'], store)
+    process_lock = ProcessLock(app.config['LOCK_FILE'])
+    cache = AnalyticsCache(app.config['ANALYTICS_CACHE_SIZE'], app.config['ANALYTICS_CACHE_TTL'])
+    ingestor = AttemptIngestor(
+        app,
+        app.config['ATTEMPT_QUEUE_SIZE'],
+        app.config['ATTEMPT_BATCH_SIZE'],
+        app.config['ATTEMPT_FLUSH_SECONDS']
+    )
+    ingestor.on_flush = cache.invalidate
+    # Lookups the blocking backend catches are recorded as attempts
+    blocker.backend.on_attempt = ingestor.submit
+    if hasattr(blocker.backend, 'on_write'):
+        blocker.backend.on_write = metrics.observe_hosts_write
+    start_landing_server(app, blocker, ingestor)
+    timer.mark('services')
     
     # Register blueprints
-    from app.routes import api, init_routes
-    init_routes(timer, blocker)
+    from app.routes import api, init_routes, finalize_session, save_session, reconcile_blocking
+    init_routes(registry, blocker, cache, ingestor, process_lock, metrics, app.config['SSE_MAX_STREAMS'])
     app.register_blueprint(api, url_prefix='/api')
     
-    # Create tables
-    with app.app_context():
-        db.create_all()
-        print("✅ Database initialized")
+    # Persist sessions that run to completion on the scheduler thread
+    def on_session_complete(result):
+        with app.app_context():
+            finalize_session(result)
+    
+    registry.on_complete = on_session_complete
+    
+    # Maintenance commands (flask --app run <command>)
+    from app.cli import register_commands
+    register_commands(app)
+    timer.mark('routes')
+    
+    ensure_schema(app, process_lock)
+    timer.mark('schema')
+    
+    recover_sessions(app, registry, save_session, reconcile_blocking)
+    timer.mark('recovery')
+    
+    app.extensions['startup_timings'] = timer.phases
+    print(f"⏱️  Started in {timer.total} ms ({timer.summary()})")
     
     return app
@@ -0,0 +1,330 @@
+"""Time-zone-aware analytics over columnar copies of the raw tables
+
+Sessions and attempts are held per process as NumPy arrays, topped up with
+the rows written since the last request, so a query only pays for
+vectorized bucketing. Session times are stored as naive server-local time
+and attempt times as naive UTC; both become Unix seconds here, then wall
+clock seconds in the requested zone, where day and hour buckets are plain
+integer division. Sessions are cut at bucket boundaries, so minutes land on
+the day (or hour) they were actually spent.
+
+Imported lazily by AnalyticsService, so NumPy stays off the startup path.
+"""
+import itertools
+import threading
+from collections import namedtuple
+from datetime import date, datetime, timedelta, timezone
+from functools import lru_cache
+from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
+import numpy as np
+from flask import current_app
+from sqlalchemy import func, select
+from app.models import db, FocusSession, BlockAttempt
+from app.archive import current_archive
+
+DAY = 86400
+HOUR = 3600
+EPOCH = date(1970, 1, 1)
+UNIX_JULIAN_DAY = 2440587.5
+WEEKDAYS = ['Mon', 'Tue', 'Wed', 'Thu', 'Fri', 'Sat', 'Sun']
+
+# Same fields as the DailyStat rows AnalyticsService summarizes
+DayRow = namedtuple('DayRow', ['date', 'sessions', 'completed_sessions', 'minutes', 'block_attempts'])
+
+_caches_lock = threading.Lock()
+
+def unix_seconds(column, *modifiers):
+    """SQL for a SQLite datetime column as Unix seconds"""
+    return (func.julianday(column, *modifiers) - UNIX_JULIAN_DAY) * DAY
+
+def resolve_zone(name):
+    """ZoneInfo for an IANA zone name (None is the server's zone)"""
+    if name is None:
+        return None
+    try:
+        return ZoneInfo(name)
+    except (ZoneInfoNotFoundError, ValueError):
+        raise ValueError(f'Unknown time zone: {name}')
+
+class ColumnCache:
+    """Append-only columnar copy of a table, topped up by id
+    
+    Rows are only ever inserted, or deleted oldest first, so each load
+    fetches the rows past the last id seen; when the lowest id moves the
+    copy is rebuilt. Both ids come straight off the primary key index,
+    where a count(*) would scan the table. Archived rows are loaded with
+    from_archive and kept in front of the database rows, and a change in
+    the archive files also rebuilds the copy.
+    """
+    
+    def __init__(self, table, columns, archive, from_archive):
+        self.table = table
+        # name -> (SQL expression, dtype)
+        self.columns = columns
+        self.archive = archive
+        self.from_archive = from_archive
+        self.state = None
+        self.arrays = None
+        self._lock = threading.Lock()
+    
+    def _fetch(self, after, through):
+        """Columns of the rows with after < id <= through, in id order"""
+        table = self.table
+        result = db.session.execute(
+            select(*(expression for expression, _ in self.columns.values()))
+            .where(table.c.id > after, table.c.id <= through)
+            .order_by(table.c.id)
+        )
+        # Straight off the DBAPI cursor: a Row per record costs more than the query
+        block = np.fromiter(
+            itertools.chain.from_iterable(result.cursor), dtype=np.float64
+        ).reshape(-1, len(self.columns))
+        result.close()
+        return {
+            name: block[:, i].astype(dtype)
+            for i, (name, (_, dtype)) in enumerate(self.columns.items())
+        }
+    
+    def load(self):
+        """Current arrays, after fetching any rows written since the last call"""
+        table = self.table
+        with self._lock:
+            # Separate subqueries: SQLite only reads min/max off the index alone
+            ids = tuple(db.session.execute(select(
+                select(func.min(table.c.id)).scalar_subquery(),
+                select(func.max(table.c.id)).scalar_subquery()
+            )).one())
+            state = (ids, self.archive.version(table.name))
+            if state == self.state:
+                return self.arrays
+            
+            if (self.state is not None and state[1] == self.state[1]
+                    and ids[0] == self.state[0][0] and ids[1] > self.state[0][1]):
+                parts = (self.arrays, self._fetch(self.state[0][1], ids[1]))
+            else:
+                parts = (self.from_archive(self.archive), self._fetch(0, ids[1] or 0))
+            self.arrays = {name: np.concatenate([part[name] for part in parts]) for name in self.columns}
+            self.state = state
+            return self.arrays
+
+def _iso_seconds(values):
+    """ISO timestamps as seconds since 1970-01-01 on the same clock"""
+    return np.array(values, dtype='datetime64[us]').astype(np.int64) / 1e6
+
+def _archived_sessions(archive):
+    """Column arrays for the archived sessions"""
+    started, minutes, completed = [], [], []
+    for month in archive.months('focus_sessions'):
+        columns = archive.read('focus_sessions', month)
+        started += columns['started_at']
+        minutes += columns['completed_minutes']
+        completed += columns['completed']
+    # Naive server-local time: subtract the offset in force at the time,
+    # looked up again from the first guess in case it crossed a DST change
+    wall = _iso_seconds(started)
+    start = wall - _offsets(wall - _offsets(wall, None), None)
+    return {
+        'start': start,
+        'minutes': np.array(minutes, dtype=np.float64),
+        'completed': np.array(completed, dtype=np.bool_)
+    }
+
+def _archived_attempts(archive):
+    """Column arrays for the archived block attempts (stored as naive UTC)"""
+    times = []
+    for month in archive.months('block_attempts'):
+        times += archive.read('block_attempts', month)['timestamp']
+    return {'time': _iso_seconds(times)}
+
+def _column_cache(name):
+    """This app's cache for the sessions or attempts table"""
+    with _caches_lock:
+        caches = current_app.extensions.setdefault('column_caches', {})
+        if name not in caches:
+            archive = current_archive()
+            if name == 'sessions':
+                table = FocusSession.__table__
+                caches[name] = ColumnCache(table, {
+                    # Stored as server-local time; 'utc' converts it first
+                    'start': (unix_seconds(table.c.started_at, 'utc'), np.float64),
+                    'minutes': (table.c.completed_minutes, np.float64),
+                    'completed': (func.coalesce(table.c.completed, False), np.bool_)
+                }, archive, _archived_sessions)
+            else:
+                table = BlockAttempt.__table__
+                caches[name] = ColumnCache(table, {
+                    'time': (unix_seconds(table.c.timestamp), np.float64)
+                }, archive, _archived_attempts)
+        return caches[name]
+
+def _offset(seconds, zone):
+    """UTC offset of zone at a Unix time, in seconds"""
+    moment = datetime.fromtimestamp(seconds, timezone.utc).astimezone(zone)
+    return moment.utcoffset().total_seconds()
+
+@lru_cache(maxsize=64)
+def utc_offsets(zone, first_day, last_day):
+    """(transitions, offsets) arrays for zone over a range of days
+    
+    offsets[i] applies from Unix time transitions[i]. The zone is sampled
+    once a day and each change is bisected to the second.
+    """
+    moment = first_day * DAY
+    transitions, offsets = [moment], [_offset(moment, zone)]
+    while moment < last_day * DAY:
+        following = moment + DAY
+        offset = _offset(following, zone)
+        if offset != offsets[-1]:
+            before, after = moment, following
+            while after - before > 1:
+                middle = (before + after) // 2
+                if _offset(middle, zone) == offsets[-1]:
+                    before = middle
+                else:
+                    after = middle
+            transitions.append(after)
+            offsets.append(offset)
+        moment = following
+    return np.array(transitions, dtype=np.float64), np.array(offsets, dtype=np.float64)
+
+def _offsets(seconds, zone):
+    """UTC offset of zone at each Unix time"""
+    if not len(seconds):
+        return seconds
+    # A day either side covers any zone's offset from UTC
+    first_day = int(np.nanmin(seconds) // DAY) - 1
+    last_day = int(np.nanmax(seconds) // DAY) + 1
+    transitions, offsets = utc_offsets(zone, first_day, last_day)
+    index = np.searchsorted(transitions, seconds, side='right') - 1
+    return offsets[np.maximum(index, 0)]
+
+def wall_seconds(seconds, zone):
+    """Unix times as wall clock seconds in zone (floor(x / DAY) is the local day)"""
+    return seconds + _offsets(seconds, zone)
+
+def split(start, end, size):
+    """Cut [start, end) intervals at multiples of size
+    
+    Returns (owner, bucket, seconds) per piece: the interval it came from,
+    floor(time / size) of the piece, and how long it is.
+    """
+    first = np.floor(start / size).astype(np.int64)
+    last = np.maximum(np.ceil(end / size).astype(np.int64) - 1, first)
+    pieces = last - first + 1
+    owner = np.repeat(np.arange(len(start)), pieces)
+    step = np.arange(len(owner)) - np.repeat(np.cumsum(pieces) - pieces, pieces)
+    bucket = first[owner] + step
+    seconds = np.minimum(end[owner], (bucket + 1) * size) - np.maximum(start[owner], bucket * size)
+    return owner, bucket, seconds
+
+def _today(zone):
+    """Today's day number (days since 1970-01-01) in zone"""
+    return (datetime.now(timezone.utc).astimezone(zone).date() - EPOCH).days
+
+def _window(days, zone):
+    """(first_day, last_day, sessions, attempts) for the last N days in zone
+    
+    sessions holds wall clock start/end seconds and completed flags for the
+    sessions that overlap the window; attempts holds wall clock times.
+    """
+    last_day = _today(zone)
+    first_day = last_day - days
+    # Unix bounds padded a day for the zone offset, and another for
+    # sessions running into the window from the day before
+    low, high = (first_day - 2) * DAY, (last_day + 2) * DAY
+    
+    columns = _column_cache('sessions').load()
+    near = (columns['start'] >= low) & (columns['start'] < high)
+    start = wall_seconds(columns['start'][near], zone)
+    sessions = {
+        'start': start,
+        'end': start + columns['minutes'][near] * 60,
+        'completed': columns['completed'][near]
+    }
+    
+    times = _column_cache('attempts').load()['time']
+    attempts = wall_seconds(times[(times >= low) & (times < high)], zone)
+    return first_day, last_day, sessions, attempts
+
+def _in_window(day, first_day, last_day):
+    """Mask of day numbers inside the window"""
+    return (day >= first_day) & (day <= last_day)
+
+def daily_rows(days, tz):
+    """One DayRow per local day of the last N days in zone tz"""
+    zone = resolve_zone(tz)
+    first_day, last_day, sessions, attempts = _window(days, zone)
+    count = last_day - first_day + 1
+    
+    # Sessions and completions count on the day they started
+    start_day = (sessions['start'] // DAY).astype(np.int64)
+    started = _in_window(start_day, first_day, last_day)
+    index = start_day[started] - first_day
+    per_day = np.bincount(index, minlength=count)
+    completed = np.bincount(index, weights=sessions['completed'][started], minlength=count)
+    
+    # Minutes count on the day they were spent
+    _, day, seconds = split(sessions['start'], sessions['end'], DAY)
+    spent = _in_window(day, first_day, last_day)
+    minutes = np.bincount(day[spent] - first_day, weights=seconds[spent], minlength=count) / 60
+    
+    attempt_day = (attempts // DAY).astype(np.int64)
+    attempt_day = attempt_day[_in_window(attempt_day, first_day, last_day)]
+    blocked = np.bincount(attempt_day - first_day, minlength=count)
+    
+    return [
+        DayRow(EPOCH + timedelta(days=first_day + i), int(per_day[i]), int(completed[i]),
+               float(minutes[i]), int(blocked[i]))
+        for i in range(count)
+    ]
+
+def streaks(tz):
+    """Current and best runs of local days in zone tz with a completed session"""
+    zone = resolve_zone(tz)
+    columns = _column_cache('sessions').load()
+    finished = columns['start'][columns['completed']]
+    if not len(finished):
+        return {'current': 0, 'best': 0, 'total': 0}
+    
+    days = np.unique((wall_seconds(finished, zone) // DAY).astype(np.int64))
+    # Runs of consecutive days end wherever the gap is more than one
+    ends = np.append(np.flatnonzero(np.diff(days) != 1), len(days) - 1)
+    lengths = np.diff(np.append(-1, ends))
+    # The last run only counts as current if it reaches today
+    current = int(lengths[-1]) if days[-1] == _today(zone) else 0
+    
+    return {
+        'current': current,
+        'best': int(lengths.max()),
+        'total': len(finished)
+    }
+
+def heatmap(days, tz):
+    """Weekday x hour grids of focus minutes, sessions started and block attempts"""
+    zone = resolve_zone(tz)
+    first_day, last_day, sessions, attempts = _window(days, zone)
+    
+    def cells(hours):
+        """Weekday * 24 + hour for wall clock hour numbers"""
+        return (hours // 24 + 3) % 7 * 24 + hours % 24
+    
+    _, hour, seconds = split(sessions['start'], sessions['end'], HOUR)
+    spent = _in_window(hour // 24, first_day, last_day)
+    minutes = np.bincount(cells(hour[spent]), weights=seconds[spent], minlength=168) / 60
+    
+    start_hour = (sessions['start'] // HOUR).astype(np.int64)
+    start_hour = start_hour[_in_window(start_hour // 24, first_day, last_day)]
+    started = np.bincount(cells(start_hour), minlength=168)
+    
+    attempt_hour = (attempts // HOUR).astype(np.int64)
+    attempt_hour = attempt_hour[_in_window(attempt_hour // 24, first_day, last_day)]
+    blocked = np.bincount(cells(attempt_hour), minlength=168)
+    
+    return {
+        'tz': tz,
+        'period_days': days,
+        'weekdays': WEEKDAYS,
+        'minutes': np.round(minutes, 2).reshape(7, 24).tolist(),
+        'sessions': started.reshape(7, 24).tolist(),
+        'block_attempts': blocked.reshape(7, 24).tolist()
+    }
@@ -1,29 +1,90 @@
 """Analytics service for focus statistics"""
+import base64
+import csv
+import io
+import json
+import math
+import statistics
 from datetime import datetime, timedelta
-from sqlalchemy import func
-from app.models import db, FocusSession, BlockAttempt
+from itertools import accumulate
+from flask import current_app
+from sqlalchemy import func, select, tuple_
+from app.models import db, FocusSession, BlockAttempt, DailyStat, HourlyStat, StreakState
+from app.rollups import STREAK_ROW_ID
+from app.archive import current_archive
+
+EXPORT_COLUMNS = [
+    'id', 'session_id', 'mode', 'duration_minutes', 'completed_minutes',
+    'completed', 'started_at', 'ended_at', 'date'
+]
+
+# Start hours with fewer sessions than this are not ranked in best_hours
+MIN_HOUR_SESSIONS = 5
+
+def pearson(xs, ys):
+    """Pearson correlation of two equal-length sequences
+    
+    None for fewer than two points or when either side never varies.
+    statistics.correlation would do, but it needs Python 3.10.
+    """
+    n = len(xs)
+    if n < 2:
+        return None
+    mean_x = math.fsum(xs) / n
+    mean_y = math.fsum(ys) / n
+    dx = [x - mean_x for x in xs]
+    dy = [y - mean_y for y in ys]
+    spread = math.sqrt(math.fsum(d * d for d in dx) * math.fsum(d * d for d in dy))
+    if not spread:
+        return None
+    return math.fsum(a * b for a, b in zip(dx, dy)) / spread
+
+def encode_cursor(session):
+    """Opaque keyset cursor for a serialized session"""
+    raw = f"{session['started_at']}|{session['id']}"
+    return base64.urlsafe_b64encode(raw.encode()).decode()
+
+def decode_cursor(cursor):
+    """Parse a cursor back into (started_at, id)"""
+    try:
+        started_at, session_id = base64.urlsafe_b64decode(cursor.encode()).decode().split('|')
+        return datetime.fromisoformat(started_at), int(session_id)
+    except (ValueError, UnicodeDecodeError):
+        raise ValueError('Invalid cursor')
 
 class AnalyticsService:
     """Provides analytics and statistics"""
     
     @staticmethod
-    def get_overview(days=7):
-        """Get overview statistics"""
-        start_date = (datetime.now() - timedelta(days=days)).date().isoformat()
+    def _window(days, tz=None):
+        """Fetch the daily rows covering the last N days
         
-        sessions = FocusSession.query.filter(FocusSession.date >= start_date).all()
+        Served from the server-local rollup, or by the aggregation engine
+        when a time zone is given.
+        """
+        if tz is not None:
+            from app.aggregation import daily_rows
+            return daily_rows(days, tz)
         
-        total_sessions = len(sessions)
-        completed_sessions = sum(1 for s in sessions if s.completed)
-        total_minutes = sum(s.completed_minutes for s in sessions)
+        start_date = (datetime.now() - timedelta(days=days)).date()
+        return db.session.query(
+            DailyStat.date,
+            DailyStat.sessions,
+            DailyStat.completed_sessions,
+            DailyStat.minutes,
+            DailyStat.block_attempts
+        ).filter(DailyStat.date >= start_date).order_by(DailyStat.date).all()
+    
+    @staticmethod
+    def _summarize(rows, days):
+        """Overview totals from daily rollup rows"""
+        total_sessions = sum(row.sessions for row in rows)
+        completed_sessions = sum(row.completed_sessions for row in rows)
+        total_minutes = sum(row.minutes for row in rows)
+        block_attempts = sum(row.block_attempts for row in rows)
         avg_session = total_minutes / total_sessions if total_sessions > 0 else 0
         completion_rate = (completed_sessions / total_sessions * 100) if total_sessions > 0 else 0
         
-        # Block attempts
-        block_attempts = BlockAttempt.query.filter(
-            BlockAttempt.timestamp >= datetime.now() - timedelta(days=days)
-        ).count()
-        
         return {
             'total_sessions': total_sessions,
             'completed_sessions': completed_sessions,
@@ -35,79 +96,262 @@ class AnalyticsService:
         }
     
     @staticmethod
-    def get_daily_stats(days=30):
+    def _daily(rows):
+        """Daily breakdown from daily rollup rows"""
+        return [{
+            'date': row.date.isoformat(),
+            'sessions': row.sessions,
+            'minutes': round(row.minutes or 0, 2)
+        } for row in rows if row.sessions > 0 or row.minutes > 0]
+    
+    @staticmethod
+    def get_overview(days=7, tz=None):
+        """Get overview statistics"""
+        return AnalyticsService._summarize(AnalyticsService._window(days, tz), days)
+    
+    @staticmethod
+    def get_daily_stats(days=30, tz=None):
         """Get daily breakdown"""
-        start_date = (datetime.now() - timedelta(days=days)).date()
+        return AnalyticsService._daily(AnalyticsService._window(days, tz))
+    
+    @staticmethod
+    def get_streaks(tz=None):
+        """Get current and best streaks from the running streak row, or from
+        the raw sessions when a time zone is given
+        """
+        if tz is not None:
+            from app.aggregation import streaks
+            return streaks(tz)
         
-        daily_data = db.session.query(
-            FocusSession.date,
-            func.count(FocusSession.id).label('sessions'),
-            func.sum(FocusSession.completed_minutes).label('minutes')
-        ).filter(
-            FocusSession.date >= start_date.isoformat()
-        ).group_by(FocusSession.date).all()
+        state = db.session.get(StreakState, STREAK_ROW_ID)
+        if state is None or not state.total:
+            return {'current': 0, 'best': 0, 'total': 0}
         
-        result = []
-        for date, sessions, minutes in daily_data:
-            result.append({
-                'date': date,
-                'sessions': sessions,
-                'minutes': round(minutes or 0, 2)
-            })
+        # The stored run only counts as current if it reaches today
+        today = datetime.now().date()
+        current_streak = state.current if state.last_date == today else 0
         
-        return result
+        return {
+            'current': current_streak,
+            'best': max(state.best, current_streak),
+            'total': state.total
+        }
     
     @staticmethod
-    def get_streaks():
-        """Calculate current and best streaks"""
-        sessions = FocusSession.query.filter(
-            FocusSession.completed == True
-        ).order_by(FocusSession.date.desc()).all()
+    def get_session_history(limit=50, cursor=None):
+        """Get session history, newest first, continuing after cursor"""
+        query = FocusSession.query
+        if cursor:
+            started_at, session_id = decode_cursor(cursor)
+            query = query.filter(
+                tuple_(FocusSession.started_at, FocusSession.id) < (started_at, session_id)
+            )
         
-        if not sessions:
-            return {'current': 0, 'best': 0, 'total': 0}
+        sessions = query.order_by(
+            FocusSession.started_at.desc(),
+            FocusSession.id.desc()
+        ).limit(limit).all()
         
-        dates = list(set(s.date for s in sessions))
-        dates.sort(reverse=True)
+        history = [s.to_dict() for s in sessions]
+        # Archived sessions are all older, so a short page continues there
+        if len(history) < limit:
+            history.extend(AnalyticsService._archived_history(limit - len(history), cursor))
+        return history
+    
+    @staticmethod
+    def _archived_history(limit, cursor=None):
+        """Archived sessions, newest first, continuing after cursor"""
+        through = None
+        if cursor:
+            started_at, session_id = decode_cursor(cursor)
+            through = started_at.strftime('%Y-%m')
         
-        # Current streak
-        current_streak = 0
-        today = datetime.now().date()
-        check_date = today
-        
-        for date_str in dates:
-            date = datetime.fromisoformat(date_str).date()
-            if date == check_date:
-                current_streak += 1
-                check_date -= timedelta(days=1)
-            else:
+        page = []
+        for record in current_archive().rows('focus_sessions', newest_first=True, through=through):
+            if cursor and (datetime.fromisoformat(record['started_at']), record['id']) >= (started_at, session_id):
+                continue
+            record['completed_minutes'] = round(record['completed_minutes'], 2)
+            page.append(record)
+            if len(page) == limit:
                 break
+        return page
+    
+    @staticmethod
+    def _export_rows(batch_size=1000):
+        """Yield every session as a plain dict, newest first: the database
+        from a streaming cursor, then the archive
+        """
+        table = FocusSession.__table__
+        stmt = select(*(table.c[name] for name in EXPORT_COLUMNS)).order_by(
+            table.c.started_at.desc(),
+            table.c.id.desc()
+        )
+        result = db.session.execute(stmt, execution_options={'yield_per': batch_size})
+        for row in result:
+            record = row._asdict()
+            for key in ('started_at', 'ended_at', 'date'):
+                if record[key] is not None:
+                    record[key] = record[key].isoformat()
+            yield record
         
-        # Best streak
-        best_streak = 1
-        temp_streak = 1
+        # Then the archive, which holds only older sessions
+        yield from current_archive().rows('focus_sessions', newest_first=True)
+    
+    @staticmethod
+    def export_ndjson():
+        """Stream session history as newline-delimited JSON"""
+        for record in AnalyticsService._export_rows():
+            yield json.dumps(record) + '\n'
+    
+    @staticmethod
+    def export_csv(chunk_rows=500):
+        """Stream session history as CSV in small chunks"""
+        buffer = io.StringIO()
+        writer = csv.DictWriter(buffer, fieldnames=EXPORT_COLUMNS)
+        writer.writeheader()
         
-        for i in range(len(dates) - 1):
-            current = datetime.fromisoformat(dates[i]).date()
-            next_date = datetime.fromisoformat(dates[i + 1]).date()
-            
-            if (current - next_date).days == 1:
-                temp_streak += 1
-                best_streak = max(best_streak, temp_streak)
-            else:
-                temp_streak = 1
+        for count, record in enumerate(AnalyticsService._export_rows(), 1):
+            writer.writerow(record)
+            if count % chunk_rows == 0:
+                yield buffer.getvalue()
+                buffer.seek(0)
+                buffer.truncate()
         
+        yield buffer.getvalue()
+    
+    @staticmethod
+    def get_heatmap(days=30, tz=None):
+        """Get weekday x hour grids of focus minutes, sessions and block attempts"""
+        from app.aggregation import heatmap
+        return heatmap(days, tz)
+    
+    @staticmethod
+    def _completion(sessions, completed, minutes):
+        """Completion stats for a group of sessions"""
         return {
-            'current': current_streak,
-            'best': max(best_streak, current_streak),
-            'total': len(sessions)
+            'sessions': sessions,
+            'completed_sessions': completed,
+            'completion_rate': round(completed / sessions * 100, 2) if sessions else 0,
+            'avg_minutes': round(minutes / sessions, 2) if sessions else 0
         }
     
     @staticmethod
-    def get_session_history(limit=50):
-        """Get recent session history"""
-        sessions = FocusSession.query.order_by(
-            FocusSession.started_at.desc()
-        ).limit(limit).all()
+    def data_version():
+        """Newest session and block attempt ids and today's date
+        
+        Every write analytics depend on adds one of those rows, so this keys
+        cached results the same way in every worker process.
+        """
+        # Separate scalar subqueries so each max(id) is a single index seek
+        newest_session = select(func.max(FocusSession.id)).scalar_subquery()
+        newest_attempt = select(func.max(BlockAttempt.id)).scalar_subquery()
+        sessions, attempts = db.session.execute(select(newest_session, newest_attempt)).one()
+        return sessions, attempts, datetime.now().date()
+    
+    @staticmethod
+    def get_insights(days=90):
+        """Get rolling averages, completion rates by mode and start hour, and
+        how block attempts relate to abandoned sessions
+        
+        Everything is read from the daily and hourly rollups, so the cost
+        depends on the window, not the size of the history.
+        """
+        today = datetime.now().date()
+        start_date = today - timedelta(days=days)
+        # 29 extra days so the first day in the window has a full 30-day average
+        first = start_date - timedelta(days=29)
+        daily = {row.date: row for row in db.session.query(
+            DailyStat.date,
+            DailyStat.sessions,
+            DailyStat.completed_sessions,
+            DailyStat.minutes,
+            DailyStat.block_attempts
+        ).filter(DailyStat.date >= first, DailyStat.date <= today)}
         
-        return [s.to_dict() for s in sessions]
+        dates = [first + timedelta(days=i) for i in range((today - first).days + 1)]
+        rows = [daily.get(day) for day in dates]
+        totals = {
+            field: [0, *accumulate(getattr(row, field) if row else 0 for row in rows)]
+            for field in ('sessions', 'completed_sessions', 'minutes')
+        }
+        
+        def trailing(field, end, length):
+            return totals[field][end + 1] - totals[field][end + 1 - length]
+        
+        rolling = [{
+            'date': dates[i].isoformat(),
+            'minutes': round(trailing('minutes', i, 1), 2),
+            'avg_7d': round(trailing('minutes', i, 7) / 7, 2),
+            'avg_30d': round(trailing('minutes', i, 30) / 30, 2)
+        } for i in range(29, len(dates))]
+        
+        last = len(dates) - 1
+        averages = {}
+        for length in (7, 30):
+            sessions = trailing('sessions', last, length)
+            averages[f'minutes_{length}d'] = round(trailing('minutes', last, length) / length, 2)
+            averages[f'sessions_{length}d'] = round(sessions / length, 2)
+            averages[f'completion_rate_{length}d'] = round(
+                trailing('completed_sessions', last, length) / sessions * 100, 2
+            ) if sessions else 0
+        
+        def grouped(column):
+            return db.session.query(
+                column,
+                func.sum(HourlyStat.sessions),
+                func.sum(HourlyStat.completed_sessions),
+                func.sum(HourlyStat.minutes)
+            ).filter(HourlyStat.date >= start_date, HourlyStat.date <= today).group_by(column).all()
+        
+        # Every timer preset is listed, plus any other mode that was used
+        modes = {mode: (0, 0, 0) for mode in current_app.config['TIMER_PRESETS']}
+        modes.update((mode, counts) for mode, *counts in grouped(HourlyStat.mode))
+        by_mode = [{'mode': mode, **AnalyticsService._completion(*counts)} for mode, counts in modes.items()]
+        
+        hours = {hour: counts for hour, *counts in grouped(HourlyStat.hour)}
+        by_hour = [
+            {'hour': hour, **AnalyticsService._completion(*hours.get(hour, (0, 0, 0)))}
+            for hour in range(24)
+        ]
+        ranked = sorted(
+            (entry for entry in by_hour if entry['sessions'] >= MIN_HOUR_SESSIONS),
+            key=lambda entry: (entry['completion_rate'], entry['sessions']),
+            reverse=True
+        )
+        
+        # Attempts against abandoned sessions, over the days with any focus work
+        focus_days = [row for row in rows[29:] if row and row.sessions > 0]
+        attempts = [row.block_attempts for row in focus_days]
+        abandoned = [row.sessions - row.completed_sessions for row in focus_days]
+        correlation = pearson(attempts, abandoned)
+        if correlation is not None:
+            correlation = round(correlation, 3)
+        abandon_days = [count for count, lost in zip(attempts, abandoned) if lost]
+        clean_days = [count for count, lost in zip(attempts, abandoned) if not lost]
+        
+        return {
+            'period_days': days,
+            'rolling_averages': averages,
+            'rolling': rolling,
+            'by_mode': by_mode,
+            'by_hour': by_hour,
+            'best_hours': [entry['hour'] for entry in ranked[:3]],
+            'attempts_vs_abandoned': {
+                'days': len(focus_days),
+                'correlation': correlation,
+                'avg_attempts_abandon_days': round(statistics.fmean(abandon_days), 2) if abandon_days else 0,
+                'avg_attempts_clean_days': round(statistics.fmean(clean_days), 2) if clean_days else 0
+            }
+        }
+    
+    @staticmethod
+    def get_dashboard(days=7, history_limit=10, tz=None):
+        """Get every dashboard panel from one pass over the daily window"""
+        rows = AnalyticsService._window(days, tz)
+        
+        return {
+            'overview': AnalyticsService._summarize(rows, days),
+            'daily': AnalyticsService._daily(rows),
+            'streaks': AnalyticsService.get_streaks(tz),
+            'history': AnalyticsService.get_session_history(history_limit)
+        }
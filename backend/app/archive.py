@@ -0,0 +1,176 @@
+"""Compressed monthly archive for old focus sessions and block attempts
+
+Rows past the archive horizon move out of SQLite into one gzipped, columnar
+JSON file per table and month, next to the database:
+
+    archive/focus_sessions/2025-03.json.gz    {"columns": {"id": [...], ...}}
+
+Rows in a file are in (time, id) order, with dates and datetimes as ISO
+strings. The daily and hourly rollups stay in the database, so the
+rollup-backed analytics never look here; history, export, the aggregation
+engine and rollup rebuilds read both tiers.
+"""
+import gzip
+import json
+import os
+import tempfile
+import threading
+from collections import OrderedDict
+from datetime import date, datetime, timedelta
+from flask import current_app
+from sqlalchemy import func, select
+from app.models import db, FocusSession, BlockAttempt
+
+# Archived table -> (model, column the months are cut by)
+TABLES = {
+    'focus_sessions': (FocusSession, 'started_at'),
+    'block_attempts': (BlockAttempt, 'timestamp')
+}
+
+# Parsed months kept in memory, and ids per DELETE statement
+CACHED_MONTHS = 12
+DELETE_BATCH = 500
+
+def archive_root(config, engine):
+    """ARCHIVE_DIR, or an archive directory next to the SQLite file (None for in-memory databases)"""
+    if config['ARCHIVE_DIR']:
+        return config['ARCHIVE_DIR']
+    database = engine.url.database
+    if engine.url.get_backend_name() != 'sqlite' or not database or database == ':memory:':
+        return None
+    return os.path.join(os.path.dirname(os.path.abspath(database)), 'archive')
+
+def current_archive():
+    """The current app's Archive"""
+    return current_app.extensions['archive']
+
+def _encode(value):
+    return value.isoformat() if isinstance(value, date) else value
+
+class Archive:
+    """Reads and writes the monthly archive files under root"""
+    
+    def __init__(self, root):
+        self.root = root
+        self._months = OrderedDict()
+        self._lock = threading.Lock()
+    
+    def _path(self, table, month):
+        return os.path.join(self.root, table, f'{month}.json.gz')
+    
+    def months(self, table):
+        """Archived months (YYYY-MM) of a table, oldest first"""
+        if self.root is None:
+            return []
+        try:
+            names = os.listdir(os.path.join(self.root, table))
+        except FileNotFoundError:
+            return []
+        return sorted(name[:-len('.json.gz')] for name in names if name.endswith('.json.gz'))
+    
+    def version(self, table):
+        """Changes whenever any of the table's archive files does"""
+        return tuple((month, os.stat(self._path(table, month)).st_mtime_ns) for month in self.months(table))
+    
+    def read(self, table, month):
+        """{column: [values]} for one month, cached until the file changes"""
+        path = self._path(table, month)
+        modified = os.stat(path).st_mtime_ns
+        with self._lock:
+            cached = self._months.get(path)
+            if cached is not None and cached[0] == modified:
+                self._months.move_to_end(path)
+                return cached[1]
+        
+        with gzip.open(path, 'rt', encoding='utf-8') as f:
+            columns = json.load(f)['columns']
+        
+        with self._lock:
+            self._months[path] = (modified, columns)
+            self._months.move_to_end(path)
+            while len(self._months) > CACHED_MONTHS:
+                self._months.popitem(last=False)
+        return columns
+    
+    def rows(self, table, newest_first=False, through=None):
+        """Yield archived rows as dicts in time order, from months up to through"""
+        months = [month for month in self.months(table) if through is None or month <= through]
+        for month in (reversed(months) if newest_first else months):
+            columns = self.read(table, month)
+            names = list(columns)
+            records = zip(*columns.values())
+            for values in (reversed(list(records)) if newest_first else records):
+                yield dict(zip(names, values))
+    
+    def write(self, table, month, columns):
+        """Replace one month's file via temp file + fsync + rename"""
+        directory = os.path.join(self.root, table)
+        os.makedirs(directory, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(prefix=f'.{month}.', dir=directory)
+        try:
+            with os.fdopen(fd, 'wb') as raw:
+                with gzip.GzipFile(fileobj=raw, mode='wb', mtime=0) as f:
+                    f.write(json.dumps({'table': table, 'month': month, 'columns': columns}).encode())
+                raw.flush()
+                os.fsync(raw.fileno())
+            os.replace(tmp_path, self._path(table, month))
+        except BaseException:
+            os.unlink(tmp_path)
+            raise
+
+def archive_cutoff(horizon_days, today=None):
+    """Start of the month holding the day horizon_days ago; rows before it get archived"""
+    day = (today or date.today()) - timedelta(days=horizon_days)
+    return datetime(day.year, day.month, 1)
+
+def _next_month(start):
+    return datetime(start.year + start.month // 12, start.month % 12 + 1, 1)
+
+def archive_rows(archive, cutoff):
+    """Move rows older than cutoff into the archive, a table month at a time
+    
+    Each month's file (merged with anything already archived for it) is
+    written before its rows are deleted, so a crash in between leaves rows
+    in both tiers for the next run to merge, never rows in neither.
+    Returns {table: rows moved}.
+    """
+    if archive.root is None:
+        raise RuntimeError('No archive directory for this database; set FOCUSGUARD_ARCHIVE_DIR')
+    
+    moved = {}
+    for name, (model, time_name) in TABLES.items():
+        table = model.__table__
+        time_column = table.c[time_name]
+        moved[name] = 0
+        
+        while True:
+            oldest = db.session.execute(select(func.min(time_column)).where(time_column < cutoff)).scalar()
+            if oldest is None:
+                break
+            start = datetime(oldest.year, oldest.month, 1)
+            month = start.strftime('%Y-%m')
+            rows = db.session.execute(
+                select(table).where(time_column >= start, time_column < _next_month(start))
+            ).all()
+            
+            merged = {}
+            if month in archive.months(name):
+                existing = archive.read(name, month)
+                merged = {values[0]: values for values in zip(*existing.values())}
+            for row in rows:
+                merged[row.id] = tuple(_encode(value) for value in row)
+            
+            # (time, id) order; ISO strings sort chronologically
+            position = list(table.c.keys()).index(time_name)
+            ordered = sorted(merged.values(), key=lambda values: (values[position], values[0]))
+            archive.write(name, month, {
+                column: [values[i] for values in ordered] for i, column in enumerate(table.c.keys())
+            })
+            
+            ids = [row.id for row in rows]
+            for i in range(0, len(ids), DELETE_BATCH):
+                db.session.execute(table.delete().where(table.c.id.in_(ids[i:i + DELETE_BATCH])))
+            db.session.commit()
+            moved[name] += len(rows)
+    
+    return moved
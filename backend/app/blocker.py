@@ -1,82 +1,280 @@
-"""Website blocking service using hosts file manipulation"""
+"""Website blocking service with pluggable blocking backends"""
+import errno
+import hashlib
 import os
-import platform
 import re
-from datetime import datetime
+import stat
+import sys
+import tempfile
+import threading
+import time
+from app.matcher import DomainMatcher, EXCEPTION_PREFIX, WILDCARD_PREFIX
+
+REDIRECT_IP = "127.0.0.1"
+
+SCHEME_PATTERN = re.compile(r'^https?://')
+DOMAIN_PATTERN = re.compile(r'^(?:[a-zA-Z0-9](?:[a-zA-Z0-9\-]{0,61}[a-zA-Z0-9])?\.)+[a-zA-Z]{2,}$')
+
+class BlockingBackend:
+    """Interface for the mechanisms that make blocked domains unreachable"""
+    
+    # Called with the hostname when a backend sees a blocked lookup
+    on_attempt = None
+    # Whether *. rules block every subdomain, not just the www. fallback
+    wildcards = False
+    
+    def enable(self, matcher):
+        """Block exactly what a compiled DomainMatcher matches"""
+        raise NotImplementedError
+    
+    def disable(self):
+        """Stop blocking"""
+        raise NotImplementedError
+
+class HostsFileBackend(BlockingBackend):
+    """Blocks sites by redirecting them in the system hosts file"""
+    
+    SECTION_START = '# FocusGuard START'
+    SECTION_END = '# FocusGuard END'
+    HASH_PATTERN = re.compile(r'^# Hash: (\w+)$', re.MULTILINE)
+    
+    # Called with the seconds each hosts file write took
+    on_write = None
+    
+    def __init__(self, hosts_path=None, redirect_ip=REDIRECT_IP):
+        self.hosts_path = hosts_path or self._get_hosts_path()
+        self.redirect_ip = redirect_ip
+        # Hash of the section we last wrote and the file's (mtime, size) after it
+        self._section_hash = None
+        self._file_state = None
+        # (file state, names) of the section as last read by listed()
+        self._listed = (None, frozenset())
+    
+    def _get_hosts_path(self):
+        """Get hosts file path based on OS"""
+        # sys.platform is fixed at build time; platform.system() costs an
+        # import and a uname call on every start
+        if sys.platform == 'win32':
+            return r'C:\Windows\System32\drivers\etc\hosts'
+        elif sys.platform.startswith(('linux', 'darwin')):
+            return '/etc/hosts'
+        else:
+            raise OSError(f"Unsupported OS: {sys.platform}")
+    
+    def enable(self, matcher):
+        """Write the FocusGuard section for the matcher's hostnames"""
+        return self._apply(matcher.hosts_entries())
+    
+    def disable(self):
+        """Remove the FocusGuard section"""
+        return self._apply([])
+    
+    def _apply(self, sites):
+        """Make the FocusGuard section list exactly these sites (lock held)
+        
+        Returns False when the hosts file already had that section and was
+        left untouched.
+        """
+        body = ''.join(f"{self.redirect_ip} {site}\n" for site in sites)
+        digest = hashlib.sha1(body.encode()).hexdigest() if sites else None
+        
+        # Fast path: same section as our last write and nobody touched the file
+        if digest == self._section_hash and self._file_state == self._stat():
+            return False
+        
+        with open(self.hosts_path, 'r') as f:
+            content = f.read()
+        
+        content, current = self._strip_section(content)
+        if current != digest:
+            if sites:
+                if content and not content.endswith('\n'):
+                    content += '\n'
+                content += f"\n{self.SECTION_START}\n# Hash: {digest}\n{body}{self.SECTION_END}\n"
+            started = time.perf_counter()
+            self._write_atomic(content)
+            if self.on_write:
+                self.on_write(time.perf_counter() - started)
+        
+        self._section_hash = digest
+        self._file_state = self._stat()
+        return current != digest
+    
+    def listed(self, host):
+        """Whether the FocusGuard section redirects host right now
+        
+        The hosts file is shared by every worker process, so this also sees
+        sections written by the others. It is re-read only when it changes.
+        """
+        state = self._stat()
+        if state != self._listed[0]:
+            try:
+                with open(self.hosts_path, 'r') as f:
+                    content = f.read()
+            except OSError:
+                return False
+            start = content.find(self.SECTION_START)
+            end = content.find(self.SECTION_END, start)
+            names = frozenset()
+            if start != -1 and end != -1:
+                names = frozenset(
+                    parts[1] for parts in (line.split() for line in content[start:end].splitlines())
+                    if len(parts) == 2 and parts[0] == self.redirect_ip
+                )
+            self._listed = (state, names)
+        return host in self._listed[1]
+    
+    def _strip_section(self, content):
+        """Remove the FocusGuard section; return (content, section hash)"""
+        start = content.find(self.SECTION_START)
+        end = content.find(self.SECTION_END, start)
+        if start == -1 or end == -1:
+            return content, None
+        
+        end += len(self.SECTION_END)
+        if content.startswith('\n', end):
+            end += 1
+        # Drop the blank separator line written before the section
+        if content.endswith('\n\n', 0, start):
+            start -= 1
+        
+        match = self.HASH_PATTERN.search(content, start, end)
+        return content[:start] + content[end:], match.group(1) if match else ''
+    
+    def _stat(self):
+        """Modification time and size of the hosts file"""
+        try:
+            st = os.stat(self.hosts_path)
+        except OSError:
+            return None
+        return st.st_mtime_ns, st.st_size
+    
+    def _write_atomic(self, content):
+        """Replace the hosts file via temp file + fsync + rename"""
+        directory = os.path.dirname(os.path.abspath(self.hosts_path))
+        fd, tmp_path = tempfile.mkstemp(prefix='.hosts.focusguard.', dir=directory)
+        try:
+            with os.fdopen(fd, 'w') as f:
+                f.write(content)
+                f.flush()
+                os.fsync(f.fileno())
+            
+            # Keep the original permissions and ownership
+            st = os.stat(self.hosts_path)
+            os.chmod(tmp_path, stat.S_IMODE(st.st_mode))
+            if hasattr(os, 'chown'):
+                try:
+                    os.chown(tmp_path, st.st_uid, st.st_gid)
+                except PermissionError:
+                    pass
+            
+            try:
+                os.replace(tmp_path, self.hosts_path)
+            except OSError as e:
+                # Bind-mounted hosts files (e.g. in containers) cannot be
+                # renamed over; fall back to a synced in-place write
+                if e.errno not in (errno.EBUSY, errno.EXDEV):
+                    raise
+                os.remove(tmp_path)
+                with open(self.hosts_path, 'w') as f:
+                    f.write(content)
+                    f.flush()
+                    os.fsync(f.fileno())
+                return
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+        
+        if os.name == 'posix':
+            dir_fd = os.open(directory, os.O_RDONLY)
+            try:
+                os.fsync(dir_fd)
+            finally:
+                os.close(dir_fd)
 
 class WebsiteBlocker:
-    """Manages website blocking through hosts file"""
+    """Manages website blocking through a blocking backend"""
     
-    REDIRECT_IP = "127.0.0.1"
+    REDIRECT_IP = REDIRECT_IP
     
+    # Wildcards cover every subdomain (m., mobile., cdn.); the hosts file
+    # backend falls back to the www. entry for each
     PRESETS = {
         'social_media': [
-            'facebook.com', 'www.facebook.com',
-            'twitter.com', 'www.twitter.com', 'x.com', 'www.x.com',
-            'instagram.com', 'www.instagram.com',
-            'tiktok.com', 'www.tiktok.com',
-            'reddit.com', 'www.reddit.com',
-            'linkedin.com', 'www.linkedin.com'
+            'facebook.com', '*.facebook.com',
+            'twitter.com', '*.twitter.com', 'x.com', '*.x.com',
+            'instagram.com', '*.instagram.com',
+            'tiktok.com', '*.tiktok.com',
+            'reddit.com', '*.reddit.com',
+            'linkedin.com', '*.linkedin.com'
         ],
         'news': [
-            'cnn.com', 'www.cnn.com',
-            'bbc.com', 'www.bbc.com',
-            'nytimes.com', 'www.nytimes.com',
-            'reddit.com', 'www.reddit.com'
+            'cnn.com', '*.cnn.com',
+            'bbc.com', '*.bbc.com',
+            'nytimes.com', '*.nytimes.com',
+            'reddit.com', '*.reddit.com'
         ],
         'entertainment': [
-            'youtube.com', 'www.youtube.com',
-            'netflix.com', 'www.netflix.com',
-            'twitch.tv', 'www.twitch.tv'
+            'youtube.com', '*.youtube.com',
+            'netflix.com', '*.netflix.com',
+            'twitch.tv', '*.twitch.tv'
         ]
     }
     
-    def __init__(self):
-        self.hosts_path = self._get_hosts_path()
+    def __init__(self, hosts_path=None, backend=None):
+        self.backend = backend or HostsFileBackend(hosts_path, self.REDIRECT_IP)
         self.is_blocking = False
+        self.matcher = DomainMatcher()
+        self._lock = threading.Lock()
     
-    def _get_hosts_path(self):
-        """Get hosts file path based on OS"""
-        system = platform.system()
-        if system == 'Windows':
-            return r'C:\Windows\System32\drivers\etc\hosts'
-        elif system in ['Linux', 'Darwin']:
-            return '/etc/hosts'
-        else:
-            raise OSError(f"Unsupported OS: {system}")
+    @property
+    def wildcards(self):
+        """Whether the backend blocks every subdomain a *. rule covers"""
+        return self.backend.wildcards
+    
+    @property
+    def hosts_path(self):
+        """Hosts file in use, if the backend is hosts-file based"""
+        return getattr(self.backend, 'hosts_path', None)
     
     def validate_url(self, url):
-        """Validate and clean URL"""
-        url = re.sub(r'^https?://', '', url)
+        """Validate and clean URL (or *. wildcard / @@ exception rule)"""
+        prefix = ''
+        for rule_prefix in (WILDCARD_PREFIX, EXCEPTION_PREFIX):
+            if url.startswith(rule_prefix):
+                prefix, url = rule_prefix, url[len(rule_prefix):]
+                break
+        url = SCHEME_PATTERN.sub('', url)
         url = url.rstrip('/').split('/')[0]
-        pattern = r'^(?:[a-zA-Z0-9](?:[a-zA-Z0-9\-]{0,61}[a-zA-Z0-9])?\.)+[a-zA-Z]{2,}$'
-        return url if re.match(pattern, url) else None
+        return prefix + url if DOMAIN_PATTERN.match(url) else None
+    
+    def compile(self, sites):
+        """Matcher for a site list, rebuilt only when the list changes"""
+        sites = tuple(sites)
+        if sites != self.matcher.rules:
+            self.matcher = DomainMatcher(sites)
+        return self.matcher
+    
+    def is_blocked(self, host):
+        """Rule blocking host right now, or None
+        
+        Backends that keep their state where every worker process can see
+        it (the hosts file) answer for sessions started elsewhere too; the
+        entry that redirects host is returned as its rule.
+        """
+        listed = getattr(self.backend, 'listed', None)
+        if listed is not None:
+            return host if listed(host) else None
+        if not self.is_blocking:
+            return None
+        return self.matcher.match(host)
     
     def enable_blocking(self, sites):
         """Enable blocking for given sites"""
         try:
-            with open(self.hosts_path, 'r') as f:
-                content = f.read()
-            
-            # Remove existing FocusGuard section
-            if '# FocusGuard START' in content:
-                start = content.find('# FocusGuard START')
-                end = content.find('# FocusGuard END')
-                if end > start:
-                    content = content[:start] + content[end + len('# FocusGuard END\n'):]
-            
-            # Add new blocking section
-            if sites:
-                block_section = '\n# FocusGuard START\n'
-                block_section += f'# Updated: {datetime.now().isoformat()}\n'
-                for site in sites:
-                    block_section += f"{self.REDIRECT_IP} {site}\n"
-                block_section += '# FocusGuard END\n'
-                content += block_section
-            
-            with open(self.hosts_path, 'w') as f:
-                f.write(content)
-            
+            with self._lock:
+                self.backend.enable(self.compile(sites))
             self.is_blocking = True
             return True
         except PermissionError:
@@ -87,18 +285,8 @@ class WebsiteBlocker:
     def disable_blocking(self):
         """Disable all blocking"""
         try:
-            with open(self.hosts_path, 'r') as f:
-                content = f.read()
-            
-            if '# FocusGuard START' in content:
-                start = content.find('# FocusGuard START')
-                end = content.find('# FocusGuard END')
-                if end > start:
-                    content = content[:start] + content[end + len('# FocusGuard END\n'):]
-            
-            with open(self.hosts_path, 'w') as f:
-                f.write(content)
-            
+            with self._lock:
+                self.backend.disable()
             self.is_blocking = False
             return True
         except Exception as e:
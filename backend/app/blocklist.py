@@ -0,0 +1,170 @@
+"""Blocklist parsing and bulk import"""
+import hashlib
+import os
+import re
+from datetime import datetime
+from sqlalchemy import func, select, true
+from app.models import db, BlockedSite
+
+# Leading address of a hosts-format line (0.0.0.0, 127.0.0.1, ::1, ...)
+HOSTS_ADDRESS_PATTERN = re.compile(r'^[0-9a-fA-F.:]+$')
+# Adblock element hiding markers: ##, #@#, #?#, #$#, #@?# ...
+COSMETIC_PATTERN = re.compile(r'#[@?$%]*#')
+# A whole-domain adblock rule: ||example.com^ with no path or options
+ADBLOCK_DOMAIN_PATTERN = re.compile(r'^\|\|([A-Za-z0-9.\-]+)\^?\|?$')
+
+# Rows per executemany, bounding memory for lists of any size
+INSERT_BATCH = 5000
+# Accepted and rejected entries echoed back in import results
+SAMPLE_SIZE = 20
+HASH_CHUNK = 1 << 20
+
+def parse_line(line, wildcards=False):
+    """Blocklist rules found on one hosts, adblock or plain-list line
+    
+    wildcards says whether the blocking backend can match *. rules; without
+    it an adblock domain rule adds only the domain, since a hosts file would
+    list just the www. fallback of the wildcard.
+    """
+    # Cosmetic (element hiding) rules hide parts of a page, not a domain
+    if COSMETIC_PATTERN.search(line):
+        return []
+    if '#' in line:
+        line = line.split('#', 1)[0]
+    line = line.strip()
+    if not line or line.startswith(('!', '[')):
+        return []
+    
+    # Adblock: ||example.com^ blocks the domain and its subdomains. Rules
+    # with a path or $options only cover some requests, and blocking the
+    # whole domain for them would be far too broad
+    exception = line.startswith('@@')
+    if exception:
+        line = line[2:]
+    if line.startswith('||'):
+        match = ADBLOCK_DOMAIN_PATTERN.match(line)
+        if not match:
+            return []
+        domain = match.group(1).lower()
+        if exception:
+            return ['@@' + domain]
+        return [domain, '*.' + domain] if wildcards else [domain]
+    if line.startswith(('|', '/')):
+        # Address-anchored (|https://...) and regex (/.../) adblock rules
+        return []
+    if exception:
+        return ['@@' + line.lower()]
+    
+    parts = line.split()
+    if len(parts) > 1 and HOSTS_ADDRESS_PATTERN.match(parts[0]):
+        return [part.lower() for part in parts[1:]]
+    return [parts[0].lower()]
+
+def parse_blocklist(lines, wildcards=False):
+    """Yield rules from an iterable of blocklist lines"""
+    for line in lines:
+        yield from parse_line(line, wildcards)
+
+def _insert_batch(batch, category):
+    """Insert the URLs of one batch that are not stored yet; return those"""
+    existing = set(db.session.scalars(
+        select(BlockedSite.url).where(BlockedSite.url.in_(batch))
+    ))
+    new = [url for url in batch if url not in existing]
+    if new:
+        # Shared values are SQL expressions so only the URL is bound per row
+        stmt = BlockedSite.__table__.insert().values(
+            category=category,
+            added_at=func.current_timestamp(),
+            is_active=true()
+        )
+        db.session.execute(stmt, [{'url': url} for url in new])
+    return new
+
+def import_sites(entries, category, validate):
+    """Validate, dedupe and insert blocklist entries in bulk (caller commits)
+    
+    Entries are processed in fixed-size batches, each checked against the
+    stored URLs with one IN query and written with one executemany, so
+    memory stays bounded however long the entries stream is.
+    """
+    batch = {}
+    valid = 0
+    added = 0
+    added_sample = []
+    invalid = 0
+    invalid_sample = []
+    
+    for entry in entries:
+        url = validate(entry.strip().lower())
+        if url is None:
+            invalid += 1
+            if len(invalid_sample) < SAMPLE_SIZE:
+                invalid_sample.append(entry)
+            continue
+        
+        valid += 1
+        # Dict keeps first-seen order while dropping repeats within a batch
+        batch[url] = None
+        if len(batch) >= INSERT_BATCH:
+            new = _insert_batch(list(batch), category)
+            added += len(new)
+            added_sample.extend(new[:SAMPLE_SIZE - len(added_sample)])
+            batch = {}
+    
+    if batch:
+        new = _insert_batch(list(batch), category)
+        added += len(new)
+        added_sample.extend(new[:SAMPLE_SIZE - len(added_sample)])
+    
+    return {
+        'added': added,
+        'added_sample': added_sample,
+        'invalid': invalid,
+        'invalid_sample': invalid_sample,
+        'duplicates': valid - added
+    }
+
+def file_digest(path):
+    """SHA-256 of a file, read in fixed-size chunks"""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(HASH_CHUNK), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+def subscription_path(directory, name):
+    """Resolve a subscription file name inside directory
+    
+    Raises ValueError for anything that is not a regular file there,
+    including ../ and symlink escapes.
+    """
+    root = os.path.realpath(directory)
+    path = os.path.realpath(os.path.join(root, name))
+    if os.path.commonpath([root, path]) != root or not os.path.isfile(path):
+        raise ValueError('Blocklist file not found in the subscriptions directory')
+    return path
+
+def read_blocklist(path, wildcards=False):
+    """Stream rules from a blocklist file one line at a time"""
+    with open(path, encoding='utf-8', errors='replace') as f:
+        yield from parse_blocklist(f, wildcards)
+
+def sync_subscription(subscription, validate, force=False, wildcards=False):
+    """Re-import a subscription's file if its content changed (caller commits)
+    
+    Returns None when the file hash matches the last sync.
+    """
+    digest = file_digest(subscription.path)
+    if digest == subscription.content_hash and not force:
+        return None
+    
+    # Replace the rules this list owns; rules added by hand or by another
+    # list are left alone and count as duplicates
+    BlockedSite.query.filter_by(category=subscription.category).delete()
+    result = import_sites(read_blocklist(subscription.path, wildcards), subscription.category, validate)
+    
+    subscription.content_hash = digest
+    subscription.rule_count = result['added']
+    subscription.synced_at = datetime.utcnow()
+    return result
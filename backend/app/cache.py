@@ -0,0 +1,78 @@
+"""In-process cache for analytics results"""
+import hashlib
+import json
+import threading
+import time
+from collections import OrderedDict
+
+class AnalyticsCache:
+    """TTL and LRU bounded cache, invalidated by a write generation counter
+    
+    The generation only sees writes made by this process; callers pass a
+    version read from the database so writes by other workers miss too.
+    """
+    
+    def __init__(self, max_entries=256, ttl_seconds=60):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.generation = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+    
+    def get(self, method, *args, ttl=None, version=None):
+        """Return (value, etag) for method(*args), computing it on a miss
+        
+        version is part of the key but not passed to method. ttl overrides
+        the default lifetime.
+        """
+        key = (method.__qualname__, args, version)
+        now = time.monotonic()
+        
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                generation, expires_at, value, etag = entry
+                if generation == self.generation and expires_at > now:
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return value, etag
+            self.misses += 1
+            # Captured before computing so a concurrent write makes this stale
+            generation = self.generation
+        
+        value = method(*args)
+        etag = hashlib.sha1(json.dumps(value, sort_keys=True, default=str).encode()).hexdigest()
+        
+        with self._lock:
+            if generation == self.generation:
+                self._entries[key] = (generation, now + (ttl or self.ttl_seconds), value, etag)
+                self._entries.move_to_end(key)
+                while len(self._entries) > self.max_entries:
+                    self._entries.popitem(last=False)
+                    self.evictions += 1
+        
+        return value, etag
+    
+    def invalidate(self):
+        """Mark every cached result stale (called from write paths)"""
+        with self._lock:
+            self.generation += 1
+            self._entries.clear()
+    
+    def stats(self):
+        """Counters for monitoring"""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'generation': self.generation,
+                'entries': len(self._entries),
+                'max_entries': self.max_entries,
+                'ttl_seconds': self.ttl_seconds,
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'hit_rate': round(self.hits / lookups * 100, 2) if lookups else 0
+            }
@@ -0,0 +1,49 @@
+"""Flask CLI maintenance commands"""
+import click
+
+def register_commands(app):
+    """Attach maintenance commands to the app CLI"""
+    
+    @app.cli.command('rebuild-rollups')
+    def rebuild_rollups():
+        """Rebuild analytics rollups from raw session and attempt rows"""
+        from app.rollups import rebuild_daily_stats
+        session_days, attempt_days = rebuild_daily_stats()
+        click.echo(f"Rebuilt daily_stats: {session_days} session days, {attempt_days} attempt days")
+    
+    @app.cli.command('archive')
+    @click.option('--days', type=int, help='Archive whole months older than this (default ARCHIVE_AFTER_DAYS)')
+    @click.option('--vacuum', is_flag=True, help='Compact the database file afterwards')
+    def archive(days, vacuum):
+        """Move old sessions and block attempts into the compressed archive"""
+        from app import routes
+        from app.archive import archive_cutoff, archive_rows, current_archive
+        from app.models import db
+        cutoff = archive_cutoff(app.config['ARCHIVE_AFTER_DAYS'] if days is None else days)
+        for table, count in archive_rows(current_archive(), cutoff).items():
+            click.echo(f"{table}: archived {count} rows from before {cutoff.date()}")
+        routes.analytics_cache.invalidate()
+        
+        if vacuum:
+            # Deleted rows only free pages; VACUUM gives the space back
+            with db.engine.connect().execution_options(isolation_level='AUTOCOMMIT') as connection:
+                connection.exec_driver_sql('VACUUM')
+            click.echo("Database compacted")
+    
+    @app.cli.command('sync-blocklists')
+    @click.option('--force', is_flag=True, help='Re-import even if a file is unchanged')
+    def sync_blocklists(force):
+        """Re-import subscribed blocklist files whose content changed"""
+        from app import routes
+        from app.blocklist import sync_subscription
+        from app.models import db, BlocklistSubscription
+        for subscription in BlocklistSubscription.query.order_by(BlocklistSubscription.name):
+            result = sync_subscription(subscription, routes.blocker_service.validate_url, force,
+                                       routes.blocker_service.wildcards)
+            if result is None:
+                click.echo(f"{subscription.name}: unchanged, skipped")
+                continue
+            db.session.commit()
+            click.echo(f"{subscription.name}: {result['added']} rules, "
+                       f"{result['duplicates']} duplicates, {result['invalid']} invalid")
+        routes.analytics_cache.invalidate()
@@ -1,13 +1,35 @@
 """Configuration settings for FocusGuard"""
 import os
+import tempfile
 from datetime import timedelta
 
 class Config:
     """Base configuration"""
     SECRET_KEY = os.environ.get('SECRET_KEY') or 'dev-secret-key-change-in-production'
-    SQLALCHEMY_DATABASE_URI = 'sqlite:///focusguard.db'
+    SQLALCHEMY_DATABASE_URI = os.environ.get('DATABASE_URL') or 'sqlite:///focusguard.db'
     SQLALCHEMY_TRACK_MODIFICATIONS = False
     
+    # Connection pool for threaded serving; SQLite allows one writer at a
+    # time, so extra connections mostly serve concurrent readers. In-memory
+    # databases use a single static connection and take no pool options.
+    SQLALCHEMY_ENGINE_OPTIONS = {} if SQLALCHEMY_DATABASE_URI in ('sqlite://', 'sqlite:///:memory:') else {
+        'pool_size': 10,
+        'max_overflow': 20,
+        'pool_timeout': 30
+    }
+    
+    # Applied to every new SQLite connection. WAL lets readers run while a
+    # session is being committed; NORMAL sync is durable across app crashes
+    # (only a power loss can drop the last commits)
+    SQLITE_PRAGMAS = {
+        'journal_mode': 'WAL',
+        'synchronous': 'NORMAL',
+        'busy_timeout': 5000,
+        'cache_size': -65536,
+        'mmap_size': 268435456,
+        'temp_store': 'MEMORY'
+    }
+    
     # CORS settings
     CORS_HEADERS = 'Content-Type'
     
@@ -20,6 +42,72 @@ class Config:
         'quick': 15
     }
     
+    # Blocking backend: 'hosts' (system hosts file) or 'dns' (local sinkhole)
+    BLOCKING_BACKEND = os.environ.get('FOCUSGUARD_BLOCKING_BACKEND', 'hosts')
+    
+    # Hosts file override (defaults to the OS hosts file)
+    HOSTS_FILE = os.environ.get('FOCUSGUARD_HOSTS_FILE')
+    
+    # DNS sinkhole listener and the resolver unblocked names are forwarded to
+    DNS_SINKHOLE_HOST = os.environ.get('FOCUSGUARD_DNS_HOST', '127.0.0.1')
+    DNS_SINKHOLE_PORT = int(os.environ.get('FOCUSGUARD_DNS_PORT', 5300))
+    DNS_UPSTREAM_HOST = os.environ.get('FOCUSGUARD_DNS_UPSTREAM', '1.1.1.1')
+    DNS_UPSTREAM_PORT = int(os.environ.get('FOCUSGUARD_DNS_UPSTREAM_PORT', 53))
+    
+    # Blocklist subscriptions added over the API must be files in this
+    # directory; the API runs with admin rights, so it never reads elsewhere
+    SUBSCRIPTIONS_DIR = os.environ.get('FOCUSGUARD_SUBSCRIPTIONS_DIR') or os.path.join(
+        os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'blocklists'
+    )
+    
+    # Block page server on the redirect address (port 80 needs admin rights)
+    LANDING_SERVER = os.environ.get('FOCUSGUARD_LANDING_SERVER', '0') == '1'
+    LANDING_PORT = int(os.environ.get('FOCUSGUARD_LANDING_PORT', 80))
+    
+    # Session registry: user id used when a request does not name one,
+    # and how many idle per-user timers to keep in memory
+    DEFAULT_USER_ID = 'default'
+    MAX_IDLE_TIMERS = 1000
+    
+    # Lock file serializing blocking changes and schema setup across worker
+    # processes, and how often status streams re-read the shared session
+    # table for changes made by other workers
+    LOCK_FILE = os.environ.get('FOCUSGUARD_LOCK_FILE') or os.path.join(tempfile.gettempdir(), 'focusguard.lock')
+    STATE_POLL_SECONDS = 2
+    
+    # Add Server-Timing headers (total and SQL time) to API responses
+    SERVER_TIMING = os.environ.get('FOCUSGUARD_SERVER_TIMING', '0') == '1'
+    
+    # Analytics response cache bounds. Entries are keyed by the newest
+    # session and attempt ids, so the TTL only bounds how long maintenance
+    # commands (rebuild-rollups) take to show up
+    ANALYTICS_CACHE_SIZE = 256
+    ANALYTICS_CACHE_TTL = 60
+    # Insights are costlier and only read rollups, so they can live longer
+    INSIGHTS_CACHE_TTL = 3600
+    
+    # Archival: whole months older than this many days move out of the
+    # database into compressed monthly files (`flask archive`), kept in
+    # ARCHIVE_DIR or an archive directory next to the database file
+    ARCHIVE_AFTER_DAYS = int(os.environ.get('FOCUSGUARD_ARCHIVE_AFTER_DAYS', 365))
+    ARCHIVE_DIR = os.environ.get('FOCUSGUARD_ARCHIVE_DIR')
+    
+    # Largest page /analytics/history will return
+    HISTORY_MAX_LIMIT = 500
+    
+    # Seconds between keepalive comments on idle status streams, and open
+    # streams per worker process. Each stream holds a thread for as long as
+    # its tab is open; gunicorn.conf.py adds this many threads on top of the
+    # ones serving API calls, and streams past the limit get a 503
+    SSE_KEEPALIVE_SECONDS = 15
+    SSE_MAX_STREAMS = int(os.environ.get('FOCUSGUARD_STREAMS', 8))
+    
+    # Block attempt ingestion: queue bound, rows per write and the longest
+    # an attempt waits in the queue before being flushed
+    ATTEMPT_QUEUE_SIZE = 10000
+    ATTEMPT_BATCH_SIZE = 500
+    ATTEMPT_FLUSH_SECONDS = 1.0
+    
     # Default settings
     DEFAULT_SETTINGS = {
         'auto_start_break': False,
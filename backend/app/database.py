@@ -0,0 +1,36 @@
+"""SQLite connection tuning, schema version stamp and index checks"""
+from sqlalchemy import event
+
+def apply_sqlite_pragmas(engine, pragmas):
+    """Run the configured PRAGMAs on every new SQLite connection"""
+    if engine.dialect.name != 'sqlite' or not pragmas:
+        return
+    
+    @event.listens_for(engine, 'connect')
+    def set_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        for name, value in pragmas.items():
+            cursor.execute(f"PRAGMA {name}={value}")
+        cursor.close()
+
+def schema_version(engine):
+    """Schema version stamped on the database (None where unsupported)"""
+    if engine.dialect.name != 'sqlite':
+        return None
+    with engine.connect() as conn:
+        return conn.exec_driver_sql('PRAGMA user_version').scalar()
+
+def stamp_schema(engine, version):
+    """Record the schema version in the SQLite header (user_version)"""
+    if engine.dialect.name != 'sqlite':
+        return
+    with engine.begin() as conn:
+        conn.exec_driver_sql(f"PRAGMA user_version={int(version)}")
+
+def missing_indexes(engine, metadata):
+    """Indexes declared on the models that the SQLite file lacks"""
+    if engine.dialect.name != 'sqlite':
+        return []
+    with engine.connect() as conn:
+        existing = set(conn.exec_driver_sql("SELECT name FROM sqlite_master WHERE type = 'index'").scalars())
+    return [index for table in metadata.sorted_tables for index in table.indexes if index.name not in existing]
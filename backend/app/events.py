@@ -0,0 +1,54 @@
+"""Server-Sent Events broadcasting for timer state"""
+import json
+import queue
+import threading
+
+def format_sse(event, data):
+    """Format a payload as a Server-Sent Events message"""
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+class EventBroadcaster:
+    """Fans out timer status events to stream subscribers"""
+    
+    def __init__(self, max_queue=16):
+        self.max_queue = max_queue
+        self._subscribers = set()
+        self._lock = threading.Lock()
+    
+    def subscribe(self):
+        """Register a new subscriber and return its message queue"""
+        messages = queue.Queue(maxsize=self.max_queue)
+        with self._lock:
+            self._subscribers.add(messages)
+        return messages
+    
+    def unsubscribe(self, messages):
+        """Remove a subscriber queue"""
+        with self._lock:
+            self._subscribers.discard(messages)
+    
+    def publish(self, event, data):
+        """Push an (event, data) pair to every subscriber without blocking"""
+        message = (event, data)
+        with self._lock:
+            subscribers = list(self._subscribers)
+        
+        for messages in subscribers:
+            try:
+                messages.put_nowait(message)
+            except queue.Full:
+                # Every status event is a full snapshot, so a slow client
+                # only needs the newest one.
+                try:
+                    messages.get_nowait()
+                except queue.Empty:
+                    pass
+                try:
+                    messages.put_nowait(message)
+                except queue.Full:
+                    pass
+    
+    @property
+    def subscriber_count(self):
+        with self._lock:
+            return len(self._subscribers)
@@ -0,0 +1,100 @@
+"""Buffered ingestion of block attempts"""
+import logging
+import queue
+import threading
+import time
+from datetime import datetime
+from app.models import db
+from app.rollups import record_block_attempts
+
+logger = logging.getLogger(__name__)
+
+class AttemptIngestor:
+    """Queues block attempts and writes them in batches from one thread
+    
+    submit() never blocks: when the queue is full the attempt is dropped and
+    counted, so a retry storm cannot stall the caller (request handler or
+    the DNS event loop).
+    """
+    
+    def __init__(self, app, max_queue=10000, batch_size=500, flush_seconds=1.0):
+        self.app = app
+        self.batch_size = batch_size
+        self.flush_seconds = flush_seconds
+        self.on_flush = None
+        self.submitted = 0
+        self.dropped = 0
+        self.written = 0
+        self.failed = 0
+        self.batches = 0
+        self._queue = queue.Queue(max_queue)
+        self._thread = None
+        self._start_lock = threading.Lock()
+    
+    def submit(self, url, during_session=True, timestamp=None):
+        """Queue one attempt; returns False if it was dropped"""
+        if self._thread is None:
+            self._start()
+        try:
+            self._queue.put_nowait((url, during_session, timestamp or datetime.utcnow()))
+        except queue.Full:
+            self.dropped += 1
+            return False
+        self.submitted += 1
+        return True
+    
+    def _start(self):
+        """Start the writer thread on first use"""
+        with self._start_lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, daemon=True)
+                self._thread.start()
+    
+    def _run(self):
+        """Collect batches until full or flush_seconds old, then write them"""
+        while True:
+            batch = [self._queue.get()]
+            flush_at = time.monotonic() + self.flush_seconds
+            while len(batch) < self.batch_size:
+                timeout = flush_at - time.monotonic()
+                if timeout <= 0:
+                    break
+                try:
+                    batch.append(self._queue.get(timeout=timeout))
+                except queue.Empty:
+                    break
+            self._write(batch)
+    
+    def _write(self, batch):
+        """Persist one batch in a single transaction"""
+        try:
+            with self.app.app_context():
+                record_block_attempts(batch)
+                db.session.commit()
+            self.written += len(batch)
+            self.batches += 1
+            if self.on_flush:
+                self.on_flush()
+        except Exception:
+            self.failed += len(batch)
+            logger.exception("Failed to write %d block attempts", len(batch))
+        finally:
+            for _ in batch:
+                self._queue.task_done()
+    
+    def flush(self):
+        """Block until every queued attempt has been written"""
+        if self._thread is not None:
+            self._queue.join()
+    
+    def stats(self):
+        """Counters for monitoring"""
+        return {
+            'queued': self._queue.qsize(),
+            'max_queue': self._queue.maxsize,
+            'submitted': self.submitted,
+            'written': self.written,
+            'dropped': self.dropped,
+            'failed': self.failed,
+            'batches': self.batches
+        }
@@ -0,0 +1,160 @@
+"""Block page server for redirected domains"""
+import asyncio
+import threading
+
+BLOCK_PAGE = b"""<!DOCTYPE html>
+<html>
+<head><meta charset="utf-8"><title>Blocked by FocusGuard</title>
+<style>
+body{font-family:system-ui,sans-serif;background:#0f172a;color:#e2e8f0;display:flex;
+align-items:center;justify-content:center;height:100vh;margin:0;text-align:center}
+h1{font-size:2rem;margin-bottom:.5rem}p{color:#94a3b8}
+</style></head>
+<body><div><h1>Stay focused</h1>
+<p><strong id="site"></strong> is blocked during your focus session.</p></div>
+<script>document.getElementById('site').textContent=location.hostname</script>
+</body>
+</html>
+"""
+
+# Larger request heads are not from a browser; drop the connection
+MAX_HEAD_BYTES = 16384
+
+def _build_response(keep_alive, body=True):
+    """Serialize the block page response once; it never changes"""
+    headers = (
+        b"HTTP/1.1 403 Forbidden\r\n"
+        b"Content-Type: text/html; charset=utf-8\r\n"
+        b"Content-Length: " + str(len(BLOCK_PAGE)).encode() + b"\r\n"
+        b"Cache-Control: no-store\r\n"
+        b"Connection: " + (b"keep-alive" if keep_alive else b"close") + b"\r\n\r\n"
+    )
+    return headers + BLOCK_PAGE if body else headers
+
+RESPONSE = _build_response(keep_alive=True)
+RESPONSE_CLOSE = _build_response(keep_alive=False)
+HEAD_RESPONSE = _build_response(keep_alive=True, body=False)
+
+def request_host(head):
+    """Lowercased Host header of a request head, without the port"""
+    start = head.lower().find(b'\r\nhost:')
+    if start == -1:
+        return None
+    start += 7
+    end = head.find(b'\r\n', start)
+    host = head[start:end if end != -1 else len(head)].strip()
+    if host.startswith(b'['):
+        return None
+    return host.split(b':', 1)[0].decode('ascii', 'replace').lower() or None
+
+class _LandingProtocol(asyncio.Protocol):
+    """Answers every request on a connection with the cached block page"""
+    
+    def __init__(self, server):
+        self.server = server
+        self.transport = None
+        self.buffer = b''
+    
+    def connection_made(self, transport):
+        self.transport = transport
+    
+    def data_received(self, data):
+        self.buffer += data
+        while True:
+            end = self.buffer.find(b'\r\n\r\n')
+            if end == -1:
+                if len(self.buffer) > MAX_HEAD_BYTES:
+                    self.transport.close()
+                return
+            head = self.buffer[:end]
+            self.buffer = self.buffer[end + 4:]
+            if not self.server._respond(head, self.transport):
+                return
+
+class LandingServer:
+    """HTTP listener on the redirect address that serves the block page and
+    reports each blocked page load as an attempt.
+    """
+    
+    def __init__(self, host='127.0.0.1', port=80):
+        self.host = host
+        self.port = port
+        self.on_attempt = None
+        self.requests = 0
+        self.attempts = 0
+        self._loop = None
+        self._thread = None
+        self._server = None
+    
+    def start(self):
+        """Start serving on a background event loop thread"""
+        if self._thread is not None:
+            return
+        ready = threading.Event()
+        errors = []
+        
+        def serve():
+            self._loop = asyncio.new_event_loop()
+            try:
+                self._server = self._loop.run_until_complete(self._loop.create_server(
+                    lambda: _LandingProtocol(self), self.host, self.port, backlog=1024))
+            except Exception as e:
+                errors.append(e)
+                ready.set()
+                return
+            # Report the real port when bound to port 0
+            self.port = self._server.sockets[0].getsockname()[1]
+            ready.set()
+            self._loop.run_forever()
+        
+        self._thread = threading.Thread(target=serve, daemon=True)
+        self._thread.start()
+        ready.wait()
+        if errors:
+            self._thread = None
+            self._loop.close()
+            self._loop = None
+            raise errors[0]
+    
+    def stop(self):
+        """Stop serving"""
+        if self._loop is None:
+            return
+        
+        def shutdown():
+            self._server.close()
+            self._loop.stop()
+        
+        self._loop.call_soon_threadsafe(shutdown)
+        self._thread.join()
+        self._loop.close()
+        self._loop = None
+        self._thread = None
+    
+    def _respond(self, head, transport):
+        """Answer one request; returns False once the connection is closing"""
+        self.requests += 1
+        method, _, rest = head.partition(b' ')
+        path = rest.split(b' ', 1)[0]
+        
+        # Page loads count as attempts; the browser's favicon fetch does not
+        if not path.startswith(b'/favicon'):
+            host = request_host(head)
+            if host and self.on_attempt:
+                self.attempts += 1
+                self.on_attempt(host)
+        
+        if method == b'GET':
+            transport.write(RESPONSE)
+            return True
+        if method == b'HEAD':
+            transport.write(HEAD_RESPONSE)
+            return True
+        # Request bodies are never read, so don't try to reuse the connection
+        transport.write(RESPONSE_CLOSE)
+        transport.close()
+        return False
+    
+    def stats(self):
+        """Counters for monitoring"""
+        return {'requests': self.requests, 'attempts': self.attempts}
@@ -0,0 +1,85 @@
+"""Reversed-label trie for matching hostnames against blocklist rules
+
+Rule syntax:
+    example.com       blocks exactly example.com
+    *.example.com     blocks every subdomain of example.com
+    @@m.example.com   exception: never block exactly m.example.com
+"""
+
+WILDCARD_PREFIX = '*.'
+EXCEPTION_PREFIX = '@@'
+
+# Int keys can never collide with label strings inside a trie node
+_EXACT = 0
+_WILDCARD = 1
+_EXCEPTION = 2
+
+class DomainMatcher:
+    """Matches hostnames in O(labels), independent of the number of rules"""
+    
+    def __init__(self, rules=()):
+        self.rules = tuple(rules)
+        self._root = {}
+        self._hosts_entries = None
+        for rule in self.rules:
+            self._add(rule)
+    
+    def _add(self, rule):
+        """Insert one rule into the trie"""
+        rule = rule.strip().lower().rstrip('.')
+        if rule.startswith(EXCEPTION_PREFIX):
+            key, domain = _EXCEPTION, rule[len(EXCEPTION_PREFIX):]
+        elif rule.startswith(WILDCARD_PREFIX):
+            key, domain = _WILDCARD, rule[len(WILDCARD_PREFIX):]
+        else:
+            key, domain = _EXACT, rule
+        if not domain or '*' in domain:
+            raise ValueError(f"Invalid blocklist rule: {rule!r}")
+        
+        node = self._root
+        for label in reversed(domain.split('.')):
+            node = node.setdefault(label, {})
+        node[key] = rule
+    
+    def match(self, host):
+        """Return the rule that blocks host, or None"""
+        node = self._root
+        matched = None
+        for label in reversed(host.lower().rstrip('.').split('.')):
+            # The closest enclosing wildcard wins
+            matched = node.get(_WILDCARD, matched)
+            node = node.get(label)
+            if node is None:
+                return matched
+        if _EXCEPTION in node:
+            return None
+        return node.get(_EXACT, matched)
+    
+    def __contains__(self, host):
+        return self.match(host) is not None
+    
+    def __len__(self):
+        return len(self.rules)
+    
+    def hosts_entries(self):
+        """Concrete hostnames for mechanisms without wildcard support
+        
+        A hosts file can only list names, so each wildcard falls back to its
+        www. subdomain and exceptions are left out.
+        """
+        if self._hosts_entries is not None:
+            return self._hosts_entries
+        
+        entries = []
+        seen = set()
+        for rule in self.rules:
+            rule = rule.strip().lower().rstrip('.')
+            if rule.startswith(EXCEPTION_PREFIX):
+                continue
+            if rule.startswith(WILDCARD_PREFIX):
+                rule = 'www.' + rule[len(WILDCARD_PREFIX):]
+            if rule not in seen and self.match(rule):
+                seen.add(rule)
+                entries.append(rule)
+        self._hosts_entries = entries
+        return entries
@@ -0,0 +1,156 @@
+"""Request, SQL and hosts file timings in Prometheus text format"""
+import bisect
+import threading
+import time
+from flask import g, has_request_context
+from sqlalchemy import event
+
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+QUERY_BUCKETS = (0, 1, 2, 5, 10, 20, 50, 100)
+
+class Histogram:
+    """Fixed-bucket histogram (caller holds the metrics lock)"""
+    
+    def __init__(self, buckets):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+    
+    def observe(self, value):
+        """Count one value"""
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+    
+    def samples(self, name, labels):
+        """Prometheus sample lines, with cumulative bucket counts"""
+        lines = []
+        cumulative = 0
+        for bound, count in zip(self.buckets + ('+Inf',), self.counts):
+            cumulative += count
+            lines.append(f'{name}_bucket{format_labels(labels, le=bound)} {cumulative}')
+        lines.append(f'{name}_sum{format_labels(labels)} {self.sum}')
+        lines.append(f'{name}_count{format_labels(labels)} {self.count}')
+        return lines
+
+def format_labels(labels, **extra):
+    """Render a label set as {a="1",b="2"}"""
+    pairs = [*labels, *extra.items()]
+    if not pairs:
+        return ''
+    return '{' + ','.join(f'{key}="{value}"' for key, value in pairs) + '}'
+
+class RequestMetrics:
+    """Per-endpoint latency and SQL cost, plus hosts file write durations
+    
+    The api blueprint calls start_request/finish_request around every
+    request; SQL statements are attributed to the request whose thread ran
+    them. Background threads (scheduler, ingestion) are not counted.
+    """
+    
+    def __init__(self, server_timing=False):
+        self.server_timing = server_timing
+        self._lock = threading.Lock()
+        self._latency = {}
+        self._queries = {}
+        self._sql_seconds = {}
+        self._responses = {}
+        self._hosts_writes = Histogram(LATENCY_BUCKETS)
+    
+    def instrument(self, engine):
+        """Count and time every statement run on the engine"""
+        
+        # The start time lives on the statement's execution context, so a
+        # statement that raises (and never reaches after_cursor_execute)
+        # leaves nothing behind
+        @event.listens_for(engine, 'before_cursor_execute')
+        def before_execute(conn, cursor, statement, parameters, context, executemany):
+            if context is not None:
+                context._fg_started = time.perf_counter()
+        
+        @event.listens_for(engine, 'after_cursor_execute')
+        def after_execute(conn, cursor, statement, parameters, context, executemany):
+            started = getattr(context, '_fg_started', None)
+            if started is None:
+                return
+            elapsed = time.perf_counter() - started
+            if has_request_context():
+                sql = g.get('sql_timing')
+                if sql is not None:
+                    sql[0] += 1
+                    sql[1] += elapsed
+    
+    def start_request(self):
+        """Mark the start of a request (before_request hook)"""
+        g.request_started = time.perf_counter()
+        g.sql_timing = [0, 0.0]
+    
+    def finish_request(self, endpoint, method, response):
+        """Record a finished request (after_request hook)"""
+        started = g.pop('request_started', None)
+        if started is None:
+            return response
+        elapsed = time.perf_counter() - started
+        queries, sql_seconds = g.pop('sql_timing')
+        key = (('endpoint', endpoint), ('method', method))
+        
+        with self._lock:
+            self._histogram(self._latency, key, LATENCY_BUCKETS).observe(elapsed)
+            self._histogram(self._queries, key, QUERY_BUCKETS).observe(queries)
+            self._histogram(self._sql_seconds, key, LATENCY_BUCKETS).observe(sql_seconds)
+            status = key + (('status', response.status_code),)
+            self._responses[status] = self._responses.get(status, 0) + 1
+        
+        if self.server_timing:
+            response.headers['Server-Timing'] = (
+                f'app;dur={elapsed * 1000:.2f}, '
+                f'db;dur={sql_seconds * 1000:.2f};desc="{queries} queries"'
+            )
+        return response
+    
+    def observe_hosts_write(self, seconds):
+        """Record one hosts file write (HostsFileBackend.on_write)"""
+        with self._lock:
+            self._hosts_writes.observe(seconds)
+    
+    @staticmethod
+    def _histogram(histograms, key, buckets):
+        """Get (or create) the histogram for a label set"""
+        histogram = histograms.get(key)
+        if histogram is None:
+            histogram = histograms[key] = Histogram(buckets)
+        return histogram
+    
+    def render(self, extra=()):
+        """Prometheus text exposition of everything recorded so far, plus
+        (name, type, description, value) samples from other services
+        """
+        lines = []
+        
+        def family(name, kind, description, samples):
+            lines.append(f'# HELP {name} {description}')
+            lines.append(f'# TYPE {name} {kind}')
+            lines.extend(samples)
+        
+        with self._lock:
+            family('focusguard_requests_total', 'counter', 'API responses by endpoint and status', [
+                f'focusguard_requests_total{format_labels(labels)} {count}'
+                for labels, count in sorted(self._responses.items())
+            ])
+            for name, histograms, description in (
+                ('focusguard_request_seconds', self._latency, 'API request latency'),
+                ('focusguard_request_sql_queries', self._queries, 'SQL statements per API request'),
+                ('focusguard_request_sql_seconds', self._sql_seconds, 'SQL time per API request')
+            ):
+                family(name, 'histogram', description, [
+                    line
+                    for labels, histogram in sorted(histograms.items())
+                    for line in histogram.samples(name, labels)
+                ])
+            family('focusguard_hosts_write_seconds', 'histogram', 'Hosts file write duration',
+                   self._hosts_writes.samples('focusguard_hosts_write_seconds', ()))
+        
+        for name, kind, description, value in extra:
+            family(f'focusguard_{name}', kind, description, [f'focusguard_{name} {value}'])
+        return '\n'.join(lines) + '\n'
@@ -4,6 +4,10 @@ from datetime import datetime
 
 db = SQLAlchemy()
 
+# Latest revision in migrations/versions. A database stamped with it is up
+# to date, so startup skips create_all(); bump it with every migration.
+SCHEMA_VERSION = 5
+
 class FocusSession(db.Model):
     """Focus session model"""
     __tablename__ = 'focus_sessions'
@@ -14,9 +18,15 @@ class FocusSession(db.Model):
     duration_minutes = db.Column(db.Float, nullable=False)
     completed_minutes = db.Column(db.Float, nullable=False, default=0)
     completed = db.Column(db.Boolean, default=False)
-    started_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+    # Naive server-local time, like the timer that produces it
+    started_at = db.Column(db.DateTime, nullable=False, default=datetime.now)
     ended_at = db.Column(db.DateTime)
-    date = db.Column(db.String(10))
+    date = db.Column(db.Date)
+    
+    __table_args__ = (
+        db.Index('ix_focus_sessions_date_completed', 'date', 'completed'),
+        db.Index('ix_focus_sessions_started_at', 'started_at'),
+    )
     
     def to_dict(self):
         return {
@@ -28,7 +38,67 @@ class FocusSession(db.Model):
             'completed': self.completed,
             'started_at': self.started_at.isoformat() if self.started_at else None,
             'ended_at': self.ended_at.isoformat() if self.ended_at else None,
-            'date': self.date
+            'date': self.date.isoformat() if self.date else None
+        }
+
+class ActiveSession(db.Model):
+    """Running focus session, shared by every server process"""
+    __tablename__ = 'active_sessions'
+    
+    user_id = db.Column(db.String(64), primary_key=True)
+    session_id = db.Column(db.String(50), unique=True, nullable=False)
+    mode = db.Column(db.String(20), nullable=False)
+    duration_seconds = db.Column(db.Float, nullable=False)
+    started_at = db.Column(db.DateTime, nullable=False)
+    # Unix time, so any process can compute the time remaining
+    deadline = db.Column(db.Float, nullable=False)
+
+class DailyStat(db.Model):
+    """Per-day rollup of focus sessions and block attempts"""
+    __tablename__ = 'daily_stats'
+    
+    date = db.Column(db.Date, primary_key=True)
+    sessions = db.Column(db.Integer, nullable=False, default=0)
+    completed_sessions = db.Column(db.Integer, nullable=False, default=0)
+    minutes = db.Column(db.Float, nullable=False, default=0)
+    block_attempts = db.Column(db.Integer, nullable=False, default=0)
+    
+    def to_dict(self):
+        return {
+            'date': self.date.isoformat(),
+            'sessions': self.sessions,
+            'completed_sessions': self.completed_sessions,
+            'minutes': round(self.minutes, 2),
+            'block_attempts': self.block_attempts
+        }
+
+class HourlyStat(db.Model):
+    """Per-day rollup of focus sessions by start hour and mode"""
+    __tablename__ = 'hourly_stats'
+    
+    date = db.Column(db.Date, primary_key=True)
+    hour = db.Column(db.Integer, primary_key=True)
+    mode = db.Column(db.String(20), primary_key=True)
+    sessions = db.Column(db.Integer, nullable=False, default=0)
+    completed_sessions = db.Column(db.Integer, nullable=False, default=0)
+    minutes = db.Column(db.Float, nullable=False, default=0)
+
+class StreakState(db.Model):
+    """Single-row running streak state, updated as sessions complete"""
+    __tablename__ = 'streak_state'
+    
+    id = db.Column(db.Integer, primary_key=True)
+    current = db.Column(db.Integer, nullable=False, default=0)
+    best = db.Column(db.Integer, nullable=False, default=0)
+    last_date = db.Column(db.Date)
+    total = db.Column(db.Integer, nullable=False, default=0)
+    
+    def to_dict(self):
+        return {
+            'current': self.current,
+            'best': self.best,
+            'last_date': self.last_date.isoformat() if self.last_date else None,
+            'total': self.total
         }
 
 class BlockedSite(db.Model):
@@ -56,7 +126,7 @@ class BlockAttempt(db.Model):
     
     id = db.Column(db.Integer, primary_key=True)
     url = db.Column(db.String(255), nullable=False)
-    timestamp = db.Column(db.DateTime, default=datetime.utcnow)
+    timestamp = db.Column(db.DateTime, default=datetime.utcnow, index=True)
     during_session = db.Column(db.Boolean, default=True)
     
     def to_dict(self):
@@ -82,3 +152,32 @@ class Setting(db.Model):
             'value': self.value,
             'updated_at': self.updated_at.isoformat() if self.updated_at else None
         }
+
+class BlocklistSubscription(db.Model):
+    """External blocklist file kept in sync with the blocklist"""
+    __tablename__ = 'blocklist_subscriptions'
+    
+    id = db.Column(db.Integer, primary_key=True)
+    name = db.Column(db.String(40), unique=True, nullable=False)
+    path = db.Column(db.String(1024), nullable=False)
+    content_hash = db.Column(db.String(64))
+    rule_count = db.Column(db.Integer, default=0)
+    added_at = db.Column(db.DateTime, default=datetime.utcnow)
+    synced_at = db.Column(db.DateTime)
+    
+    @property
+    def category(self):
+        """Category of the BlockedSite rows this subscription owns"""
+        return f"list:{self.name}"
+    
+    def to_dict(self):
+        return {
+            'id': self.id,
+            'name': self.name,
+            'path': self.path,
+            'category': self.category,
+            'content_hash': self.content_hash,
+            'rule_count': self.rule_count,
+            'added_at': self.added_at.isoformat() if self.added_at else None,
+            'synced_at': self.synced_at.isoformat() if self.synced_at else None
+        }
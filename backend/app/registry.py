@@ -0,0 +1,217 @@
+"""Per-user focus session registry"""
+import threading
+import time
+from collections import OrderedDict
+from app.timer import FocusTimer
+
+class SessionRegistry:
+    """Keeps one FocusTimer per user, each guarded by its own lock
+    
+    With a SessionStore, the store is the source of truth for which sessions
+    are running, so worker processes agree; local timers only drive the
+    deadline and the status stream of the process that started them.
+    """
+    
+    def __init__(self, blocker, scheduler, max_idle=1000, store=None):
+        self.blocker = blocker
+        self.scheduler = scheduler
+        self.max_idle = max_idle
+        self.store = store
+        self.on_complete = None
+        self._timers = {}
+        self._idle = OrderedDict()
+        self._active = set()
+        # user -> session id of the local timer once the store holds it
+        self._claimed = {}
+        # Only guards registry bookkeeping; session state uses per-timer locks
+        self._lock = threading.Lock()
+    
+    def get(self, user_id):
+        """Get (or create) the timer for a user"""
+        timer = self._timers.get(user_id)
+        if timer is None:
+            with self._lock:
+                timer = self._timers.get(user_id)
+                if timer is None:
+                    timer = FocusTimer(self.blocker, self.scheduler)
+                    timer.on_complete = lambda result: self._on_timer_complete(user_id, result)
+                    if self.store is not None:
+                        timer.still_active = lambda session_id: self._stored(user_id, session_id)
+                    self._timers[user_id] = timer
+                    self._mark_idle(user_id)
+        return timer
+    
+    def start_session(self, user_id, duration_minutes, mode='custom'):
+        """Start a focus session for a user"""
+        timer = self.get(user_id)
+        if self.store is not None:
+            if self.store.get(user_id) is not None:
+                return {'error': 'Session already active'}
+            if timer.is_active:
+                # Stopped through another process while this timer ran on
+                self._discard(user_id, timer)
+        
+        # With a store, streams read status from it, so announce the start
+        # only once the row exists
+        result = timer.start_session(duration_minutes, mode, announce=self.store is None)
+        if 'error' in result:
+            return result
+        
+        if self.store is not None and not self.store.claim_start(user_id, result, timer.duration_seconds):
+            # Another process started one first
+            self._discard(user_id, timer)
+            return {'error': 'Session already active'}
+        
+        self._mark_active(user_id, timer)
+        if self.store is not None:
+            self._claimed[user_id] = result['session_id']
+            timer.publish('start')
+        return result
+    
+    def stop_session(self, user_id, completed=False):
+        """Stop a user's active session"""
+        timer = self._timers.get(user_id)
+        if self.store is None:
+            if timer is None:
+                return {'error': 'No active session'}
+            result = timer.stop_session(completed)
+            if 'error' not in result:
+                self._mark_finished(user_id)
+            return result
+        
+        row = self.store.get(user_id)
+        if row is None or not self.store.claim_finish(user_id, row['session_id']):
+            return {'error': 'No active session'}
+        
+        if timer is not None and timer.session_id == row['session_id']:
+            result = timer.stop_session(completed)
+            if 'error' not in result:
+                self._mark_finished(user_id)
+                return result
+        # Started by another process (or its deadline fired meanwhile)
+        return self.store.result(row, completed)
+    
+    def get_status(self, user_id):
+        """Get a user's timer status"""
+        if self.store is not None:
+            row = self.store.get(user_id)
+            self._drop_if_stopped(user_id, row)
+            timer = None
+            if row is not None:
+                return self.store.status(row)
+        else:
+            timer = self._timers.get(user_id)
+        
+        if timer is None:
+            return {
+                'is_active': False,
+                'time_remaining': 0,
+                'progress_percent': 0,
+                'server_time_ms': int(time.time() * 1000)
+            }
+        return timer.get_status()
+    
+    def state_version(self):
+        """Changes when another process may have started or stopped a session"""
+        return self.store.changes.value() if self.store is not None else 0
+    
+    def active_count(self):
+        """Number of users with a running session"""
+        if self.store is not None:
+            return self.store.active_count()
+        with self._lock:
+            return len(self._active)
+    
+    def recover(self):
+        """Resume sessions left in the store by a restart
+        
+        Sessions with time left get a local timer again, counted from the
+        wall-clock deadline. Expired ones are claimed and returned as
+        completed results for the caller to persist.
+        """
+        if self.store is None:
+            return []
+        
+        expired = []
+        now = time.time()
+        for row in self.store.all():
+            user_id = row['user_id']
+            remaining = row['deadline'] - now
+            if remaining <= 0:
+                if self.store.claim_finish(user_id, row['session_id']):
+                    expired.append(self.store.result(row, completed=True))
+                continue
+            
+            timer = self.get(user_id)
+            if timer.session_id == row['session_id']:
+                continue
+            if timer.is_active:
+                self._discard(user_id, timer)
+            timer.resume_session(
+                row['session_id'], row['mode'], row['duration_seconds'], row['started_at'], remaining
+            )
+            self._mark_active(user_id, timer)
+            self._claimed[user_id] = row['session_id']
+        return expired
+    
+    def _on_timer_complete(self, user_id, result):
+        """Bookkeeping for sessions completed by the scheduler
+        
+        Returns False when another process already stopped the session.
+        """
+        self._mark_finished(user_id)
+        if self.store is not None and not self.store.claim_finish(user_id, result['session_id']):
+            # Already stopped and persisted through another process
+            return False
+        if self.on_complete:
+            self.on_complete(result)
+        return True
+    
+    def _stored(self, user_id, session_id):
+        """Whether the store still holds this session for the user"""
+        row = self.store.get(user_id)
+        return row is not None and row['session_id'] == session_id
+    
+    def _drop_if_stopped(self, user_id, row):
+        """Stop the local timer of a stored session another process ended
+        
+        Only sessions this process saw in the store count: a timer between
+        its local start and claim_start has no row yet.
+        """
+        timer = self._timers.get(user_id)
+        if timer is None or not timer.is_active or self._claimed.get(user_id) != timer.session_id:
+            return
+        if row is None or row['session_id'] != timer.session_id:
+            self._discard(user_id, timer)
+    
+    def _discard(self, user_id, timer):
+        """Stop a local timer whose session is not (or no longer) in the store"""
+        timer.stop_session()
+        self._mark_finished(user_id)
+    
+    def _mark_active(self, user_id, timer):
+        """Move a user from the idle list to the active set"""
+        with self._lock:
+            # Reinstate the timer if it was evicted between get and start
+            self._timers.setdefault(user_id, timer)
+            self._active.add(user_id)
+            self._idle.pop(user_id, None)
+    
+    def _mark_finished(self, user_id):
+        """Move a user from the active set to the idle list"""
+        with self._lock:
+            self._active.discard(user_id)
+            self._claimed.pop(user_id, None)
+            self._mark_idle(user_id)
+    
+    def _mark_idle(self, user_id):
+        """Record an idle timer and evict the oldest ones (lock held)"""
+        self._idle[user_id] = True
+        self._idle.move_to_end(user_id)
+        
+        while len(self._idle) > self.max_idle:
+            idle_user, _ = self._idle.popitem(last=False)
+            timer = self._timers.get(idle_user)
+            # Keep timers that restarted or still have stream subscribers
+            if timer is not None and not timer.is_active and not timer.events.subscriber_count:
+                del self._timers[idle_user]
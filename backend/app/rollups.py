@@ -0,0 +1,242 @@
+"""Incrementally maintained analytics rollups"""
+from collections import Counter
+from datetime import date, datetime, timedelta, timezone
+from sqlalchemy import func
+from sqlalchemy.dialects.sqlite import insert
+from app.models import db, DailyStat, HourlyStat, StreakState, FocusSession, BlockAttempt
+from app.archive import current_archive
+
+STREAK_ROW_ID = 1
+
+def _upsert(table, key, **counts):
+    """Add counts to one rollup row inside the current transaction"""
+    stmt = insert(table).values(**key, **counts)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[table.c[name] for name in key],
+        set_={name: table.c[name] + stmt.excluded[name] for name in counts}
+    )
+    db.session.execute(stmt)
+
+def _upsert_daily(day, sessions=0, completed_sessions=0, minutes=0, block_attempts=0):
+    """Add deltas to one day's rollup row inside the current transaction"""
+    _upsert(
+        DailyStat.__table__,
+        {'date': day},
+        sessions=sessions,
+        completed_sessions=completed_sessions,
+        minutes=minutes,
+        block_attempts=block_attempts
+    )
+
+def local_date(timestamp):
+    """Local calendar date of a naive UTC timestamp (as stored by the models)"""
+    return timestamp.replace(tzinfo=timezone.utc).astimezone().date()
+
+def record_session(session):
+    """Fold a finished session into the daily and hourly rollups (caller commits)"""
+    _upsert_daily(
+        session.date,
+        sessions=1,
+        completed_sessions=1 if session.completed else 0,
+        minutes=session.completed_minutes
+    )
+    _upsert(
+        HourlyStat.__table__,
+        {'date': session.date, 'hour': session.started_at.hour, 'mode': session.mode},
+        sessions=1,
+        completed_sessions=1 if session.completed else 0,
+        minutes=session.completed_minutes
+    )
+    if session.completed:
+        record_completed_day(session.date)
+
+def get_streak_state():
+    """Fetch (or create) the single streak row"""
+    state = db.session.get(StreakState, STREAK_ROW_ID)
+    if state is None:
+        state = StreakState(id=STREAK_ROW_ID, current=0, best=0, total=0)
+        db.session.add(state)
+    return state
+
+def record_completed_day(day):
+    """Advance the running streak for a completed session (caller commits)"""
+    state = get_streak_state()
+    state.total += 1
+    
+    last = state.last_date
+    
+    if last is None or day > last + timedelta(days=1):
+        state.current = 1
+        state.last_date = day
+    elif day == last + timedelta(days=1):
+        state.current += 1
+        state.last_date = day
+    elif day < last - timedelta(days=state.current - 1):
+        # Late arrival for a day outside the current run: recount from rollup
+        rebuild_streaks(commit=False)
+        return
+    
+    state.best = max(state.best, state.current)
+
+def record_block_attempt(url, during_session=True, timestamp=None):
+    """Store a block attempt and count it in the daily rollup (caller commits)"""
+    attempt = BlockAttempt(
+        url=url,
+        timestamp=timestamp or datetime.utcnow(),
+        during_session=during_session
+    )
+    db.session.add(attempt)
+    _upsert_daily(local_date(attempt.timestamp), block_attempts=1)
+    return attempt
+
+def record_block_attempts(attempts):
+    """Store a batch of (url, during_session, timestamp) attempts (caller commits)
+    
+    One executemany for the rows and one rollup upsert per distinct day.
+    """
+    if not attempts:
+        return
+    db.session.execute(BlockAttempt.__table__.insert(), [
+        {'url': url, 'during_session': during_session, 'timestamp': timestamp}
+        for url, during_session, timestamp in attempts
+    ])
+    days = Counter(local_date(timestamp) for _, _, timestamp in attempts)
+    for day, count in days.items():
+        _upsert_daily(day, block_attempts=count)
+
+def rebuild_daily_stats():
+    """Recompute the daily and hourly rollups from the raw session and attempt
+    rows, in the database and the archive
+    """
+    db.session.query(DailyStat).delete()
+    
+    session_rows = db.session.query(
+        FocusSession.date,
+        func.count(FocusSession.id),
+        func.sum(db.case((FocusSession.completed == True, 1), else_=0)),
+        func.sum(FocusSession.completed_minutes)
+    ).filter(FocusSession.date.isnot(None)).group_by(FocusSession.date).all()
+    
+    for day, sessions, completed, minutes in session_rows:
+        _upsert_daily(day, sessions=sessions, completed_sessions=completed or 0, minutes=minutes or 0)
+    
+    # Attempt timestamps are UTC; bucket them by local day like sessions
+    attempt_day = func.date(BlockAttempt.timestamp, 'localtime')
+    attempt_rows = db.session.query(
+        attempt_day,
+        func.count(BlockAttempt.id)
+    ).group_by(attempt_day).all()
+    
+    for day, attempts in attempt_rows:
+        _upsert_daily(date.fromisoformat(day), block_attempts=attempts)
+    
+    # Archived rows still count
+    archived_days = {}
+    for day, _, _, completed, minutes in _archived_sessions():
+        sessions, completed_sessions, total = archived_days.get(day, (0, 0, 0))
+        archived_days[day] = (sessions + 1, completed_sessions + completed, total + minutes)
+    for day, (sessions, completed, minutes) in archived_days.items():
+        _upsert_daily(day, sessions=sessions, completed_sessions=completed, minutes=minutes)
+    
+    archived_attempts = Counter(
+        local_date(datetime.fromisoformat(record['timestamp']))
+        for record in current_archive().rows('block_attempts')
+    )
+    for day, attempts in archived_attempts.items():
+        _upsert_daily(day, block_attempts=attempts)
+    
+    rebuild_hourly_stats()
+    rebuild_streaks(commit=False)
+    db.session.commit()
+    session_days = {day for day, *_ in session_rows} | set(archived_days)
+    attempt_days = {date.fromisoformat(day) for day, _ in attempt_rows} | set(archived_attempts)
+    return len(session_days), len(attempt_days)
+
+def _archived_sessions():
+    """Yield (date, start hour, mode, completed, minutes) for archived sessions"""
+    for record in current_archive().rows('focus_sessions'):
+        if record['date'] is not None:
+            yield (
+                date.fromisoformat(record['date']),
+                datetime.fromisoformat(record['started_at']).hour,
+                record['mode'],
+                1 if record['completed'] else 0,
+                record['completed_minutes']
+            )
+
+def rebuild_hourly_stats():
+    """Recompute the hourly rollup from the raw and archived sessions (caller commits)"""
+    db.session.query(HourlyStat).delete()
+    
+    hour = db.cast(func.strftime('%H', FocusSession.started_at), db.Integer)
+    rows = db.session.query(
+        FocusSession.date,
+        hour,
+        FocusSession.mode,
+        func.count(FocusSession.id),
+        func.sum(db.case((FocusSession.completed == True, 1), else_=0)),
+        func.sum(FocusSession.completed_minutes)
+    ).filter(FocusSession.date.isnot(None)).group_by(FocusSession.date, hour, FocusSession.mode).all()
+    
+    if rows:
+        db.session.execute(HourlyStat.__table__.insert(), [{
+            'date': day,
+            'hour': start_hour,
+            'mode': mode,
+            'sessions': sessions,
+            'completed_sessions': completed or 0,
+            'minutes': minutes or 0
+        } for day, start_hour, mode, sessions, completed, minutes in rows])
+    
+    archived = {}
+    for day, hour, mode, completed, minutes in _archived_sessions():
+        sessions, completed_sessions, total = archived.get((day, hour, mode), (0, 0, 0))
+        archived[day, hour, mode] = (sessions + 1, completed_sessions + completed, total + minutes)
+    for (day, hour, mode), (sessions, completed, minutes) in archived.items():
+        _upsert(
+            HourlyStat.__table__,
+            {'date': day, 'hour': hour, 'mode': mode},
+            sessions=sessions,
+            completed_sessions=completed,
+            minutes=minutes
+        )
+    return len(rows) + len(archived)
+
+def rebuild_streaks(commit=True):
+    """Recompute the streak row from the daily rollup"""
+    db.session.flush()
+    days = db.session.query(
+        DailyStat.date,
+        DailyStat.completed_sessions
+    ).filter(
+        DailyStat.completed_sessions > 0
+    ).order_by(DailyStat.date).all()
+    
+    current = best = total = 0
+    last = None
+    for day, completed in days:
+        current = current + 1 if last is not None and day - last == timedelta(days=1) else 1
+        best = max(best, current)
+        total += completed
+        last = day
+    
+    state = get_streak_state()
+    state.current = current
+    state.best = best
+    state.total = total
+    state.last_date = last
+    
+    if commit:
+        db.session.commit()
+    return state
+
+def backfill_daily_stats():
+    """Build the rollups once for databases created before they existed"""
+    if DailyStat.query.first() is None and FocusSession.query.first() is not None:
+        rebuild_daily_stats()
+    elif db.session.get(StreakState, STREAK_ROW_ID) is None and DailyStat.query.first() is not None:
+        rebuild_streaks()
+    
+    if HourlyStat.query.first() is None and FocusSession.query.first() is not None:
+        rebuild_hourly_stats()
+        db.session.commit()
@@ -1,20 +1,121 @@
 """API routes for FocusGuard"""
-from flask import Blueprint, request, jsonify
+import io
+import queue
+import threading
+import time
+from flask import Blueprint, Response, current_app, request, jsonify, stream_with_context
 from datetime import datetime
-from app.models import db, FocusSession, BlockedSite, BlockAttempt, Setting
-from app.analytics import AnalyticsService
+from app.models import db, FocusSession, BlockedSite, BlockAttempt, Setting, BlocklistSubscription
+from app.analytics import AnalyticsService, encode_cursor
+from app.blocklist import import_sites, parse_blocklist, subscription_path, sync_subscription
+from app.events import format_sse
+from app.rollups import record_session
 
 api = Blueprint('api', __name__)
 
 # Global instances (will be set by app factory)
-timer_service = None
+session_registry = None
 blocker_service = None
+analytics_cache = None
+attempt_ingestor = None
+request_metrics = None
+# Open status streams this process still has threads for
+stream_slots = None
 
-def init_routes(timer, blocker):
+# The hosts file is shared by every user and worker process: serialize
+# "enable + start" against "last session ended + disable" so a concurrent
+# start is never unblocked
+blocking_lock = None
+
+def init_routes(registry, blocker, cache, ingestor, lock, metrics, max_streams):
     """Initialize routes with services"""
-    global timer_service, blocker_service
-    timer_service = timer
+    global session_registry, blocker_service, analytics_cache, attempt_ingestor, blocking_lock
+    global request_metrics, stream_slots
+    stream_slots = threading.BoundedSemaphore(max_streams)
+    session_registry = registry
     blocker_service = blocker
+    analytics_cache = cache
+    attempt_ingestor = ingestor
+    blocking_lock = lock
+    request_metrics = metrics
+
+@api.before_request
+def start_request_timing():
+    """Start timing the request and counting its SQL"""
+    request_metrics.start_request()
+
+@api.after_request
+def record_request_timing(response):
+    """Record latency and SQL cost for the endpoint"""
+    return request_metrics.finish_request(request.endpoint, request.method, response)
+
+def current_user_id():
+    """Resolve the user a request acts for"""
+    user_id = request.headers.get('X-User-Id') or request.args.get('user')
+    return user_id or current_app.config['DEFAULT_USER_ID']
+
+def finalize_session(result):
+    """Persist a finished session, then disable blocking if none are left
+    
+    The session is saved first: its active_sessions row is already gone,
+    so a blocking failure must not lose it. Blocking left on is cleared by
+    the next stop or reconcile.
+    """
+    session = save_session(result)
+    try:
+        with blocking_lock:
+            if session_registry.active_count() == 0:
+                blocker_service.disable_blocking()
+    except Exception:
+        current_app.logger.exception("Blocking not disabled after session %s", result['session_id'])
+    return session
+
+def save_session(result):
+    """Persist a finished session and its rollups"""
+    session = FocusSession(
+        session_id=result['session_id'],
+        mode=result.get('mode', 'custom'),
+        duration_minutes=result['duration_minutes'],
+        completed_minutes=result['completed_minutes'],
+        completed=result['completed'],
+        started_at=datetime.fromisoformat(result['started_at']),
+        ended_at=datetime.fromisoformat(result['ended_at']),
+        date=datetime.fromisoformat(result['started_at']).date()
+    )
+    db.session.add(session)
+    record_session(session)
+    db.session.commit()
+    analytics_cache.invalidate()
+    return session
+
+def reconcile_blocking():
+    """Apply or clear blocking to match the sessions that are running"""
+    site_urls = []
+    if session_registry.active_count():
+        site_urls = [site.url for site in BlockedSite.query.filter_by(is_active=True)]
+        db.session.close()
+    
+    with blocking_lock:
+        if session_registry.active_count() and site_urls:
+            blocker_service.enable_blocking(site_urls)
+        else:
+            blocker_service.disable_blocking()
+
+def cached_analytics(build, method, *args, ttl=None):
+    """Serve an analytics result from cache with ETag revalidation
+    
+    Entries are keyed by AnalyticsService.data_version(), so a session or
+    attempt saved by any worker process makes every worker recompute.
+    """
+    version = AnalyticsService.data_version()
+    value, etag = analytics_cache.get(method, *args, ttl=ttl, version=version)
+    if request.if_none_match.contains(etag):
+        response = Response(status=304)
+    else:
+        response = jsonify(build(value))
+    response.set_etag(etag)
+    response.headers['Cache-Control'] = 'no-cache'
+    return response
 
 # ==================== FOCUS SESSION ROUTES ====================
 
@@ -29,13 +130,20 @@ def start_focus():
         # Get active blocked sites
         blocked_sites = BlockedSite.query.filter_by(is_active=True).all()
         site_urls = [site.url for site in blocked_sites]
+        # Return the connection to the pool before waiting on the lock: the
+        # holder needs one to record its session
+        db.session.close()
         
-        # Enable blocking
-        if site_urls:
-            blocker_service.enable_blocking(site_urls)
+        with blocking_lock:
+            # Enable blocking
+            if site_urls:
+                blocker_service.enable_blocking(site_urls)
+            
+            # Start timer
+            result = session_registry.start_session(current_user_id(), duration, mode)
         
-        # Start timer
-        result = timer_service.start_session(duration, mode)
+        if 'error' in result:
+            return jsonify(result), 400
         
         return jsonify({'success': True, **result}), 200
     except Exception as e:
@@ -48,27 +156,13 @@ def stop_focus():
         data = request.json
         completed = data.get('completed', False)
         
-        result = timer_service.stop_session(completed)
+        result = session_registry.stop_session(current_user_id(), completed)
         
         if 'error' in result:
             return jsonify(result), 400
         
-        # Disable blocking
-        blocker_service.disable_blocking()
-        
-        # Save to database
-        session = FocusSession(
-            session_id=result['session_id'],
-            mode=result.get('mode', 'custom'),
-            duration_minutes=result['duration_minutes'],
-            completed_minutes=result['completed_minutes'],
-            completed=completed,
-            started_at=datetime.fromisoformat(result['started_at']),
-            ended_at=datetime.fromisoformat(result['ended_at']),
-            date=datetime.fromisoformat(result['started_at']).date().isoformat()
-        )
-        db.session.add(session)
-        db.session.commit()
+        # Disable blocking and save to database
+        finalize_session(result)
         
         return jsonify({'success': True, **result}), 200
     except Exception as e:
@@ -78,11 +172,87 @@ def stop_focus():
 def focus_status():
     """Get current focus status"""
     try:
-        status = timer_service.get_status()
+        status = session_registry.get_status(current_user_id())
         return jsonify(status), 200
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
+@api.route('/focus/stream', methods=['GET'])
+def focus_stream():
+    """Stream focus status changes as Server-Sent Events"""
+    # A stream holds its thread until the tab closes; past the limit the
+    # client polls /focus/status instead of starving API calls
+    if not stream_slots.acquire(blocking=False):
+        response = jsonify({'error': 'Too many open status streams'})
+        response.headers['Retry-After'] = str(current_app.config['SSE_KEEPALIVE_SECONDS'])
+        return response, 503
+    
+    try:
+        keepalive = current_app.config['SSE_KEEPALIVE_SECONDS']
+        poll = min(keepalive, current_app.config['STATE_POLL_SECONDS'])
+        user_id = current_user_id()
+        timer = session_registry.get(user_id)
+        events = timer.events.subscribe()
+        version = session_registry.state_version()
+        snapshot = {**session_registry.get_status(user_id), 'reason': 'snapshot'}
+    except Exception:
+        stream_slots.release()
+        raise
+    
+    def generate():
+        seen = version
+        last = (snapshot['is_active'], snapshot.get('session_id'))
+        idle_since = time.monotonic()
+        yield format_sse('status', snapshot)
+        while True:
+            try:
+                message = events.get(timeout=poll)
+            except queue.Empty:
+                message = None
+            
+            if message is not None:
+                # Local events are rare (start, stop, minute boundaries). The
+                # store has the final say: a local timer may still be running
+                # for a session another worker stopped
+                event, data = message
+                status = session_registry.get_status(user_id)
+                current = (status['is_active'], status.get('session_id'))
+                reason = data['reason'] if (data['is_active'], data.get('session_id')) == current else 'sync'
+                last = current
+                seen = session_registry.state_version()
+                idle_since = time.monotonic()
+                yield format_sse(event, {**status, 'reason': reason})
+                continue
+            
+            # Sessions started or stopped by another worker process never
+            # reach this process's broadcaster; the shared change marker
+            # says when the session table is worth reading again
+            current_version = session_registry.state_version()
+            if current_version != seen:
+                seen = current_version
+                status = session_registry.get_status(user_id)
+                current = (status['is_active'], status.get('session_id'))
+                if current != last:
+                    last = current
+                    idle_since = time.monotonic()
+                    yield format_sse('status', {**status, 'reason': 'sync'})
+                    continue
+            if time.monotonic() - idle_since >= keepalive:
+                idle_since = time.monotonic()
+                yield ': keepalive\n\n'
+    
+    def close():
+        timer.events.unsubscribe(events)
+        stream_slots.release()
+    
+    response = Response(generate(), mimetype='text/event-stream', headers={
+        'Cache-Control': 'no-cache',
+        'X-Accel-Buffering': 'no'
+    })
+    # Runs even when the client leaves before the first chunk is sent
+    response.call_on_close(close)
+    return response
+
 # ==================== BLOCKLIST ROUTES ====================
 
 @api.route('/blocklist', methods=['GET'])
@@ -123,6 +293,7 @@ def add_to_blocklist():
         site = BlockedSite(url=clean_url, category=category)
         db.session.add(site)
         db.session.commit()
+        analytics_cache.invalidate()
         
         return jsonify({'success': True, 'site': site.to_dict()}), 201
     except Exception as e:
@@ -138,6 +309,7 @@ def remove_from_blocklist(site_id):
         
         db.session.delete(site)
         db.session.commit()
+        analytics_cache.invalidate()
         
         return jsonify({'success': True}), 200
     except Exception as e:
@@ -151,24 +323,176 @@ def add_preset_category(category):
         if not sites:
             return jsonify({'error': 'Unknown category'}), 400
         
-        added = []
-        for url in sites:
-            existing = BlockedSite.query.filter_by(url=url).first()
-            if not existing:
-                site = BlockedSite(url=url, category=category)
-                db.session.add(site)
-                added.append(url)
+        result = import_sites(sites, category, blocker_service.validate_url)
+        db.session.commit()
+        analytics_cache.invalidate()
+        
+        # Presets are shorter than the sample, so this lists every added site
+        return jsonify({
+            'success': True,
+            'added_count': result['added'],
+            'sites': result['added_sample']
+        }), 201
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@api.route('/blocklist/bulk', methods=['POST'])
+def bulk_add_to_blocklist():
+    """Import many sites from a JSON array or an uploaded hosts/adblock list"""
+    try:
+        upload = request.files.get('file')
+        if upload is not None:
+            category = request.form.get('category', 'custom')
+            entries = parse_blocklist(
+                io.TextIOWrapper(upload.stream, encoding='utf-8', errors='replace'),
+                blocker_service.wildcards
+            )
+        else:
+            data = request.get_json(silent=True)
+            if isinstance(data, dict):
+                category = data.get('category', 'custom')
+                data = data.get('sites')
+            else:
+                category = 'custom'
+            if not isinstance(data, list):
+                return jsonify({'error': 'JSON array of sites or file upload required'}), 400
+            entries = (str(site) for site in data)
         
+        result = import_sites(entries, category, blocker_service.validate_url)
         db.session.commit()
+        analytics_cache.invalidate()
         
         return jsonify({
             'success': True,
-            'added_count': len(added),
-            'sites': added
+            'added_count': result['added'],
+            'duplicate_count': result['duplicates'],
+            'invalid_count': result['invalid'],
+            'invalid': result['invalid_sample']
         }), 201
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
+def subscription_result(result):
+    """Import counts for a subscription sync, without echoing file content"""
+    return {key: result[key] for key in ('added', 'invalid', 'duplicates')}
+
+@api.route('/blocklist/subscriptions', methods=['GET'])
+def get_subscriptions():
+    """List blocklist file subscriptions"""
+    try:
+        subscriptions = BlocklistSubscription.query.order_by(BlocklistSubscription.name).all()
+        return jsonify({
+            'success': True,
+            'subscriptions': [subscription.to_dict() for subscription in subscriptions]
+        }), 200
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@api.route('/blocklist/subscriptions', methods=['POST'])
+def add_subscription():
+    """Subscribe to a local blocklist file and import it"""
+    try:
+        data = request.json
+        name = data.get('name', '').strip()
+        path = data.get('path', '').strip()
+        
+        if not name or not path:
+            return jsonify({'error': 'Name and path required'}), 400
+        if len(name) > 40:
+            return jsonify({'error': 'Name too long'}), 400
+        path = subscription_path(current_app.config['SUBSCRIPTIONS_DIR'], path)
+        if BlocklistSubscription.query.filter_by(name=name).first():
+            return jsonify({'error': 'Subscription already exists'}), 400
+        
+        subscription = BlocklistSubscription(name=name, path=path)
+        db.session.add(subscription)
+        result = sync_subscription(subscription, blocker_service.validate_url,
+                                   wildcards=blocker_service.wildcards)
+        db.session.commit()
+        analytics_cache.invalidate()
+        
+        return jsonify({'success': True, 'subscription': subscription.to_dict(), **subscription_result(result)}), 201
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@api.route('/blocklist/subscriptions/<int:subscription_id>/sync', methods=['POST'])
+def sync_blocklist_subscription(subscription_id):
+    """Re-import a subscription if its file changed"""
+    try:
+        subscription = db.session.get(BlocklistSubscription, subscription_id)
+        if not subscription:
+            return jsonify({'error': 'Subscription not found'}), 404
+        
+        # Older subscriptions may predate the directory restriction
+        subscription_path(current_app.config['SUBSCRIPTIONS_DIR'], subscription.path)
+        force = request.args.get('force') == 'true'
+        result = sync_subscription(subscription, blocker_service.validate_url, force,
+                                   blocker_service.wildcards)
+        if result is None:
+            return jsonify({'success': True, 'skipped': True, 'subscription': subscription.to_dict()}), 200
+        
+        db.session.commit()
+        analytics_cache.invalidate()
+        
+        return jsonify({'success': True, 'skipped': False, 'subscription': subscription.to_dict(), **subscription_result(result)}), 200
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@api.route('/blocklist/subscriptions/<int:subscription_id>', methods=['DELETE'])
+def remove_subscription(subscription_id):
+    """Unsubscribe and remove the rules the list imported"""
+    try:
+        subscription = db.session.get(BlocklistSubscription, subscription_id)
+        if not subscription:
+            return jsonify({'error': 'Subscription not found'}), 404
+        
+        removed = BlockedSite.query.filter_by(category=subscription.category).delete()
+        db.session.delete(subscription)
+        db.session.commit()
+        analytics_cache.invalidate()
+        
+        return jsonify({'success': True, 'removed_count': removed}), 200
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+# ==================== BLOCK ATTEMPT ROUTES ====================
+
+@api.route('/attempts', methods=['POST'])
+def record_attempts():
+    """Queue block attempts ({"url": ...} or {"urls": [...]}) for batched writes"""
+    try:
+        data = request.json
+        urls = data.get('urls') or ([data['url']] if data.get('url') else [])
+        if not isinstance(urls, list) or not urls:
+            return jsonify({'error': 'URL required'}), 400
+        
+        during_session = session_registry.active_count() > 0
+        accepted = 0
+        for url in urls:
+            host = blocker_service.validate_url(str(url).strip().lower())
+            # Only visits to sites that are blocked right now are attempts
+            if host is None or not blocker_service.is_blocked(host):
+                continue
+            if not attempt_ingestor.submit(host, during_session):
+                # Backpressure: the writer is behind, tell the client to retry
+                response = jsonify({'error': 'Attempt queue full', 'accepted': accepted})
+                response.headers['Retry-After'] = '1'
+                return response, 503
+            accepted += 1
+        
+        return jsonify({'success': True, 'accepted': accepted}), 202
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@api.route('/attempts/stats', methods=['GET'])
+def attempt_stats():
+    """Block attempt ingestion counters"""
+    return jsonify(attempt_ingestor.stats()), 200
+
 # ==================== ANALYTICS ROUTES ====================
 
 @api.route('/analytics/overview', methods=['GET'])
@@ -176,8 +500,13 @@ def analytics_overview():
     """Get analytics overview"""
     try:
         days = request.args.get('days', 7, type=int)
-        stats = AnalyticsService.get_overview(days)
-        return jsonify({'success': True, 'data': stats}), 200
+        tz = request.args.get('tz') or None
+        return cached_analytics(
+            lambda stats: {'success': True, 'data': stats},
+            AnalyticsService.get_overview, days, tz
+        )
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
@@ -186,8 +515,13 @@ def analytics_daily():
     """Get daily statistics"""
     try:
         days = request.args.get('days', 30, type=int)
-        stats = AnalyticsService.get_daily_stats(days)
-        return jsonify({'success': True, 'data': stats}), 200
+        tz = request.args.get('tz') or None
+        return cached_analytics(
+            lambda stats: {'success': True, 'data': stats},
+            AnalyticsService.get_daily_stats, days, tz
+        )
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
@@ -195,23 +529,126 @@ def analytics_daily():
 def analytics_streaks():
     """Get streak information"""
     try:
-        streaks = AnalyticsService.get_streaks()
-        return jsonify({'success': True, **streaks}), 200
+        tz = request.args.get('tz') or None
+        return cached_analytics(
+            lambda streaks: {'success': True, **streaks},
+            AnalyticsService.get_streaks, tz
+        )
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@api.route('/analytics/heatmap', methods=['GET'])
+def analytics_heatmap():
+    """Get weekday x hour activity grids (server time zone unless tz is given)"""
+    try:
+        days = request.args.get('days', 30, type=int)
+        tz = request.args.get('tz') or None
+        return cached_analytics(
+            lambda grids: {'success': True, 'data': grids},
+            AnalyticsService.get_heatmap, days, tz
+        )
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@api.route('/analytics/insights', methods=['GET'])
+def analytics_insights():
+    """Get rolling averages, completion rates by mode and start hour, and how
+    block attempts relate to abandoned sessions (recomputed when sessions land)
+    """
+    try:
+        days = request.args.get('days', 90, type=int)
+        return cached_analytics(
+            lambda insights: {'success': True, 'data': insights},
+            AnalyticsService.get_insights, days,
+            ttl=current_app.config['INSIGHTS_CACHE_TTL']
+        )
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
 @api.route('/analytics/history', methods=['GET'])
 def analytics_history():
-    """Get session history"""
+    """Get a page of session history (pass next_cursor back as cursor)"""
     try:
         limit = request.args.get('limit', 50, type=int)
-        history = AnalyticsService.get_session_history(limit)
-        return jsonify({'success': True, 'sessions': history}), 200
+        if not 1 <= limit <= current_app.config['HISTORY_MAX_LIMIT']:
+            return jsonify({'error': f"limit must be between 1 and {current_app.config['HISTORY_MAX_LIMIT']}"}), 400
+        cursor = request.args.get('cursor')
+        
+        def build(history):
+            next_cursor = encode_cursor(history[-1]) if len(history) == limit else None
+            return {'success': True, 'sessions': history, 'next_cursor': next_cursor}
+        
+        return cached_analytics(build, AnalyticsService.get_session_history, limit, cursor)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
+@api.route('/analytics/export', methods=['GET'])
+def analytics_export():
+    """Stream the full session history as NDJSON or CSV"""
+    try:
+        export_format = request.args.get('format', 'ndjson')
+        if export_format == 'csv':
+            rows, mimetype = AnalyticsService.export_csv(), 'text/csv'
+        elif export_format == 'ndjson':
+            rows, mimetype = AnalyticsService.export_ndjson(), 'application/x-ndjson'
+        else:
+            return jsonify({'error': 'Unknown format'}), 400
+        
+        return Response(stream_with_context(rows), mimetype=mimetype, headers={
+            'Content-Disposition': f'attachment; filename=focus_sessions.{export_format}'
+        })
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@api.route('/analytics/dashboard', methods=['GET'])
+def analytics_dashboard():
+    """Get overview, daily breakdown, streaks and history in one response"""
+    try:
+        days = request.args.get('days', 7, type=int)
+        limit = request.args.get('limit', 10, type=int)
+        if not 1 <= limit <= current_app.config['HISTORY_MAX_LIMIT']:
+            return jsonify({'error': f"limit must be between 1 and {current_app.config['HISTORY_MAX_LIMIT']}"}), 400
+        tz = request.args.get('tz') or None
+        return cached_analytics(
+            lambda dashboard: {'success': True, **dashboard},
+            AnalyticsService.get_dashboard, days, limit, tz
+        )
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@api.route('/analytics/cache', methods=['GET'])
+def analytics_cache_stats():
+    """Get analytics cache hit/miss counters"""
+    return jsonify({'success': True, **analytics_cache.stats()}), 200
+
 # ==================== HEALTH CHECK ====================
 
+@api.route('/metrics', methods=['GET'])
+def metrics():
+    """Prometheus metrics: request latency, SQL cost, hosts writes, queues"""
+    try:
+        ingest = attempt_ingestor.stats()
+        cache = analytics_cache.stats()
+        body = request_metrics.render([
+            ('active_sessions', 'gauge', 'Running focus sessions', session_registry.active_count()),
+            ('attempts_queued', 'gauge', 'Block attempts waiting to be written', ingest['queued']),
+            ('attempts_written_total', 'counter', 'Block attempts written', ingest['written']),
+            ('attempts_dropped_total', 'counter', 'Block attempts dropped on a full queue', ingest['dropped']),
+            ('analytics_cache_hits_total', 'counter', 'Analytics cache hits', cache['hits']),
+            ('analytics_cache_misses_total', 'counter', 'Analytics cache misses', cache['misses'])
+        ])
+        return Response(body, mimetype='text/plain; version=0.0.4')
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
 @api.route('/health', methods=['GET'])
 def health_check():
     """Health check"""
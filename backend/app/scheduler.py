@@ -0,0 +1,98 @@
+"""Shared deadline scheduler for focus timers"""
+import heapq
+import itertools
+import logging
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+class ScheduledCall:
+    """Handle for a callback waiting in the scheduler"""
+    
+    __slots__ = ('deadline', 'callback', 'cancelled')
+    
+    def __init__(self, deadline, callback):
+        self.deadline = deadline
+        self.callback = callback
+        self.cancelled = False
+
+class TimerScheduler:
+    """Runs callbacks at monotonic deadlines from a single thread"""
+    
+    def __init__(self):
+        self._heap = []
+        self._counter = itertools.count()
+        self._condition = threading.Condition()
+        self._thread = None
+        self._cancelled = 0
+        self.wakeups = 0
+        self.fired = 0
+    
+    def schedule(self, deadline, callback):
+        """Run callback once time.monotonic() reaches deadline"""
+        call = ScheduledCall(deadline, callback)
+        with self._condition:
+            heapq.heappush(self._heap, (deadline, next(self._counter), call))
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, daemon=True)
+                self._thread.start()
+            elif self._heap[0][2] is call:
+                # New earliest deadline, wake the loop to shorten its sleep
+                self._condition.notify()
+        return call
+    
+    def call_later(self, delay, callback):
+        """Run callback after delay seconds"""
+        return self.schedule(time.monotonic() + delay, callback)
+    
+    def cancel(self, call):
+        """Cancel a pending call (removed lazily from the heap)"""
+        with self._condition:
+            if call.cancelled:
+                return
+            call.cancelled = True
+            self._cancelled += 1
+            if self._cancelled > 64 and self._cancelled > len(self._heap) // 2:
+                self._heap = [entry for entry in self._heap if not entry[2].cancelled]
+                heapq.heapify(self._heap)
+                self._cancelled = 0
+    
+    def pending(self):
+        """Number of live calls waiting to fire"""
+        with self._condition:
+            return len(self._heap) - self._cancelled
+    
+    def _run(self):
+        """Scheduler loop (runs in thread)"""
+        while True:
+            with self._condition:
+                while True:
+                    while self._heap and self._heap[0][2].cancelled:
+                        heapq.heappop(self._heap)
+                        self._cancelled -= 1
+                    if not self._heap:
+                        self._condition.wait()
+                    else:
+                        timeout = self._heap[0][0] - time.monotonic()
+                        if timeout <= 0:
+                            break
+                        self._condition.wait(timeout)
+                    self.wakeups += 1
+                
+                now = time.monotonic()
+                due = []
+                while self._heap and self._heap[0][0] <= now:
+                    call = heapq.heappop(self._heap)[2]
+                    if call.cancelled:
+                        self._cancelled -= 1
+                    else:
+                        call.cancelled = True
+                        due.append(call)
+            
+            for call in due:
+                self.fired += 1
+                try:
+                    call.callback()
+                except Exception:
+                    logger.exception("Scheduled timer callback failed")
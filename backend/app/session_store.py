@@ -0,0 +1,173 @@
+"""Session state shared between server processes"""
+import math
+import os
+import sqlite3
+import threading
+import time
+from datetime import datetime, timedelta
+from sqlalchemy import delete, func, select
+from sqlalchemy.exc import IntegrityError
+from app.models import ActiveSession
+
+try:
+    import fcntl
+except ImportError:
+    # Windows: single-process serving only, the thread lock still applies
+    fcntl = None
+
+class ProcessLock:
+    """Mutex held across threads and, through flock, across processes"""
+    
+    def __init__(self, path):
+        self.path = path
+        self._lock = threading.Lock()
+        self._file = None
+        self._pid = None
+    
+    def __enter__(self):
+        self._lock.acquire()
+        if fcntl is None:
+            return self
+        try:
+            # flock is per open file, so each process opens its own
+            if self._pid != os.getpid():
+                self._file = open(self.path, 'a')
+                self._pid = os.getpid()
+            fcntl.flock(self._file, fcntl.LOCK_EX)
+        except BaseException:
+            self._lock.release()
+            raise
+        return self
+    
+    def __exit__(self, *exc_info):
+        try:
+            if fcntl is not None:
+                fcntl.flock(self._file, fcntl.LOCK_UN)
+        finally:
+            self._lock.release()
+
+class ChangeMarker:
+    """Cheap signal that some connection committed to the database
+    
+    Reads SQLite's PRAGMA data_version on one dedicated connection, at most
+    once per interval however many status streams ask, so idle streams cost
+    no queries against the session table. Databases without a file are
+    only reachable from this process, whose own changes are broadcast, so
+    they never report one.
+    """
+    
+    def __init__(self, engine, interval):
+        self.interval = interval
+        database = engine.url.database
+        self._connection = None
+        if engine.url.get_backend_name() == 'sqlite' and database and database != ':memory:':
+            self._connection = sqlite3.connect(database, check_same_thread=False)
+        self._value = 0
+        self._checked_at = None
+        self._lock = threading.Lock()
+    
+    def value(self):
+        """A number that changes after commits from other connections"""
+        if self._connection is None:
+            return 0
+        with self._lock:
+            now = time.monotonic()
+            if self._checked_at is None or now - self._checked_at >= self.interval:
+                self._value = self._connection.execute('PRAGMA data_version').fetchone()[0]
+                self._checked_at = now
+            return self._value
+
+class SessionStore:
+    """Active sessions kept in the database so any worker can serve them
+    
+    Starting inserts the user's row (the primary key rejects a second
+    session) and finishing deletes it: whichever process deletes the row
+    owns the finished session, so it is persisted exactly once.
+    """
+    
+    def __init__(self, engine, poll_seconds=2):
+        self.engine = engine
+        self.table = ActiveSession.__table__
+        self.changes = ChangeMarker(engine, poll_seconds)
+    
+    def claim_start(self, user_id, result, duration_seconds):
+        """Record a started session; False if the user already has one"""
+        try:
+            with self.engine.begin() as conn:
+                conn.execute(self.table.insert().values(
+                    user_id=user_id,
+                    session_id=result['session_id'],
+                    mode=result['mode'],
+                    duration_seconds=duration_seconds,
+                    started_at=datetime.fromisoformat(result['started_at']),
+                    deadline=time.time() + duration_seconds
+                ))
+        except IntegrityError:
+            return False
+        return True
+    
+    def claim_finish(self, user_id, session_id):
+        """Remove a session; True only for the one caller that removed it"""
+        with self.engine.begin() as conn:
+            deleted = conn.execute(delete(self.table).where(
+                self.table.c.user_id == user_id,
+                self.table.c.session_id == session_id
+            ))
+        return deleted.rowcount == 1
+    
+    def get(self, user_id):
+        """The user's active session row, or None"""
+        with self.engine.connect() as conn:
+            return conn.execute(
+                select(self.table).where(self.table.c.user_id == user_id)
+            ).mappings().first()
+    
+    def all(self):
+        """Every running session row, soonest deadline first"""
+        with self.engine.connect() as conn:
+            return conn.execute(
+                select(self.table).order_by(self.table.c.deadline)
+            ).mappings().all()
+    
+    def active_count(self):
+        """Number of running sessions across all processes"""
+        with self.engine.connect() as conn:
+            return conn.execute(select(func.count()).select_from(self.table)).scalar()
+    
+    @staticmethod
+    def status(row):
+        """Timer status for a session row, same shape as FocusTimer.get_status"""
+        now = time.time()
+        remaining = max(0.0, row['deadline'] - now)
+        duration = row['duration_seconds']
+        progress = ((duration - remaining) / duration * 100) if duration > 0 else 0
+        return {
+            'is_active': True,
+            'session_id': row['session_id'],
+            'mode': row['mode'],
+            'time_remaining': math.ceil(remaining),
+            'duration_seconds': duration,
+            'progress_percent': round(progress, 2),
+            'started_at': row['started_at'].isoformat(),
+            'deadline_ms': int(row['deadline'] * 1000),
+            'server_time_ms': int(now * 1000)
+        }
+    
+    @staticmethod
+    def result(row, completed):
+        """Finished-session summary for a row whose timer lives elsewhere
+        
+        Elapsed time comes from the wall clock, capped at the deadline, so a
+        session that expired while no process was running keeps its minutes.
+        """
+        duration = row['duration_seconds']
+        elapsed = min(duration, max(0.0, time.time() - (row['deadline'] - duration)))
+        return {
+            'session_id': row['session_id'],
+            'completed': completed,
+            'completed_minutes': round(elapsed / 60, 2),
+            'duration_minutes': duration / 60,
+            'mode': row['mode'],
+            'started_at': row['started_at'].isoformat(),
+            'ended_at': (row['started_at'] + timedelta(seconds=elapsed)).isoformat()
+        }
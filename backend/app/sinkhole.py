@@ -0,0 +1,263 @@
+"""Local DNS sinkhole resolver blocking backend"""
+import asyncio
+import ipaddress
+import logging
+import struct
+import threading
+import time
+from app.blocker import BlockingBackend, REDIRECT_IP
+from app.matcher import DomainMatcher
+
+TYPE_A = 1
+TYPE_AAAA = 28
+CLASS_IN = 1
+# Seconds to wait for an upstream answer before forgetting the query
+UPSTREAM_TIMEOUT = 5.0
+
+logger = logging.getLogger(__name__)
+
+def parse_question(packet):
+    """Return (query id, flags, lowercased name, qtype, end offset) or None"""
+    if len(packet) < 12:
+        return None
+    query_id, flags, qdcount = struct.unpack_from('!HHH', packet)
+    if flags & 0x8000 or qdcount < 1:
+        return None
+    
+    labels = []
+    offset = 12
+    while True:
+        if offset >= len(packet):
+            return None
+        length = packet[offset]
+        offset += 1
+        if length == 0:
+            break
+        if length & 0xC0 or offset + length > len(packet):
+            return None
+        labels.append(packet[offset:offset + length])
+        offset += length
+    
+    if offset + 4 > len(packet):
+        return None
+    qtype, = struct.unpack_from('!H', packet, offset)
+    name = b'.'.join(labels).decode('ascii', 'replace').lower()
+    return query_id, flags, name, qtype, offset + 4
+
+def build_answer(packet, flags, question_end, qtype, redirect):
+    """Answer the query's first question with the redirect address"""
+    if qtype == TYPE_A and redirect.version == 4:
+        rdata = redirect.packed
+    elif qtype == TYPE_AAAA:
+        rdata = redirect.packed if redirect.version == 6 else ipaddress.IPv6Address('::1').packed
+    else:
+        rdata = None
+    
+    # QR + copied opcode/RD + RA, NOERROR
+    response_flags = 0x8000 | (flags & 0x7900) | 0x0080
+    header = struct.pack('!HHHHHH', struct.unpack_from('!H', packet)[0],
+                         response_flags, 1, 1 if rdata else 0, 0, 0)
+    question = packet[12:question_end]
+    if not rdata:
+        return header + question
+    # Name is a pointer to the question; TTL 0 so unblocking applies at once
+    answer = struct.pack('!HHHIH', 0xC00C, qtype, CLASS_IN, 0, len(rdata)) + rdata
+    return header + question + answer
+
+class _ClientProtocol(asyncio.DatagramProtocol):
+    def __init__(self, sinkhole):
+        self.sinkhole = sinkhole
+    
+    def connection_made(self, transport):
+        self.sinkhole._client_transport = transport
+    
+    def datagram_received(self, data, addr):
+        self.sinkhole._handle_query(data, addr)
+
+class _UpstreamProtocol(asyncio.DatagramProtocol):
+    def __init__(self, sinkhole):
+        self.sinkhole = sinkhole
+    
+    def connection_made(self, transport):
+        self.sinkhole._upstream_transport = transport
+    
+    def datagram_received(self, data, addr):
+        self.sinkhole._handle_upstream(data)
+
+class DnsSinkhole:
+    """UDP resolver that answers blocked names from an in-memory domain trie
+    and forwards everything else to an upstream resolver.
+    """
+    
+    def __init__(self, host='127.0.0.1', port=5300, upstream=('1.1.1.1', 53),
+                 redirect_ip=REDIRECT_IP):
+        self.host = host
+        self.port = port
+        self.upstream = upstream
+        self.redirect = ipaddress.ip_address(redirect_ip)
+        self.matcher = DomainMatcher()
+        self.active = False
+        self.on_blocked = None
+        self.queries = 0
+        self.sinkholed = 0
+        self.forwarded = 0
+        self.dropped = 0
+        self._pending = {}
+        self._next_id = 0
+        self._loop = None
+        self._thread = None
+        self._client_transport = None
+        self._upstream_transport = None
+    
+    def is_blocked(self, name):
+        """Whether a query name is currently sinkholed"""
+        return self.active and name in self.matcher
+    
+    def start(self):
+        """Start serving on a background event loop thread"""
+        if self._thread is not None:
+            return
+        ready = threading.Event()
+        errors = []
+        
+        def serve():
+            self._loop = asyncio.new_event_loop()
+            try:
+                self._loop.run_until_complete(self._bind())
+            except Exception as e:
+                # Nothing bound; a later start() tries again
+                self._loop.close()
+                self._loop = None
+                errors.append(e)
+                ready.set()
+                return
+            ready.set()
+            self._loop.call_later(UPSTREAM_TIMEOUT, self._expire_pending)
+            self._loop.run_forever()
+        
+        self._thread = threading.Thread(target=serve, daemon=True)
+        self._thread.start()
+        ready.wait()
+        if errors:
+            self._thread = None
+            raise errors[0]
+    
+    async def _bind(self):
+        await self._loop.create_datagram_endpoint(
+            lambda: _ClientProtocol(self), local_addr=(self.host, self.port))
+        await self._loop.create_datagram_endpoint(
+            lambda: _UpstreamProtocol(self), remote_addr=self.upstream)
+        # Report the real port when bound to port 0
+        self.port = self._client_transport.get_extra_info('sockname')[1]
+    
+    def stop(self):
+        """Stop serving"""
+        if self._loop is None:
+            return
+        
+        def shutdown():
+            self._client_transport.close()
+            self._upstream_transport.close()
+            # After the transports' close callbacks, which release the sockets
+            self._loop.call_soon(self._loop.stop)
+        
+        self._loop.call_soon_threadsafe(shutdown)
+        self._thread.join()
+        self._loop.close()
+        self._loop = None
+        self._thread = None
+    
+    def _handle_query(self, data, addr):
+        """Answer or forward one client query (event loop thread)"""
+        question = parse_question(data)
+        if question is None:
+            self.dropped += 1
+            return
+        query_id, flags, name, qtype, question_end = question
+        self.queries += 1
+        
+        if self.is_blocked(name):
+            self.sinkholed += 1
+            if self.on_blocked:
+                self.on_blocked(name)
+            self._client_transport.sendto(
+                build_answer(data, flags, question_end, qtype, self.redirect), addr)
+            return
+        
+        # Re-key the query so ids from different clients cannot collide
+        for _ in range(0x10000):
+            self._next_id = (self._next_id + 1) & 0xFFFF
+            if self._next_id not in self._pending:
+                break
+        else:
+            self.dropped += 1
+            return
+        upstream_id = self._next_id
+        self._pending[upstream_id] = (addr, query_id, time.monotonic())
+        self.forwarded += 1
+        self._upstream_transport.sendto(struct.pack('!H', upstream_id) + data[2:])
+    
+    def _handle_upstream(self, data):
+        """Relay an upstream answer back to its client (event loop thread)"""
+        if len(data) < 12:
+            return
+        upstream_id, = struct.unpack_from('!H', data)
+        pending = self._pending.pop(upstream_id, None)
+        if pending is None:
+            return
+        addr, query_id, _ = pending
+        self._client_transport.sendto(struct.pack('!H', query_id) + data[2:], addr)
+    
+    def _expire_pending(self):
+        """Forget upstream queries that never got an answer"""
+        cutoff = time.monotonic() - UPSTREAM_TIMEOUT
+        expired = [key for key, (_, _, sent) in self._pending.items() if sent < cutoff]
+        for key in expired:
+            del self._pending[key]
+        self.dropped += len(expired)
+        self._loop.call_later(UPSTREAM_TIMEOUT, self._expire_pending)
+    
+    def stats(self):
+        """Counters for monitoring"""
+        return {
+            'active': self.active,
+            'blocked_rules': len(self.matcher),
+            'queries': self.queries,
+            'sinkholed': self.sinkholed,
+            'forwarded': self.forwarded,
+            'dropped': self.dropped
+        }
+
+class DnsSinkholeBackend(BlockingBackend):
+    """Blocks sites by sinkholing them in the local resolver, no file I/O"""
+    
+    wildcards = True
+    
+    def __init__(self, sinkhole):
+        self.sinkhole = sinkhole
+        sinkhole.on_blocked = self._report
+    
+    def _report(self, name):
+        """Forward a sinkholed lookup to the attempt hook (event loop thread)"""
+        if self.on_attempt:
+            self.on_attempt(name)
+    
+    def enable(self, matcher):
+        """Swap in the compiled matcher and flip blocking on"""
+        # The resolver binds on first use, so processes that never block
+        # (the debug reloader's parent) leave the port to the one that does
+        try:
+            self.sinkhole.start()
+        except OSError as e:
+            logger.warning("DNS sinkhole not started on %s:%d: %s",
+                           self.sinkhole.host, self.sinkhole.port, e)
+            raise
+        # Single reference assignment; the loop thread sees old or new trie
+        self.sinkhole.matcher = matcher
+        self.sinkhole.active = True
+        return True
+    
+    def disable(self):
+        """Flip blocking off"""
+        self.sinkhole.active = False
+        return True
@@ -1,63 +1,111 @@
-"""Focus timer management with threading"""
+"""Focus timer management with a shared deadline scheduler"""
+import math
 import threading
 import time
 import uuid
 from datetime import datetime
+from app.events import EventBroadcaster
+from app.scheduler import TimerScheduler
 
 class FocusTimer:
     """Manages focus sessions"""
     
-    def __init__(self, blocker):
+    def __init__(self, blocker, scheduler=None):
         self.blocker = blocker
+        self.scheduler = scheduler or TimerScheduler()
         self.is_active = False
         self.session_id = None
         self.start_time = None
         self.duration_seconds = 0
-        self.time_remaining = 0
+        self.deadline = None
         self.mode = None
-        self.timer_thread = None
-        self._stop_event = threading.Event()
+        self._pending = None
+        self._lock = threading.RLock()
+        self.events = EventBroadcaster()
+        self.on_complete = None
+        # Called with the session id before each minute boundary and the
+        # deadline; returning False means the session was stopped elsewhere
+        self.still_active = None
     
-    def start_session(self, duration_minutes, mode='custom'):
-        """Start a focus session"""
-        if self.is_active:
-            return {'error': 'Session already active'}
-        
-        self.session_id = str(uuid.uuid4())
-        self.duration_seconds = duration_minutes * 60
-        self.time_remaining = self.duration_seconds
-        self.mode = mode
-        self.start_time = datetime.now()
-        self.is_active = True
-        self._stop_event.clear()
-        
-        # Start countdown thread
-        self.timer_thread = threading.Thread(target=self._countdown, daemon=True)
-        self.timer_thread.start()
-        
-        return {
-            'session_id': self.session_id,
-            'duration': duration_minutes,
-            'mode': mode,
-            'started_at': self.start_time.isoformat()
-        }
+    @property
+    def time_remaining(self):
+        """Seconds left in the active session, derived from the deadline"""
+        if not self.is_active:
+            return 0
+        return max(0.0, self.deadline - time.monotonic())
+    
+    def start_session(self, duration_minutes, mode='custom', announce=True):
+        """Start a focus session (announce=False leaves the 'start' event to the caller)"""
+        with self._lock:
+            if self.is_active:
+                return {'error': 'Session already active'}
+            
+            self.session_id = str(uuid.uuid4())
+            self.duration_seconds = duration_minutes * 60
+            self.mode = mode
+            self.start_time = datetime.now()
+            self.deadline = time.monotonic() + self.duration_seconds
+            self.is_active = True
+            self._arm()
+            
+            if announce:
+                self.publish('start')
+            
+            return {
+                'session_id': self.session_id,
+                'duration': duration_minutes,
+                'mode': mode,
+                'started_at': self.start_time.isoformat()
+            }
+    
+    def resume_session(self, session_id, mode, duration_seconds, start_time, remaining):
+        """Re-arm a session recovered after a restart"""
+        with self._lock:
+            if self.is_active:
+                return {'error': 'Session already active'}
+            
+            self.session_id = session_id
+            self.duration_seconds = duration_seconds
+            self.mode = mode
+            self.start_time = start_time
+            self.deadline = time.monotonic() + remaining
+            self.is_active = True
+            self._arm()
+            
+            self.publish('resume')
+            
+            return {
+                'session_id': self.session_id,
+                'duration': duration_seconds / 60,
+                'mode': mode,
+                'started_at': self.start_time.isoformat()
+            }
     
     def stop_session(self, completed=False):
         """Stop the current session"""
-        if not self.is_active:
-            return {'error': 'No active session'}
-        
-        elapsed_seconds = (datetime.now() - self.start_time).total_seconds()
-        completed_minutes = elapsed_seconds / 60
+        with self._lock:
+            if not self.is_active:
+                return {'error': 'No active session'}
+            
+            result = self._finish(completed)
+            self.publish('complete' if completed else 'stop')
+            return result
+    
+    def _finish(self, completed):
+        """End the active session and return its summary"""
+        if self._pending is not None:
+            self.scheduler.cancel(self._pending)
+            self._pending = None
         
+        elapsed_seconds = self.duration_seconds - self.time_remaining
         self.is_active = False
-        self._stop_event.set()
         
         result = {
             'session_id': self.session_id,
             'completed': completed,
-            'completed_minutes': round(completed_minutes, 2),
+            'completed_minutes': round(elapsed_seconds / 60, 2),
             'duration_minutes': self.duration_seconds / 60,
+            'mode': self.mode,
             'started_at': self.start_time.isoformat(),
             'ended_at': datetime.now().isoformat()
         }
@@ -65,38 +113,86 @@ class FocusTimer:
         # Reset
         self.session_id = None
         self.start_time = None
-        self.time_remaining = 0
+        self.deadline = None
         
         return result
     
-    def _countdown(self):
-        """Countdown timer (runs in thread)"""
-        while self.is_active and self.time_remaining > 0 and not self._stop_event.is_set():
-            time.sleep(1)
-            self.time_remaining -= 1
+    def _arm(self):
+        """Schedule the next minute boundary or the session deadline"""
+        minutes_left = math.ceil(self.time_remaining / 60) - 1
+        if minutes_left > 0:
+            fire_at = self.deadline - minutes_left * 60
+            callback = self._on_minute
+        else:
+            fire_at = self.deadline
+            callback = self._on_deadline
         
-        # Timer completed
-        if self.is_active and self.time_remaining <= 0:
-            self.stop_session(completed=True)
+        session_id = self.session_id
+        self._pending = self.scheduler.schedule(fire_at, lambda: callback(session_id))
+    
+    def _ended_elsewhere(self, session_id):
+        """Drop a session stopped by another process; True if it was"""
+        if self.still_active is None or self.still_active(session_id):
+            return False
+        with self._lock:
+            if self.is_active and session_id == self.session_id:
+                self._finish(completed=False)
+                self.publish('stop')
+        return True
+    
+    def _on_minute(self, session_id):
+        """Publish a minute boundary and re-arm (runs on scheduler thread)"""
+        if self._ended_elsewhere(session_id):
+            return
+        with self._lock:
+            if not self.is_active or session_id != self.session_id:
+                return
+            self._arm()
+            self.publish('minute')
+    
+    def _on_deadline(self, session_id):
+        """Complete the session at its deadline (runs on scheduler thread)"""
+        if self._ended_elsewhere(session_id):
+            return
+        with self._lock:
+            if not self.is_active or session_id != self.session_id:
+                return
+            result = self._finish(completed=True)
+        
+        # on_complete returns False when someone else already ended the session
+        if self.on_complete and self.on_complete(result) is False:
+            self.publish('stop')
+            return
+        self.publish('complete')
+    
+    def publish(self, reason):
+        """Push the current status to stream subscribers"""
+        self.events.publish('status', {**self.get_status(), 'reason': reason})
     
     def get_status(self):
         """Get current timer status"""
-        if not self.is_active:
+        with self._lock:
+            if not self.is_active:
+                return {
+                    'is_active': False,
+                    'time_remaining': 0,
+                    'progress_percent': 0,
+                    'server_time_ms': int(time.time() * 1000)
+                }
+            
+            remaining = self.time_remaining
+            elapsed = self.duration_seconds - remaining
+            progress = (elapsed / self.duration_seconds * 100) if self.duration_seconds > 0 else 0
+            now = time.time()
+            
             return {
-                'is_active': False,
-                'time_remaining': 0,
-                'progress_percent': 0
+                'is_active': True,
+                'session_id': self.session_id,
+                'mode': self.mode,
+                'time_remaining': math.ceil(remaining),
+                'duration_seconds': self.duration_seconds,
+                'progress_percent': round(progress, 2),
+                'started_at': self.start_time.isoformat() if self.start_time else None,
+                'deadline_ms': int((now + remaining) * 1000),
+                'server_time_ms': int(now * 1000)
             }
-        
-        elapsed = self.duration_seconds - self.time_remaining
-        progress = (elapsed / self.duration_seconds * 100) if self.duration_seconds > 0 else 0
-        
-        return {
-            'is_active': True,
-            'session_id': self.session_id,
-            'mode': self.mode,
-            'time_remaining': self.time_remaining,
-            'duration_seconds': self.duration_seconds,
-            'progress_percent': round(progress, 2),
-            'started_at': self.start_time.isoformat() if self.start_time else None
-        }
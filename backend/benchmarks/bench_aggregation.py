@@ -0,0 +1,126 @@
+"""Time-zone-aware aggregation benchmark at a million sessions
+
+Fills a temporary database with --sessions focus sessions spread evenly
+over the last --days days (far denser than benchmarks.synthetic, whose
+clock would run years past its end date at this scale) and --attempts
+block attempts, then times the aggregation engine: the first call, which
+loads the columns, warm calls per endpoint and zone, and a call right
+after new sessions land. Exits non-zero when a warm call's median goes
+over --budget-ms.
+
+Run from the backend directory:
+    python -m benchmarks.bench_aggregation --sessions 1000000 --budget-ms 250
+"""
+import argparse
+import os
+import random
+import statistics
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+from benchmarks.synthetic import MODES, insert_batches
+
+ZONES = ['UTC', 'America/New_York', 'Asia/Kolkata', 'Pacific/Auckland']
+
+def session_rows(rng, count, days, now, prefix='bench'):
+    """Yield focus_sessions rows at random times in the last N days"""
+    modes = [mode for mode, _, weight in MODES for _ in range(weight)]
+    minutes = {mode: planned for mode, planned, _ in MODES}
+    span = days * 86400
+    for number in range(count):
+        mode = rng.choice(modes)
+        planned = minutes[mode]
+        completed = rng.random() < 0.82
+        done = planned if completed else round(rng.uniform(1, planned * 0.9), 2)
+        started = now - timedelta(seconds=rng.random() * span)
+        yield {
+            'session_id': f"{prefix}-{number}",
+            'mode': mode,
+            'duration_minutes': planned,
+            'completed_minutes': done,
+            'completed': completed,
+            'started_at': started,
+            'ended_at': started + timedelta(minutes=done),
+            'date': started.date()
+        }
+
+def attempt_rows(rng, count, days):
+    """Yield block_attempts rows at random times in the last N days"""
+    span = days * 86400
+    utc_now = datetime.utcnow()
+    for _ in range(count):
+        yield {
+            'url': 'youtube.com',
+            'timestamp': utc_now - timedelta(seconds=rng.random() * span),
+            'during_session': True
+        }
+
+def timed(run, repeat):
+    """Median milliseconds per call"""
+    samples = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        run()
+        samples.append((time.perf_counter() - started) * 1000)
+    return statistics.median(samples)
+
+def run(args):
+    workdir = tempfile.mkdtemp(prefix='focusguard-bench-')
+    os.environ['DATABASE_URL'] = f"sqlite:///{os.path.join(workdir, 'bench.db')}"
+    os.environ['FOCUSGUARD_HOSTS_FILE'] = os.path.join(workdir, 'hosts')
+    os.environ['FOCUSGUARD_LOCK_FILE'] = os.path.join(workdir, 'focusguard.lock')
+    open(os.environ['FOCUSGUARD_HOSTS_FILE'], 'w').close()
+    
+    from app import create_app
+    from app.analytics import AnalyticsService
+    from app.models import db, FocusSession, BlockAttempt
+    
+    app = create_app('production')
+    rng = random.Random(args.seed)
+    now = datetime.now()
+    with app.app_context():
+        started = time.perf_counter()
+        sessions = insert_batches(db, FocusSession.__table__, session_rows(rng, args.sessions, args.days, now))
+        attempts = insert_batches(db, BlockAttempt.__table__, attempt_rows(rng, args.attempts, args.days))
+        db.session.commit()
+        print(f"seeded {sessions} sessions, {attempts} attempts in {time.perf_counter() - started:.1f}s\n")
+        
+        started = time.perf_counter()
+        AnalyticsService.get_overview(30, 'UTC')
+        print(f"first call (loads columns)        {(time.perf_counter() - started) * 1000:9.1f} ms")
+        
+        over_budget = []
+        for zone in ZONES:
+            for name, call in (
+                ('overview_30d', lambda: AnalyticsService.get_overview(30, zone)),
+                ('daily_365d', lambda: AnalyticsService.get_daily_stats(365, zone)),
+                ('streaks', lambda: AnalyticsService.get_streaks(zone)),
+                ('heatmap_365d', lambda: AnalyticsService.get_heatmap(365, zone))
+            ):
+                median = timed(call, args.repeat)
+                label = f"{name} [{zone}]"
+                print(f"{label:<34}{median:9.1f} ms")
+                if median > args.budget_ms:
+                    over_budget.append(label)
+        
+        insert_batches(db, FocusSession.__table__, session_rows(rng, 100, 1, now, prefix='bench-new'))
+        db.session.commit()
+        started = time.perf_counter()
+        AnalyticsService.get_overview(30, 'UTC')
+        print(f"after 100 new sessions            {(time.perf_counter() - started) * 1000:9.1f} ms")
+    
+    for label in over_budget:
+        print(f"OVER BUDGET: {label} > {args.budget_ms} ms")
+    return not over_budget
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--sessions', type=int, default=1000000)
+    parser.add_argument('--attempts', type=int, default=1000000)
+    parser.add_argument('--days', type=int, default=730)
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--budget-ms', type=float, default=250)
+    args = parser.parse_args()
+    raise SystemExit(0 if run(args) else 1)
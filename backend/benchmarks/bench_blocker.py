@@ -0,0 +1,91 @@
+"""Measure hosts-file start/stop latency on a large ad-block style file
+
+Run from the backend directory:
+    python -m benchmarks.bench_blocker --lines 100000
+"""
+import argparse
+import os
+import statistics
+import tempfile
+import time
+from datetime import datetime
+from app.blocker import WebsiteBlocker
+
+class LegacyBlocker:
+    """The original read-modify-rewrite implementation"""
+    
+    REDIRECT_IP = "127.0.0.1"
+    
+    def __init__(self, hosts_path):
+        self.hosts_path = hosts_path
+    
+    def _strip(self, content):
+        if '# FocusGuard START' in content:
+            start = content.find('# FocusGuard START')
+            end = content.find('# FocusGuard END')
+            if end > start:
+                content = content[:start] + content[end + len('# FocusGuard END\n'):]
+        return content
+    
+    def enable_blocking(self, sites):
+        with open(self.hosts_path, 'r') as f:
+            content = self._strip(f.read())
+        if sites:
+            block_section = '\n# FocusGuard START\n'
+            block_section += f'# Updated: {datetime.now().isoformat()}\n'
+            for site in sites:
+                block_section += f"{self.REDIRECT_IP} {site}\n"
+            block_section += '# FocusGuard END\n'
+            content += block_section
+        with open(self.hosts_path, 'w') as f:
+            f.write(content)
+    
+    def disable_blocking(self):
+        with open(self.hosts_path, 'r') as f:
+            content = self._strip(f.read())
+        with open(self.hosts_path, 'w') as f:
+            f.write(content)
+
+def write_hosts(path, lines):
+    with open(path, 'w') as f:
+        f.write('127.0.0.1 localhost\n::1 localhost\n# Ad-block list\n')
+        for i in range(lines):
+            f.write(f"0.0.0.0 ads{i}.tracker{i % 997}.example.com\n")
+
+def measure(blocker, sites, cycles):
+    start_ms, restart_ms, stop_ms = [], [], []
+    for _ in range(cycles):
+        started = time.perf_counter()
+        blocker.enable_blocking(sites)
+        start_ms.append((time.perf_counter() - started) * 1000)
+        
+        # A second start with the same blocklist (e.g. another user starting)
+        started = time.perf_counter()
+        blocker.enable_blocking(sites)
+        restart_ms.append((time.perf_counter() - started) * 1000)
+        
+        started = time.perf_counter()
+        blocker.disable_blocking()
+        stop_ms.append((time.perf_counter() - started) * 1000)
+    return start_ms, restart_ms, stop_ms
+
+def run(lines, sites, cycles):
+    workdir = tempfile.mkdtemp(prefix='focusguard-bench-')
+    site_list = [f"site{i}.com" for i in range(sites)]
+    
+    print(f"hosts lines: {lines}, blocked sites: {sites}, cycles: {cycles}")
+    print(f"{'':<10}{'start':>14}{'same-set start':>18}{'stop':>14}")
+    for name, factory in (('legacy', LegacyBlocker), ('current', WebsiteBlocker)):
+        path = os.path.join(workdir, f'hosts-{name}')
+        write_hosts(path, lines)
+        start_ms, restart_ms, stop_ms = measure(factory(path), site_list, cycles)
+        print(f"{name:<10}{statistics.median(start_ms):>11.2f} ms"
+              f"{statistics.median(restart_ms):>15.3f} ms{statistics.median(stop_ms):>11.2f} ms")
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--lines', type=int, default=100000)
+    parser.add_argument('--sites', type=int, default=50)
+    parser.add_argument('--cycles', type=int, default=20)
+    args = parser.parse_args()
+    run(args.lines, args.sites, args.cycles)
@@ -0,0 +1,80 @@
+"""Bulk blocklist import benchmark
+
+Uploads a synthetic hosts-format public list to /api/blocklist/bulk and
+compares with the old one-SELECT-per-site insert loop.
+
+Run from the backend directory:
+    python -m benchmarks.bench_blocklist_import --entries 50000
+"""
+import argparse
+import io
+import os
+import tempfile
+import time
+
+def make_list(entries):
+    lines = ['# Synthetic public blocklist', '127.0.0.1 localhost', '']
+    for i in range(entries):
+        if i % 10 == 0:
+            lines.append(f"||tracker{i}.net^")
+        else:
+            lines.append(f"0.0.0.0 ads{i}.example.com")
+    return '\n'.join(lines) + '\n'
+
+def legacy_import(urls, category, validate):
+    """The previous preset loop: one lookup per site before each insert"""
+    from app.models import db, BlockedSite
+    for url in urls:
+        url = validate(url)
+        existing = BlockedSite.query.filter_by(url=url).first()
+        if not existing:
+            db.session.add(BlockedSite(url=url, category=category))
+    db.session.commit()
+
+def run(entries, legacy_sample):
+    workdir = tempfile.mkdtemp(prefix='focusguard-bench-')
+    os.environ['DATABASE_URL'] = f"sqlite:///{os.path.join(workdir, 'bench.db')}"
+    os.environ['FOCUSGUARD_HOSTS_FILE'] = os.path.join(workdir, 'hosts')
+    open(os.environ['FOCUSGUARD_HOSTS_FILE'], 'w').close()
+    
+    from app import create_app, routes
+    from app.models import db, BlockedSite
+    app = create_app('production')
+    client = app.test_client()
+    payload = make_list(entries).encode()
+    
+    started = time.perf_counter()
+    response = client.post('/api/blocklist/bulk', data={
+        'file': (io.BytesIO(payload), 'list.txt'),
+        'category': 'imported'
+    }, content_type='multipart/form-data')
+    elapsed = time.perf_counter() - started
+    body = response.get_json()
+    print(f"bulk upload {entries} lines ({len(payload) / 1e6:.1f} MB): {elapsed * 1000:.0f} ms, "
+          f"added {body['added_count']}, invalid {body['invalid_count']}")
+    
+    started = time.perf_counter()
+    response = client.post('/api/blocklist/bulk', data={
+        'file': (io.BytesIO(payload), 'list.txt')
+    }, content_type='multipart/form-data')
+    elapsed = time.perf_counter() - started
+    print(f"re-upload (all duplicates): {elapsed * 1000:.0f} ms, "
+          f"duplicates {response.get_json()['duplicate_count']}")
+    
+    urls = [f"legacy{i}.example.org" for i in range(legacy_sample)]
+    with app.app_context():
+        started = time.perf_counter()
+        legacy_import(urls, 'legacy', routes.blocker_service.validate_url)
+        elapsed = time.perf_counter() - started
+        total = BlockedSite.query.count()
+        db.session.remove()
+    print(f"legacy loop {legacy_sample} sites: {elapsed * 1000:.0f} ms "
+          f"(~{elapsed / legacy_sample * entries:.1f}s extrapolated to {entries}), "
+          f"{total} rows total")
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--entries', type=int, default=50000)
+    parser.add_argument('--legacy-sample', type=int, default=5000)
+    args = parser.parse_args()
+    run(args.entries, args.legacy_sample)
@@ -0,0 +1,118 @@
+"""Check query plans use the analytics indexes and time them at scale
+
+Run from the backend directory:
+    python -m benchmarks.bench_indexes --sessions 1000000
+
+Exits non-zero if any query plan stops using its index.
+"""
+import argparse
+import os
+import random
+import tempfile
+import time
+from datetime import datetime, timedelta
+from sqlalchemy import func, text
+
+def explain(db, query):
+    sql = str(query.statement.compile(db.engine, compile_kwargs={'literal_binds': True}))
+    rows = db.session.execute(text(f"EXPLAIN QUERY PLAN {sql}")).all()
+    return ' | '.join(row[-1] for row in rows)
+
+def timed(call, repeat=5):
+    best = None
+    for _ in range(repeat):
+        started = time.perf_counter()
+        call()
+        elapsed = time.perf_counter() - started
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+def seed(db, FocusSession, BlockAttempt, sessions, attempts):
+    rng = random.Random(7)
+    now = datetime.now()
+    batch = []
+    for i in range(sessions):
+        started_at = now - timedelta(minutes=rng.randint(0, 5 * 365 * 24 * 60))
+        batch.append({
+            'session_id': f'bench-{i}',
+            'mode': 'pomodoro',
+            'duration_minutes': 25,
+            'completed_minutes': rng.uniform(1, 25),
+            'completed': rng.random() < 0.8,
+            'started_at': started_at,
+            'ended_at': started_at + timedelta(minutes=25),
+            'date': started_at.date()
+        })
+        if len(batch) == 50000:
+            db.session.execute(FocusSession.__table__.insert(), batch)
+            batch = []
+    if batch:
+        db.session.execute(FocusSession.__table__.insert(), batch)
+    
+    db.session.execute(BlockAttempt.__table__.insert(), [{
+        'url': 'facebook.com',
+        'timestamp': now - timedelta(minutes=rng.randint(0, 365 * 24 * 60)),
+        'during_session': True
+    } for _ in range(attempts)])
+    db.session.commit()
+
+def run(sessions, attempts):
+    workdir = tempfile.mkdtemp(prefix='focusguard-bench-')
+    os.environ['DATABASE_URL'] = f"sqlite:///{os.path.join(workdir, 'bench.db')}"
+    os.environ['FOCUSGUARD_HOSTS_FILE'] = os.path.join(workdir, 'hosts')
+    
+    from app import create_app
+    from app.models import db, FocusSession, BlockAttempt
+    
+    app = create_app('production')
+    with app.app_context():
+        started = time.perf_counter()
+        seed(db, FocusSession, BlockAttempt, sessions, attempts)
+        print(f"seeded {sessions} sessions, {attempts} attempts in {time.perf_counter() - started:.1f}s")
+        db.session.execute(text('ANALYZE'))
+        
+        week_ago = (datetime.now() - timedelta(days=7)).date()
+        queries = {
+            'history (ORDER BY started_at)': (
+                FocusSession.query.order_by(FocusSession.started_at.desc()).limit(50),
+                'ix_focus_sessions_started_at'
+            ),
+            'completed in window (date, completed)': (
+                db.session.query(func.count(FocusSession.id)).filter(
+                    FocusSession.date >= week_ago, FocusSession.completed == True),
+                'ix_focus_sessions_date_completed'
+            ),
+            'attempts in window (timestamp)': (
+                db.session.query(func.count(BlockAttempt.id)).filter(
+                    BlockAttempt.timestamp >= datetime.utcnow() - timedelta(days=7)),
+                'ix_block_attempts_timestamp'
+            ),
+        }
+        
+        failures = 0
+        indexed = {}
+        for name, (query, index) in queries.items():
+            plan = explain(db, query)
+            uses_index = index in plan
+            failures += not uses_index
+            indexed[name] = timed(query.all)
+            print(f"{'OK  ' if uses_index else 'FAIL'} {name}: {plan}")
+        
+        # Same queries without the indexes, for comparison
+        for _, (_, index) in queries.items():
+            db.session.execute(text(f"DROP INDEX {index}"))
+        print()
+        for name, (query, _) in queries.items():
+            unindexed = timed(query.all, repeat=1)
+            print(f"{name:<40} indexed {indexed[name] * 1000:8.2f} ms   "
+                  f"unindexed {unindexed * 1000:8.2f} ms")
+        db.session.rollback()
+    
+    return failures == 0
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--sessions', type=int, default=1000000)
+    parser.add_argument('--attempts', type=int, default=200000)
+    args = parser.parse_args()
+    raise SystemExit(0 if run(args.sessions, args.attempts) else 1)
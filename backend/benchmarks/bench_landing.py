@@ -0,0 +1,75 @@
+"""Latency and tab-storm benchmark for the block page server
+
+Measures per-request latency over one keep-alive loopback connection, then
+a storm of short-lived connections (a browser retrying blocked tabs) and
+the CPU time it costs the server process.
+
+Run from the backend directory:
+    python -m benchmarks.bench_landing --requests 20000 --storm 20000
+"""
+import argparse
+import asyncio
+import socket
+import statistics
+import time
+from app.landing import LandingServer, RESPONSE
+
+def keepalive_latency(port, requests):
+    sock = socket.create_connection(('127.0.0.1', port))
+    sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+    request = b"GET / HTTP/1.1\r\nHost: www.blocked.example\r\nUser-Agent: bench\r\n\r\n"
+    samples = []
+    for _ in range(requests):
+        started = time.perf_counter()
+        sock.sendall(request)
+        received = 0
+        while received < len(RESPONSE):
+            received += len(sock.recv(65536))
+        samples.append(time.perf_counter() - started)
+    sock.close()
+    samples.sort()
+    return samples
+
+async def storm(port, total, concurrency):
+    request = b"GET / HTTP/1.1\r\nHost: m.blocked.example\r\nConnection: close\r\n\r\n"
+    remaining = [total]
+    
+    async def worker():
+        while remaining[0] > 0:
+            remaining[0] -= 1
+            reader, writer = await asyncio.open_connection('127.0.0.1', port)
+            writer.write(request)
+            await reader.readexactly(len(RESPONSE))
+            writer.close()
+    
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+
+def run(requests, storm_total, concurrency):
+    server = LandingServer('127.0.0.1', 0)
+    attempts = []
+    server.on_attempt = attempts.append
+    server.start()
+    
+    samples = keepalive_latency(server.port, requests)
+    mean = statistics.fmean(samples)
+    print(f"keep-alive: {requests} requests, mean {mean * 1e6:.0f} us, "
+          f"p50 {samples[len(samples) // 2] * 1e6:.0f} us, p99 {samples[int(len(samples) * 0.99)] * 1e6:.0f} us")
+    
+    cpu_started = time.process_time()
+    started = time.perf_counter()
+    asyncio.run(storm(server.port, storm_total, concurrency))
+    elapsed = time.perf_counter() - started
+    cpu = time.process_time() - cpu_started
+    print(f"storm: {storm_total} new connections ({concurrency} concurrent) in {elapsed:.2f}s "
+          f"= {storm_total / elapsed:,.0f}/s, process CPU {cpu / storm_total * 1e6:.0f} us per request "
+          f"(client included)")
+    print(f"server stats: {server.stats()}, attempts hosts: {sorted(set(attempts))}")
+    server.stop()
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--requests', type=int, default=20000)
+    parser.add_argument('--storm', type=int, default=20000)
+    parser.add_argument('--concurrency', type=int, default=100)
+    args = parser.parse_args()
+    run(args.requests, args.storm, args.concurrency)
@@ -0,0 +1,88 @@
+"""Lookup benchmark for the suffix-trie domain matcher
+
+Compiles a synthetic blocklist of exact, wildcard and exception rules and
+matches a stream of hostnames against it, compared with a linear scan over
+the same rules.
+
+Run from the backend directory:
+    python -m benchmarks.bench_matcher --rules 100000 --lookups 1000000
+"""
+import argparse
+import random
+import time
+from app.matcher import DomainMatcher
+
+def make_rules(count, rng):
+    rules = []
+    for i in range(count):
+        domain = f"site{i}.{rng.choice(['com', 'net', 'org', 'io'])}"
+        kind = rng.random()
+        if kind < 0.45:
+            rules.append(domain)
+        elif kind < 0.95:
+            rules.append('*.' + domain)
+        else:
+            rules.append('@@www.' + domain)
+    return rules
+
+def make_hosts(rules, count, rng):
+    domains = [rule.lstrip('*.@').removeprefix('www.') for rule in rules]
+    hosts = []
+    for _ in range(count):
+        kind = rng.random()
+        domain = rng.choice(domains)
+        if kind < 0.3:
+            hosts.append(domain)
+        elif kind < 0.6:
+            hosts.append(f"{rng.choice(['www', 'm', 'cdn.static', 'mobile'])}.{domain}")
+        else:
+            hosts.append(f"allowed{rng.randrange(10 ** 6)}.example.com")
+    return hosts
+
+def linear_match(rules, host):
+    """Reference semantics, evaluated by scanning every rule"""
+    if '@@' + host in rules:
+        return None
+    best = None
+    for rule in rules:
+        if rule == host:
+            return rule
+        if rule.startswith('*.') and host.endswith(rule[1:]):
+            if best is None or len(rule) > len(best):
+                best = rule
+    return best
+
+def run(rule_count, lookups, linear_sample, seed):
+    rng = random.Random(seed)
+    rules = make_rules(rule_count, rng)
+    hosts = make_hosts(rules, lookups, rng)
+    
+    started = time.perf_counter()
+    matcher = DomainMatcher(rules)
+    print(f"compile {rule_count} rules: {(time.perf_counter() - started) * 1000:.1f} ms")
+    
+    match = matcher.match
+    started = time.perf_counter()
+    hits = sum(1 for host in hosts if match(host) is not None)
+    elapsed = time.perf_counter() - started
+    print(f"trie:   {lookups} lookups in {elapsed:.2f}s = {lookups / elapsed:,.0f}/s "
+          f"({elapsed / lookups * 1e6:.2f} us each), {hits} blocked")
+    
+    sample = hosts[:linear_sample]
+    rule_set = set(rules)
+    started = time.perf_counter()
+    for host in sample:
+        expected = linear_match(rule_set, host)
+        assert match(host) == expected, (host, match(host), expected)
+    elapsed = time.perf_counter() - started
+    print(f"linear: {linear_sample} lookups in {elapsed:.2f}s = "
+          f"{elapsed / linear_sample * 1e6:,.0f} us each (results match the trie)")
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--rules', type=int, default=100000)
+    parser.add_argument('--lookups', type=int, default=1000000)
+    parser.add_argument('--linear-sample', type=int, default=200)
+    parser.add_argument('--seed', type=int, default=1)
+    args = parser.parse_args()
+    run(args.rules, args.lookups, args.linear_sample, args.seed)
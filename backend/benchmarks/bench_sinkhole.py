@@ -0,0 +1,138 @@
+"""Queries/sec benchmark for the DNS sinkhole resolver
+
+Starts the sinkhole on a free loopback port with a local stub upstream and
+drives it with many in-flight UDP queries.
+
+Run from the backend directory:
+    python -m benchmarks.bench_sinkhole --queries 50000
+"""
+import argparse
+import asyncio
+import random
+import struct
+import threading
+import time
+from app.blocker import WebsiteBlocker
+from app.sinkhole import DnsSinkhole, DnsSinkholeBackend, parse_question
+
+def build_query(query_id, name, qtype=1):
+    header = struct.pack('!HHHHHH', query_id, 0x0100, 1, 0, 0, 0)
+    labels = b''.join(bytes([len(part)]) + part.encode() for part in name.split('.'))
+    return header + labels + b'\x00' + struct.pack('!HH', qtype, 1)
+
+class StubUpstream(asyncio.DatagramProtocol):
+    """Answers every query with 10.0.0.1, standing in for a real resolver"""
+    
+    def connection_made(self, transport):
+        self.transport = transport
+    
+    def datagram_received(self, data, addr):
+        question = parse_question(data)
+        if question is None:
+            return
+        _, _, _, qtype, end = question
+        header = struct.pack('!HHHHHH', struct.unpack_from('!H', data)[0], 0x8180, 1, 1, 0, 0)
+        answer = struct.pack('!HHHIH', 0xC00C, qtype, 1, 60, 4) + bytes([10, 0, 0, 1])
+        self.transport.sendto(header + data[12:end] + answer, addr)
+
+def start_stub():
+    ready = threading.Event()
+    holder = {}
+    
+    def serve():
+        loop = asyncio.new_event_loop()
+        transport, _ = loop.run_until_complete(loop.create_datagram_endpoint(
+            StubUpstream, local_addr=('127.0.0.1', 0)))
+        holder['port'] = transport.get_extra_info('sockname')[1]
+        ready.set()
+        loop.run_forever()
+    
+    threading.Thread(target=serve, daemon=True).start()
+    ready.wait()
+    return holder['port']
+
+class Client(asyncio.DatagramProtocol):
+    def __init__(self, total, window, names):
+        self.total = total
+        self.window = window
+        self.names = names
+        self.sent = 0
+        self.received = 0
+        self.answers = {}
+        self.done = asyncio.get_event_loop().create_future()
+    
+    def connection_made(self, transport):
+        self.transport = transport
+        for _ in range(min(self.window, self.total)):
+            self.send()
+    
+    def send(self):
+        name = self.names[self.sent % len(self.names)]
+        self.transport.sendto(build_query(self.sent & 0xFFFF, name))
+        self.sent += 1
+    
+    def datagram_received(self, data, addr):
+        self.received += 1
+        ancount = struct.unpack_from('!H', data, 6)[0]
+        if ancount:
+            self.answers[data[-4:]] = self.answers.get(data[-4:], 0) + 1
+        if self.sent < self.total:
+            self.send()
+        elif self.received >= self.total and not self.done.done():
+            self.done.set_result(True)
+
+async def drive(port, total, window, names):
+    loop = asyncio.get_running_loop()
+    transport, client = await loop.create_datagram_endpoint(
+        lambda: Client(total, window, names), remote_addr=('127.0.0.1', port))
+    started = time.perf_counter()
+    try:
+        await asyncio.wait_for(client.done, timeout=60)
+    except asyncio.TimeoutError:
+        pass
+    elapsed = time.perf_counter() - started
+    transport.close()
+    return client.received, elapsed, client.answers
+
+def run(queries, window, blocklist):
+    upstream_port = start_stub()
+    sinkhole = DnsSinkhole('127.0.0.1', 0, ('127.0.0.1', upstream_port))
+    sinkhole.start()
+    blocker = WebsiteBlocker(backend=DnsSinkholeBackend(sinkhole))
+    
+    blocked = [f"blocked{i}.example" for i in range(blocklist)]
+    allowed = [f"allowed{i}.example" for i in range(1000)]
+    
+    started = time.perf_counter()
+    blocker.enable_blocking(blocked)
+    swap_ms = (time.perf_counter() - started) * 1000
+    started = time.perf_counter()
+    blocker.enable_blocking(blocked)
+    same_ms = (time.perf_counter() - started) * 1000
+    
+    print(f"blocklist {blocklist} rules: initial enable {swap_ms:.2f} ms, "
+          f"same-set enable {same_ms:.3f} ms, no file I/O")
+    
+    mixes = {
+        'sinkholed': random.Random(1).sample(blocked, min(1000, len(blocked))),
+        'forwarded': allowed,
+    }
+    for label, names in mixes.items():
+        received, elapsed, answers = asyncio.run(drive(sinkhole.port, queries, window, names))
+        addresses = {'.'.join(map(str, key)): count for key, count in answers.items()}
+        print(f"{label:<10} {received}/{queries} answered in {elapsed:.2f}s "
+              f"= {received / elapsed:,.0f} qps  answers {addresses}")
+    
+    started = time.perf_counter()
+    blocker.disable_blocking()
+    print(f"disable: {(time.perf_counter() - started) * 1e6:.1f} us")
+    print(f"stats: {sinkhole.stats()}")
+    sinkhole.stop()
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--queries', type=int, default=50000)
+    parser.add_argument('--window', type=int, default=64)
+    parser.add_argument('--blocklist', type=int, default=50000)
+    args = parser.parse_args()
+    run(args.queries, args.window, args.blocklist)
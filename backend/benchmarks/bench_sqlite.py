@@ -0,0 +1,143 @@
+"""Mixed read/write concurrency benchmark for the SQLite profile
+
+Runs writer threads (start + stop a session, which commits the session and
+its rollups) against reader threads (history and overview with the
+analytics cache disabled) through the Flask app, once with SQLite defaults
+and once with the configured pragmas and pool.
+
+Run from the backend directory:
+    python -m benchmarks.bench_sqlite --seconds 10
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import uuid
+from datetime import datetime, timedelta
+
+def percentile(samples, fraction):
+    if not samples:
+        return 0
+    samples = sorted(samples)
+    return samples[min(len(samples) - 1, int(len(samples) * fraction))]
+
+def seed(sessions):
+    from app.models import db, FocusSession
+    now = datetime.now()
+    rows = []
+    for i in range(sessions):
+        started = now - timedelta(minutes=37 * i)
+        rows.append({
+            'session_id': str(uuid.uuid4()),
+            'mode': 'pomodoro',
+            'duration_minutes': 25,
+            'completed_minutes': 25,
+            'completed': True,
+            'started_at': started,
+            'ended_at': started + timedelta(minutes=25),
+            'date': started.date()
+        })
+    db.session.execute(FocusSession.__table__.insert(), rows)
+    db.session.commit()
+
+def measure(mode, seconds, writers, readers, sessions):
+    workdir = tempfile.mkdtemp(prefix='focusguard-bench-')
+    os.environ['DATABASE_URL'] = f"sqlite:///{os.path.join(workdir, 'bench.db')}"
+    os.environ['FOCUSGUARD_HOSTS_FILE'] = os.path.join(workdir, 'hosts')
+    open(os.environ['FOCUSGUARD_HOSTS_FILE'], 'w').close()
+    
+    from app.config import config
+    settings = config['production']
+    # Every read goes to the database
+    settings.ANALYTICS_CACHE_TTL = 0
+    if mode == 'baseline':
+        settings.SQLITE_PRAGMAS = {}
+        settings.SQLALCHEMY_ENGINE_OPTIONS = {}
+    
+    from app import create_app
+    from app.models import db
+    app = create_app('production')
+    with app.app_context():
+        seed(sessions)
+        journal = db.session.execute(db.text('PRAGMA journal_mode')).scalar()
+        db.session.remove()
+    
+    latencies = {'write': [], 'read': []}
+    errors = []
+    stop_at = time.perf_counter() + seconds
+    
+    def writer(index):
+        client = app.test_client()
+        headers = {'X-User-Id': f"writer-{index}"}
+        while time.perf_counter() < stop_at:
+            client.post('/api/focus/start', json={'duration': 25}, headers=headers)
+            started = time.perf_counter()
+            response = client.post('/api/focus/stop', json={'completed': True}, headers=headers)
+            latencies['write'].append(time.perf_counter() - started)
+            if response.status_code != 200:
+                errors.append(response.get_json())
+    
+    def reader(index):
+        client = app.test_client()
+        paths = ['/api/analytics/history?limit=50', '/api/analytics/overview?days=30']
+        count = 0
+        while time.perf_counter() < stop_at:
+            started = time.perf_counter()
+            response = client.get(paths[count % len(paths)])
+            latencies['read'].append(time.perf_counter() - started)
+            if response.status_code != 200:
+                errors.append(response.get_json())
+            count += 1
+    
+    threads = [threading.Thread(target=writer, args=(i,)) for i in range(writers)]
+    threads += [threading.Thread(target=reader, args=(i,)) for i in range(readers)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    
+    return {
+        'mode': mode,
+        'journal_mode': journal,
+        'errors': len(errors),
+        **{
+            kind: {
+                'ops_per_sec': round(len(samples) / seconds, 1),
+                'p50_ms': round(percentile(samples, 0.5) * 1000, 2),
+                'p99_ms': round(percentile(samples, 0.99) * 1000, 2)
+            }
+            for kind, samples in latencies.items()
+        }
+    }
+
+def run(seconds, writers, readers, sessions):
+    for mode in ('baseline', 'tuned'):
+        # Separate processes so each mode gets a fresh engine and config
+        output = subprocess.run([
+            sys.executable, '-m', 'benchmarks.bench_sqlite', '--mode', mode,
+            '--seconds', str(seconds), '--writers', str(writers),
+            '--readers', str(readers), '--sessions', str(sessions)
+        ], capture_output=True, text=True, check=True).stdout
+        result = json.loads(output.strip().splitlines()[-1])
+        print(f"{mode:<9} journal={result['journal_mode']:<6} errors={result['errors']}")
+        for kind in ('write', 'read'):
+            stats = result[kind]
+            print(f"  {kind:<5} {stats['ops_per_sec']:>8.1f} ops/s  "
+                  f"p50 {stats['p50_ms']:>7.2f} ms  p99 {stats['p99_ms']:>8.2f} ms")
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--mode', choices=['baseline', 'tuned'])
+    parser.add_argument('--seconds', type=int, default=10)
+    parser.add_argument('--writers', type=int, default=4)
+    parser.add_argument('--readers', type=int, default=8)
+    parser.add_argument('--sessions', type=int, default=20000)
+    args = parser.parse_args()
+    if args.mode:
+        print(json.dumps(measure(args.mode, args.seconds, args.writers, args.readers, args.sessions)))
+    else:
+        run(args.seconds, args.writers, args.readers, args.sessions)
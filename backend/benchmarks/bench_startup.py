@@ -0,0 +1,104 @@
+"""Cold start benchmark with a time budget
+
+Starts a fresh interpreter that runs `python -X importtime` and builds the
+app against an already initialized database, several times. Reports the
+median import time, create_app phase breakdown and the slowest imports,
+and exits non-zero when startup or the app's own modules go over budget.
+
+Run from the backend directory:
+    python -m benchmarks.bench_startup --runs 5 --budget-ms 1000 --app-budget-ms 100
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+
+CHILD = """
+import json, time
+started = time.perf_counter()
+from app import create_app
+app = create_app('production')
+print(json.dumps({
+    'wall_ms': round((time.perf_counter() - started) * 1000, 1),
+    'phases': app.extensions['startup_timings']
+}))
+"""
+
+def parse_importtime(stderr):
+    """{module: (self_us, cumulative_us)} from -X importtime output"""
+    modules = {}
+    for line in stderr.splitlines():
+        if not line.startswith('import time:') or 'self [us]' in line:
+            continue
+        self_us, cumulative_us, name = line[len('import time:'):].split('|')
+        modules[name.strip()] = (int(self_us), int(cumulative_us))
+    return modules
+
+def start_once(env):
+    completed = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', CHILD],
+        env=env, capture_output=True, text=True, check=True
+    )
+    result = json.loads(completed.stdout.strip().splitlines()[-1])
+    return result, parse_importtime(completed.stderr)
+
+def run(runs, budget_ms, app_budget_ms, top):
+    workdir = tempfile.mkdtemp(prefix='focusguard-bench-')
+    env = {
+        **os.environ,
+        'DATABASE_URL': f"sqlite:///{os.path.join(workdir, 'bench.db')}",
+        'FOCUSGUARD_HOSTS_FILE': os.path.join(workdir, 'hosts'),
+        'FOCUSGUARD_LOCK_FILE': os.path.join(workdir, 'focusguard.lock')
+    }
+    open(env['FOCUSGUARD_HOSTS_FILE'], 'w').close()
+    
+    # First start creates and stamps the schema; later ones should skip it
+    first, _ = start_once(env)
+    print(f"first start (creates schema): {first['wall_ms']:.1f} ms  {first['phases']}")
+    
+    walls, app_imports, phases, imports = [], [], {}, {}
+    for _ in range(runs):
+        result, modules = start_once(env)
+        walls.append(result['wall_ms'])
+        # Self time of the app's own modules, excluding what they pull in
+        app_imports.append(sum(
+            self_us for name, (self_us, _) in modules.items()
+            if name == 'app' or name.startswith('app.')
+        ) / 1000)
+        for phase, ms in result['phases'].items():
+            phases.setdefault(phase, []).append(ms)
+        for name, (_, cumulative_us) in modules.items():
+            imports.setdefault(name, []).append(cumulative_us / 1000)
+    
+    wall = statistics.median(walls)
+    app_import = statistics.median(app_imports)
+    print(f"\nwarm-schema start, median of {runs}: {wall:.1f} ms")
+    for phase, values in phases.items():
+        print(f"  {phase:<10} {statistics.median(values):8.1f} ms")
+    print(f"  app modules (self) {app_import:.1f} ms")
+    
+    print("\nslowest imports (cumulative, median ms):")
+    slowest = sorted(imports.items(), key=lambda item: statistics.median(item[1]), reverse=True)
+    for name, values in slowest[:top]:
+        print(f"  {statistics.median(values):8.1f}  {name}")
+    
+    failures = []
+    if wall > budget_ms:
+        failures.append(f"startup {wall:.1f} ms > budget {budget_ms} ms")
+    if app_import > app_budget_ms:
+        failures.append(f"app module imports {app_import:.1f} ms > budget {app_budget_ms} ms")
+    for failure in failures:
+        print(f"OVER BUDGET: {failure}")
+    return not failures
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--runs', type=int, default=5)
+    parser.add_argument('--budget-ms', type=float, default=1000)
+    parser.add_argument('--app-budget-ms', type=float, default=100)
+    parser.add_argument('--top', type=int, default=15)
+    args = parser.parse_args()
+    raise SystemExit(0 if run(args.runs, args.budget_ms, args.app_budget_ms, args.top) else 1)
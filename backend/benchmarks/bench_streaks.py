@@ -0,0 +1,107 @@
+"""Compare the legacy full-scan streak calculation with the streak row
+
+Run from the backend directory:
+    python -m benchmarks.bench_streaks --sessions 100000
+"""
+import argparse
+import os
+import random
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+def legacy_get_streaks(FocusSession):
+    """The original get_streaks: loads every completed session"""
+    sessions = FocusSession.query.filter(
+        FocusSession.completed == True
+    ).order_by(FocusSession.date.desc()).all()
+    
+    if not sessions:
+        return {'current': 0, 'best': 0, 'total': 0}
+    
+    dates = list(set(s.date.isoformat() for s in sessions))
+    dates.sort(reverse=True)
+    
+    current_streak = 0
+    check_date = datetime.now().date()
+    for date_str in dates:
+        date = datetime.fromisoformat(date_str).date()
+        if date == check_date:
+            current_streak += 1
+            check_date -= timedelta(days=1)
+        else:
+            break
+    
+    best_streak = 1
+    temp_streak = 1
+    for i in range(len(dates) - 1):
+        current = datetime.fromisoformat(dates[i]).date()
+        next_date = datetime.fromisoformat(dates[i + 1]).date()
+        if (current - next_date).days == 1:
+            temp_streak += 1
+            best_streak = max(best_streak, temp_streak)
+        else:
+            temp_streak = 1
+    
+    return {
+        'current': current_streak,
+        'best': max(best_streak, current_streak),
+        'total': len(sessions)
+    }
+
+def best_of(repeat, call):
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = call()
+        timings.append(time.perf_counter() - started)
+    return min(timings), result
+
+def run(sessions, repeat):
+    workdir = tempfile.mkdtemp(prefix='focusguard-bench-')
+    os.environ['DATABASE_URL'] = f"sqlite:///{os.path.join(workdir, 'bench.db')}"
+    os.environ['FOCUSGUARD_HOSTS_FILE'] = os.path.join(workdir, 'hosts')
+    
+    from app import create_app
+    from app.analytics import AnalyticsService
+    from app.models import db, FocusSession
+    from app.rollups import rebuild_daily_stats
+    
+    app = create_app('production')
+    rng = random.Random(42)
+    now = datetime.now()
+    rows = []
+    for i in range(sessions):
+        started_at = now - timedelta(days=rng.randint(0, 5 * 365), minutes=rng.randint(0, 600))
+        rows.append({
+            'session_id': f'bench-{i}',
+            'mode': 'pomodoro',
+            'duration_minutes': 25,
+            'completed_minutes': rng.uniform(1, 25),
+            'completed': rng.random() < 0.8,
+            'started_at': started_at,
+            'ended_at': started_at + timedelta(minutes=25),
+            'date': started_at.date()
+        })
+    
+    with app.app_context():
+        db.session.execute(FocusSession.__table__.insert(), rows)
+        db.session.commit()
+        rebuild_daily_stats()
+        
+        legacy_time, legacy = best_of(repeat, lambda: legacy_get_streaks(FocusSession))
+        db.session.expire_all()
+        new_time, new = best_of(repeat, AnalyticsService.get_streaks)
+    
+    print(f"sessions:        {sessions}")
+    print(f"legacy scan:     {legacy_time * 1000:.2f} ms  {legacy}")
+    print(f"streak row:      {new_time * 1000:.3f} ms  {new}")
+    print(f"speedup:         {legacy_time / new_time:.0f}x")
+    print(f"results match:   {legacy == new}")
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--sessions', type=int, default=100000)
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+    run(args.sessions, args.repeat)
@@ -0,0 +1,80 @@
+"""Memory and time for syncing a large blocklist file subscription
+
+Writes a synthetic hosts-format list, subscribes to it and times the
+streaming import, a re-sync of the unchanged file and re-syncs after the
+file changes (one of them under tracemalloc for the Python heap peak).
+
+Run from the backend directory:
+    python -m benchmarks.bench_subscription --lines 500000
+"""
+import argparse
+import os
+import tempfile
+import time
+import tracemalloc
+
+def write_list(path, lines, salt=''):
+    with open(path, 'w') as f:
+        f.write('# Synthetic public blocklist\n127.0.0.1 localhost\n\n')
+        for i in range(lines):
+            if i % 10 == 0:
+                f.write(f"||tracker{i}{salt}.net^\n")
+            else:
+                f.write(f"0.0.0.0 ads{i}{salt}.example.com  # entry {i}\n")
+
+def timed_sync(subscription, validate, label, trace=False):
+    from app.blocklist import sync_subscription
+    from app.models import db
+    if trace:
+        tracemalloc.start()
+    started = time.perf_counter()
+    result = sync_subscription(subscription, validate)
+    db.session.commit()
+    elapsed = time.perf_counter() - started
+    memory = ''
+    if trace:
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        memory = f"heap peak {peak / 1e6:.1f} MB (traced, slower)  "
+    summary = 'skipped (hash unchanged)' if result is None else (
+        f"{result['added']} rules, {result['duplicates']} duplicates, {result['invalid']} invalid")
+    print(f"{label:<16} {elapsed * 1000:8.0f} ms  {memory}{summary}")
+
+def run(lines):
+    workdir = tempfile.mkdtemp(prefix='focusguard-bench-')
+    os.environ['DATABASE_URL'] = f"sqlite:///{os.path.join(workdir, 'bench.db')}"
+    os.environ['FOCUSGUARD_HOSTS_FILE'] = os.path.join(workdir, 'hosts')
+    open(os.environ['FOCUSGUARD_HOSTS_FILE'], 'w').close()
+    list_path = os.path.join(workdir, 'list.txt')
+    write_list(list_path, lines)
+    print(f"list: {lines} lines, {os.path.getsize(list_path) / 1e6:.1f} MB on disk")
+    
+    from app import create_app, routes
+    from app.models import db, BlocklistSubscription
+    app = create_app('production')
+    validate = routes.blocker_service.validate_url
+    
+    with app.app_context():
+        subscription = BlocklistSubscription(name='bench', path=list_path)
+        db.session.add(subscription)
+        timed_sync(subscription, validate, 'initial import')
+        timed_sync(subscription, validate, 'unchanged')
+        write_list(list_path, lines, salt='v2')
+        timed_sync(subscription, validate, 'changed')
+        write_list(list_path, lines, salt='v3')
+        timed_sync(subscription, validate, 'changed', trace=True)
+        
+        tracemalloc.start()
+        with open(list_path) as f:
+            content = f.read().splitlines()
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        del content
+        print(f"(reading the whole file into a list of lines alone peaks at {peak / 1e6:.1f} MB)")
+        db.session.remove()
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--lines', type=int, default=500000)
+    args = parser.parse_args()
+    run(args.lines)
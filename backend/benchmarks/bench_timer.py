@@ -0,0 +1,58 @@
+"""Benchmark the shared timer scheduler with many concurrent sessions
+
+Run from the backend directory:
+    python -m benchmarks.bench_timer --timers 10000
+"""
+import argparse
+import statistics
+import threading
+import time
+from app.scheduler import TimerScheduler
+from app.timer import FocusTimer
+
+def run(timers, min_seconds, max_seconds):
+    scheduler = TimerScheduler()
+    lateness = []
+    expected = {}
+    lock = threading.Lock()
+    done = threading.Event()
+    
+    def on_complete(result):
+        fired_at = time.monotonic()
+        with lock:
+            lateness.append(fired_at - expected[result['session_id']])
+            if len(lateness) == timers:
+                done.set()
+    
+    span = max_seconds - min_seconds
+    started = time.perf_counter()
+    for i in range(timers):
+        timer = FocusTimer(None, scheduler)
+        timer.on_complete = on_complete
+        duration = min_seconds + span * i / timers
+        result = timer.start_session(duration / 60, 'bench')
+        expected[result['session_id']] = timer.deadline
+    start_cost = time.perf_counter() - started
+    
+    done.wait(max_seconds + 30)
+    
+    lateness_ms = sorted(x * 1000 for x in lateness)
+    # The thread-per-session engine woke once a second for every session
+    legacy_wakeups = sum(int(min_seconds + span * i / timers) for i in range(timers))
+    
+    print(f"timers:            {timers}")
+    print(f"completed:         {len(lateness)}")
+    print(f"start cost:        {start_cost * 1e6 / timers:.1f} us/session")
+    print(f"scheduler threads: 1 (legacy: {timers})")
+    print(f"scheduler wakeups: {scheduler.wakeups} (legacy: ~{legacy_wakeups})")
+    print(f"lateness mean:     {statistics.mean(lateness_ms):.3f} ms")
+    print(f"lateness p99:      {lateness_ms[int(len(lateness_ms) * 0.99) - 1]:.3f} ms")
+    print(f"lateness max:      {lateness_ms[-1]:.3f} ms")
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--timers', type=int, default=10000)
+    parser.add_argument('--min-seconds', type=float, default=2.0)
+    parser.add_argument('--max-seconds', type=float, default=10.0)
+    args = parser.parse_args()
+    run(args.timers, args.min_seconds, args.max_seconds)
@@ -0,0 +1,93 @@
+"""Load test concurrent start/status/stop across many users
+
+Run from the backend directory:
+    python -m benchmarks.load_sessions --clients 300 --cycles 5
+"""
+import argparse
+import os
+import statistics
+import tempfile
+import threading
+import time
+
+def percentile(values, pct):
+    ordered = sorted(values)
+    return ordered[max(0, int(len(ordered) * pct / 100) - 1)]
+
+def run(clients, cycles):
+    workdir = tempfile.mkdtemp(prefix='focusguard-load-')
+    hosts_path = os.path.join(workdir, 'hosts')
+    with open(hosts_path, 'w') as f:
+        f.write('127.0.0.1 localhost\n')
+    os.environ['DATABASE_URL'] = f"sqlite:///{os.path.join(workdir, 'load.db')}"
+    os.environ['FOCUSGUARD_HOSTS_FILE'] = hosts_path
+    
+    from app import create_app
+    from app.models import FocusSession
+    from app import routes
+    
+    app = create_app('production')
+    latencies = {'start': [], 'status': [], 'stop': []}
+    errors = []
+    lock = threading.Lock()
+    barrier = threading.Barrier(clients)
+    
+    def timed(name, call):
+        started = time.perf_counter()
+        response = call()
+        elapsed = time.perf_counter() - started
+        with lock:
+            latencies[name].append(elapsed)
+        return response
+    
+    def client(index):
+        user = {'X-User-Id': f'user-{index}'}
+        http = app.test_client()
+        barrier.wait()
+        for _ in range(cycles):
+            started = timed('start', lambda: http.post(
+                '/api/focus/start', json={'duration': 25, 'mode': 'pomodoro'}, headers=user))
+            status = timed('status', lambda: http.get('/api/focus/status', headers=user))
+            stopped = timed('stop', lambda: http.post(
+                '/api/focus/stop', json={'completed': False}, headers=user))
+            
+            session_id = started.json.get('session_id')
+            if started.status_code != 200:
+                errors.append(f"{user}: start {started.status_code} {started.json}")
+            elif status.json.get('session_id') != session_id:
+                errors.append(f"{user}: status returned another user's session")
+            elif stopped.status_code != 200 or stopped.json.get('session_id') != session_id:
+                errors.append(f"{user}: stop {stopped.status_code} {stopped.json}")
+    
+    threads = [threading.Thread(target=client, args=(i,)) for i in range(clients)]
+    started = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    wall = time.perf_counter() - started
+    
+    with app.app_context():
+        saved = FocusSession.query.count()
+    
+    expected = clients * cycles
+    total_requests = sum(len(v) for v in latencies.values())
+    print(f"clients x cycles:  {clients} x {cycles}")
+    print(f"requests:          {total_requests} in {wall:.2f}s ({total_requests / wall:.0f} req/s)")
+    for name, values in latencies.items():
+        ms = [v * 1000 for v in values]
+        print(f"{name:<6} latency:    p50 {statistics.median(ms):.2f} ms, p99 {percentile(ms, 99):.2f} ms")
+    print(f"sessions saved:    {saved} / {expected}")
+    print(f"still active:      {routes.session_registry.active_count()}")
+    print(f"errors:            {len(errors)}")
+    for error in errors[:10]:
+        print(f"  {error}")
+    
+    return not errors and saved == expected and routes.session_registry.active_count() == 0
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--clients', type=int, default=300)
+    parser.add_argument('--cycles', type=int, default=5)
+    args = parser.parse_args()
+    raise SystemExit(0 if run(args.clients, args.cycles) else 1)
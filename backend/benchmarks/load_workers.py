@@ -0,0 +1,138 @@
+"""Load test for multi-worker serving under gunicorn
+
+Starts gunicorn (gunicorn.conf.py) with 1, 2 and 4 workers against a fresh
+database, checks that a session started through one request is visible
+from every worker, then drives read endpoints from several client
+processes and reports requests/sec and p99 latency per worker count.
+
+Run from the backend directory:
+    python -m benchmarks.load_workers --workers 1 2 4 --seconds 10
+"""
+import argparse
+import http.client
+import json
+import multiprocessing
+import os
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+
+READ_PATHS = ['/api/focus/status', '/api/analytics/overview?days=7', '/api/health']
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+def request(conn, method, path, user, body=None):
+    headers = {'X-User-Id': user}
+    if body is not None:
+        headers['Content-Type'] = 'application/json'
+        body = json.dumps(body)
+    conn.request(method, path, body=body, headers=headers)
+    response = conn.getresponse()
+    return response.status, response.read()
+
+def client(port, seconds, users, results):
+    """One client process: keep-alive connection, mixed read endpoints"""
+    conn = http.client.HTTPConnection('127.0.0.1', port)
+    latencies = []
+    stop_at = time.perf_counter() + seconds
+    count = 0
+    while time.perf_counter() < stop_at:
+        path = READ_PATHS[count % len(READ_PATHS)]
+        started = time.perf_counter()
+        status, _ = request(conn, 'GET', path, f"user-{count % users}")
+        latencies.append(time.perf_counter() - started)
+        if status != 200:
+            raise RuntimeError(f"{path} returned {status}")
+        count += 1
+    results.put(latencies)
+
+def start_server(workers, workdir):
+    port = free_port()
+    env = {
+        **os.environ,
+        'DATABASE_URL': f"sqlite:///{os.path.join(workdir, 'load.db')}",
+        'FOCUSGUARD_HOSTS_FILE': os.path.join(workdir, 'hosts'),
+        'FOCUSGUARD_LOCK_FILE': os.path.join(workdir, 'focusguard.lock'),
+        'FOCUSGUARD_BIND': f"127.0.0.1:{port}",
+        'FOCUSGUARD_WORKERS': str(workers),
+    }
+    process = subprocess.Popen(
+        [sys.executable, '-m', 'gunicorn', '-c', 'gunicorn.conf.py', 'wsgi:app'],
+        env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+    )
+    deadline = time.monotonic() + 30
+    while time.monotonic() < deadline:
+        try:
+            conn = http.client.HTTPConnection('127.0.0.1', port, timeout=1)
+            if request(conn, 'GET', '/api/health', 'probe')[0] == 200:
+                return process, port
+        except OSError:
+            time.sleep(0.2)
+    process.terminate()
+    raise RuntimeError('gunicorn did not come up')
+
+def coherence_check(port, probes):
+    """Start a session once, then read it back over many fresh connections"""
+    conn = http.client.HTTPConnection('127.0.0.1', port)
+    status, body = request(conn, 'POST', '/api/focus/start', 'coherence', {'duration': 25})
+    session_id = json.loads(body)['session_id']
+    seen = 0
+    for _ in range(probes):
+        # New connection each time so gunicorn spreads them over workers
+        probe = http.client.HTTPConnection('127.0.0.1', port)
+        _, body = request(probe, 'GET', '/api/focus/status', 'coherence')
+        seen += json.loads(body).get('session_id') == session_id
+        probe.close()
+    _, body = request(conn, 'POST', '/api/focus/stop', 'coherence', {})
+    stopped = json.loads(body).get('success', False)
+    return seen, stopped
+
+def run(worker_counts, seconds, clients, users):
+    print(f"cpus: {os.cpu_count()}, client processes: {clients}, {seconds}s per run")
+    for workers in worker_counts:
+        workdir = tempfile.mkdtemp(prefix='focusguard-load-')
+        open(os.path.join(workdir, 'hosts'), 'w').close()
+        process, port = start_server(workers, workdir)
+        try:
+            seen, stopped = coherence_check(port, 50)
+            
+            # Some users with running sessions so status reads hit real rows
+            conn = http.client.HTTPConnection('127.0.0.1', port)
+            for i in range(0, users, 2):
+                request(conn, 'POST', '/api/focus/start', f"user-{i}", {'duration': 90})
+            
+            results = multiprocessing.Queue()
+            procs = [
+                multiprocessing.Process(target=client, args=(port, seconds, users, results))
+                for _ in range(clients)
+            ]
+            for proc in procs:
+                proc.start()
+            latencies = []
+            for _ in procs:
+                latencies.extend(results.get())
+            for proc in procs:
+                proc.join()
+        finally:
+            process.terminate()
+            process.wait()
+        
+        latencies.sort()
+        p99 = latencies[int(len(latencies) * 0.99)] * 1000
+        print(f"workers={workers}: {len(latencies) / seconds:8.0f} req/s  "
+              f"p50 {latencies[len(latencies) // 2] * 1000:6.2f} ms  p99 {p99:7.2f} ms  "
+              f"coherent status {seen}/50, cross-worker stop {'ok' if stopped else 'FAILED'}")
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--workers', type=int, nargs='+', default=[1, 2, 4])
+    parser.add_argument('--seconds', type=int, default=10)
+    parser.add_argument('--clients', type=int, default=8)
+    parser.add_argument('--users', type=int, default=100)
+    args = parser.parse_args()
+    run(args.workers, args.seconds, args.clients, args.users)
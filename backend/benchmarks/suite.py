@@ -0,0 +1,225 @@
+"""Benchmark suite for analytics, focus sessions and the blocklist
+
+Seeds a temporary database with benchmarks.synthetic, then times every
+AnalyticsService method, the /focus/start -> /focus/stop cycle against a
+temp hosts file, and blocklist bulk operations. Results go to JSON along
+with the seed, data scale and machine, so runs can be compared; with
+--compare the run fails when a case's median is more than --threshold
+slower than the baseline.
+
+Run from the backend directory:
+    python -m benchmarks.suite --output baseline.json
+    python -m benchmarks.suite --compare baseline.json --threshold 0.25
+"""
+import argparse
+import itertools
+import json
+import os
+import platform
+import sqlite3
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import date, datetime
+
+def measure(run, repeat, warmup=1, after=None):
+    """Seconds per call of run(), after warmup calls; after() is untimed"""
+    samples = []
+    for i in range(warmup + repeat):
+        started = time.perf_counter()
+        run()
+        elapsed = time.perf_counter() - started
+        if after:
+            after()
+        if i >= warmup:
+            samples.append(elapsed)
+    return summarize(samples)
+
+def summarize(samples):
+    ordered = sorted(samples)
+    return {
+        'repeat': len(ordered),
+        'min_ms': round(ordered[0] * 1000, 3),
+        'median_ms': round(statistics.median(ordered) * 1000, 3),
+        'p95_ms': round(ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))] * 1000, 3),
+        'mean_ms': round(statistics.fmean(ordered) * 1000, 3)
+    }
+
+def drain(chunks):
+    """Consume a streaming export, as the response would"""
+    return sum(len(chunk) for chunk in chunks)
+
+def analytics_cases(AnalyticsService, encode_cursor):
+    """(name, callable) for every AnalyticsService query"""
+    # A cursor up to a few pages into the history, to time keyset
+    # continuation; small smoke-test datasets may not reach one
+    cursor = None
+    for _ in range(4):
+        page = AnalyticsService.get_session_history(500, cursor)
+        # A short (or empty) page is the end; a cursor past it has nothing to time
+        if len(page) < 500:
+            break
+        cursor = encode_cursor(page[-1])
+    
+    history = [('analytics.history_first_page', lambda: AnalyticsService.get_session_history(50))]
+    if cursor is not None:
+        history.append(('analytics.history_deep_page', lambda: AnalyticsService.get_session_history(50, cursor)))
+    
+    return [
+        ('analytics.overview_7d', lambda: AnalyticsService.get_overview(7)),
+        ('analytics.overview_365d', lambda: AnalyticsService.get_overview(365)),
+        ('analytics.daily_30d', lambda: AnalyticsService.get_daily_stats(30)),
+        ('analytics.daily_365d', lambda: AnalyticsService.get_daily_stats(365)),
+        ('analytics.streaks', AnalyticsService.get_streaks),
+        *history,
+        ('analytics.dashboard', lambda: AnalyticsService.get_dashboard(7, 10)),
+        ('analytics.overview_7d_tz', lambda: AnalyticsService.get_overview(7, 'America/New_York')),
+        ('analytics.daily_365d_tz', lambda: AnalyticsService.get_daily_stats(365, 'America/New_York')),
+        ('analytics.streaks_tz', lambda: AnalyticsService.get_streaks('America/New_York')),
+        ('analytics.heatmap_365d', lambda: AnalyticsService.get_heatmap(365)),
+        ('analytics.insights_90d', lambda: AnalyticsService.get_insights(90)),
+        ('analytics.export_ndjson', lambda: drain(AnalyticsService.export_ndjson())),
+        ('analytics.export_csv', lambda: drain(AnalyticsService.export_csv()))
+    ]
+
+def check(response, status=200):
+    if response.status_code != status:
+        raise RuntimeError(f"{response.request.path}: {response.status_code} {response.get_data(as_text=True)[:200]}")
+    return response
+
+def run_suite(args):
+    workdir = tempfile.mkdtemp(prefix='focusguard-bench-')
+    os.environ['DATABASE_URL'] = f"sqlite:///{os.path.join(workdir, 'bench.db')}"
+    os.environ['FOCUSGUARD_HOSTS_FILE'] = os.path.join(workdir, 'hosts')
+    os.environ['FOCUSGUARD_LOCK_FILE'] = os.path.join(workdir, 'focusguard.lock')
+    with open(os.environ['FOCUSGUARD_HOSTS_FILE'], 'w') as f:
+        f.write('127.0.0.1 localhost\n')
+    
+    from app import create_app
+    from app.analytics import AnalyticsService, encode_cursor
+    from app.models import db, BlockedSite
+    from benchmarks.synthetic import generate
+    
+    app = create_app('production')
+    started = time.perf_counter()
+    with app.app_context():
+        data = generate(args.seed, args.years, args.sessions_per_day, args.attempts, args.sites, args.end)
+    data['seed_seconds'] = round(time.perf_counter() - started, 1)
+    print(f"seeded {data['sessions']} sessions, {data['attempts']} attempts, "
+          f"{data['sites']} sites in {data['seed_seconds']}s")
+    
+    results = {}
+    
+    def record(name, run, repeat, after=None):
+        if args.only and not any(name.startswith(prefix) for prefix in args.only):
+            return
+        results[name] = measure(run, repeat, after=after)
+        print(f"  {name:<34} median {results[name]['median_ms']:>10.3f} ms  "
+              f"p95 {results[name]['p95_ms']:>10.3f} ms")
+    
+    with app.app_context():
+        for name, run in analytics_cases(AnalyticsService, encode_cursor):
+            record(name, run, args.repeat)
+    
+    client = app.test_client()
+    
+    def focus_cycle():
+        check(client.post('/api/focus/start', json={'duration': 25}))
+        check(client.post('/api/focus/stop', json={'completed': False}))
+    
+    record('focus.start_stop_cycle', focus_cycle, args.repeat * 4)
+    record('focus.status', lambda: check(client.get('/api/focus/status')), args.repeat * 4)
+    
+    batches = itertools.count()
+    bulk_category = 'bench-bulk'
+    
+    def bulk_import():
+        batch = next(batches)
+        sites = [f"bulk{batch}-{i}.example.org" for i in range(args.bulk_size)]
+        check(client.post('/api/blocklist/bulk', json={'category': bulk_category, 'sites': sites}), 201)
+    
+    def remove_bulk():
+        with app.app_context():
+            BlockedSite.query.filter_by(category=bulk_category).delete()
+            db.session.commit()
+    
+    record(f'blocklist.bulk_import_{args.bulk_size}', bulk_import, args.repeat, after=remove_bulk)
+    record('blocklist.list', lambda: check(client.get('/api/blocklist')), args.repeat)
+    
+    return {
+        'meta': {
+            'created_at': datetime.now().isoformat(timespec='seconds'),
+            'commit': git_commit(),
+            'python': platform.python_version(),
+            'sqlite': sqlite3.sqlite_version,
+            'platform': platform.platform(),
+            'cpus': os.cpu_count(),
+            'repeat': args.repeat,
+            'data': data
+        },
+        'results': results
+    }
+
+def git_commit():
+    try:
+        return subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+def compare(baseline, current, threshold, min_delta_ms):
+    """Print median changes per case; returns the names that regressed"""
+    if baseline['meta']['data'].get('sessions') != current['meta']['data'].get('sessions'):
+        print("warning: baseline was run on a different data scale")
+    
+    regressions = []
+    print(f"\n{'case':<36}{'baseline':>12}{'current':>12}{'change':>9}")
+    for name, result in current['results'].items():
+        before = baseline['results'].get(name)
+        if before is None:
+            print(f"{name:<36}{'-':>12}{result['median_ms']:>10.3f}ms{'new':>9}")
+            continue
+        change = result['median_ms'] / before['median_ms'] - 1 if before['median_ms'] else 0
+        slower = result['median_ms'] - before['median_ms']
+        regressed = change > threshold and slower > min_delta_ms
+        if regressed:
+            regressions.append(name)
+        print(f"{name:<36}{before['median_ms']:>10.3f}ms{result['median_ms']:>10.3f}ms"
+              f"{change * 100:>+8.1f}%{'  REGRESSED' if regressed else ''}")
+    return regressions
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--years', type=float, default=2)
+    parser.add_argument('--sessions-per-day', type=float, default=6)
+    parser.add_argument('--attempts', type=int, default=200000)
+    parser.add_argument('--sites', type=int, default=200)
+    parser.add_argument('--end', type=date.fromisoformat, help='last day of data (default today)')
+    parser.add_argument('--bulk-size', type=int, default=10000)
+    parser.add_argument('--repeat', type=int, default=10)
+    parser.add_argument('--only', nargs='+', help='only run cases starting with these prefixes')
+    parser.add_argument('--output', help='write results JSON here')
+    parser.add_argument('--compare', help='baseline results JSON to gate against')
+    parser.add_argument('--threshold', type=float, default=0.25,
+                        help='allowed median slowdown as a fraction (default 0.25)')
+    parser.add_argument('--min-delta-ms', type=float, default=1.0,
+                        help='ignore slowdowns smaller than this, which are noise')
+    args = parser.parse_args()
+    
+    current = run_suite(args)
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(current, f, indent=2)
+        print(f"results written to {args.output}")
+    
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+        regressions = compare(baseline, current, args.threshold, args.min_delta_ms)
+        if regressions:
+            print(f"\n{len(regressions)} case(s) regressed: {', '.join(regressions)}")
+            sys.exit(1)
@@ -0,0 +1,148 @@
+"""Seeded synthetic data for benchmarks
+
+Fills blocked_sites, focus_sessions and block_attempts with a realistic
+shape: sessions cluster in working hours and thin out on weekends, some days
+are skipped (so streaks break), most sessions complete, and attempts hit a
+few popular sites far more often than the long tail. The same seed, scale
+and end date always produce the same rows.
+
+Run from the backend directory to fill a database file:
+    python -m benchmarks.synthetic --database /tmp/focusguard.db --years 3 --attempts 2000000
+"""
+import argparse
+import itertools
+import os
+import random
+import time
+from datetime import date, datetime, timedelta, timezone
+
+BATCH = 50000
+
+POPULAR_SITES = [
+    'youtube.com', 'reddit.com', 'twitter.com', 'x.com', 'facebook.com', 'instagram.com',
+    'tiktok.com', 'netflix.com', 'twitch.tv', 'news.ycombinator.com', 'linkedin.com', 'cnn.com'
+]
+
+# (mode, planned minutes, relative frequency)
+MODES = [('pomodoro', 25, 60), ('deepwork', 90, 15), ('quick', 15, 15), ('custom', 45, 10)]
+
+def site_names(count):
+    """Popular sites first, then a generated long tail"""
+    tail = (f"distraction{i}.example.com" for i in itertools.count(1))
+    return list(itertools.islice(itertools.chain(POPULAR_SITES, tail), count))
+
+def to_utc(local):
+    """Naive local time to the naive UTC the models store"""
+    return local.astimezone(timezone.utc).replace(tzinfo=None)
+
+def session_rows(rng, seed, start, days, sessions_per_day):
+    """Yield focus_sessions rows day by day"""
+    modes = [mode for mode, _, weight in MODES for _ in range(weight)]
+    minutes = {mode: planned for mode, planned, _ in MODES}
+    number = 0
+    for offset in range(days):
+        day = start + timedelta(days=offset)
+        weekend = day.weekday() >= 5
+        # About one day in eight has no focus work at all
+        if rng.random() < (0.35 if weekend else 0.08):
+            continue
+        count = max(1, round(rng.gauss(sessions_per_day * (0.4 if weekend else 1.0), 1.5)))
+        clock = datetime.combine(day, datetime.min.time()) + timedelta(hours=rng.uniform(7.5, 10))
+        for _ in range(count):
+            mode = rng.choice(modes)
+            planned = minutes[mode]
+            completed = rng.random() < 0.82
+            done = planned if completed else round(rng.uniform(1, planned * 0.9), 2)
+            number += 1
+            yield {
+                'session_id': f"synthetic-{seed}-{number}",
+                'mode': mode,
+                'duration_minutes': planned,
+                'completed_minutes': done,
+                'completed': completed,
+                'started_at': clock,
+                'ended_at': clock + timedelta(minutes=done),
+                # Busy days can run past midnight; the app dates by start
+                'date': clock.date()
+            }
+            clock += timedelta(minutes=done + rng.uniform(3, 40))
+
+def attempt_rows(rng, start, days, sites, attempts):
+    """Yield block_attempts rows; site popularity follows a Zipf-like curve"""
+    weights = list(itertools.accumulate(1 / rank for rank in range(1, len(sites) + 1)))
+    # Converting each day's local midnight once keeps a million rows quick
+    midnights = [
+        to_utc(datetime.combine(start + timedelta(days=offset), datetime.min.time()))
+        for offset in range(days)
+    ]
+    uniform, gauss = rng.random, rng.gauss
+    for url in rng.choices(sites, cum_weights=weights, k=attempts):
+        yield {
+            'url': url,
+            'timestamp': midnights[int(uniform() * days)] + timedelta(seconds=gauss(14 * 3600, 3 * 3600) % 86400),
+            'during_session': uniform() < 0.7
+        }
+
+def insert_batches(db, table, rows):
+    """Executemany in fixed-size batches; returns the row count"""
+    total = 0
+    while True:
+        batch = list(itertools.islice(rows, BATCH))
+        if not batch:
+            return total
+        db.session.execute(table.insert(), batch)
+        total += len(batch)
+
+def generate(seed=42, years=2, sessions_per_day=6, attempts=200000, sites=200, end=None):
+    """Fill the current app's database; call inside an app context
+    
+    Rollups are rebuilt afterwards so analytics see the same data the raw
+    tables hold. Returns the row counts and parameters used.
+    """
+    from app.models import db, BlockedSite, FocusSession, BlockAttempt
+    from app.rollups import rebuild_daily_stats
+    
+    rng = random.Random(seed)
+    end = end or date.today()
+    days = round(years * 365)
+    start = end - timedelta(days=days - 1)
+    names = site_names(sites)
+    
+    db.session.execute(BlockedSite.__table__.insert(), [{
+        'url': url,
+        'category': 'synthetic',
+        'added_at': datetime(start.year, start.month, start.day),
+        'is_active': True
+    } for url in names])
+    sessions = insert_batches(db, FocusSession.__table__, session_rows(rng, seed, start, days, sessions_per_day))
+    attempts = insert_batches(db, BlockAttempt.__table__, attempt_rows(rng, start, days, names, attempts))
+    db.session.commit()
+    rebuild_daily_stats()
+    
+    return {
+        'seed': seed,
+        'start': start.isoformat(),
+        'end': end.isoformat(),
+        'sites': len(names),
+        'sessions': sessions,
+        'attempts': attempts
+    }
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--database', required=True, help='SQLite file to fill')
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--years', type=float, default=2)
+    parser.add_argument('--sessions-per-day', type=float, default=6)
+    parser.add_argument('--attempts', type=int, default=200000)
+    parser.add_argument('--sites', type=int, default=200)
+    parser.add_argument('--end', type=date.fromisoformat, help='last day (default today)')
+    args = parser.parse_args()
+    
+    os.environ['DATABASE_URL'] = f"sqlite:///{os.path.abspath(args.database)}"
+    from app import create_app
+    app = create_app('production')
+    started = time.perf_counter()
+    with app.app_context():
+        counts = generate(args.seed, args.years, args.sessions_per_day, args.attempts, args.sites, args.end)
+    print(f"{counts} in {time.perf_counter() - started:.1f}s")
@@ -0,0 +1,23 @@
+"""Gunicorn settings for serving FocusGuard with several worker processes
+
+Session state lives in the shared active_sessions table, so any worker can
+answer for any user. Use the hosts file blocking backend with more than one
+worker: the DNS sinkhole binds a fixed port that only one process can own.
+"""
+import os
+
+bind = os.environ.get('FOCUSGUARD_BIND', '127.0.0.1:5000')
+workers = int(os.environ.get('FOCUSGUARD_WORKERS', 2))
+
+# Threaded workers. Every open status stream holds a thread, so each worker
+# gets FOCUSGUARD_STREAMS threads for streams (the app refuses more) on top
+# of FOCUSGUARD_THREADS for API calls, which streams can then never starve
+worker_class = 'gthread'
+threads = int(os.environ.get('FOCUSGUARD_THREADS', 8)) + int(os.environ.get('FOCUSGUARD_STREAMS', 8))
+
+# Each worker builds its own app: scheduler and ingestion threads would not
+# survive a fork from a preloaded master
+preload_app = False
+
+timeout = 60
+graceful_timeout = 10
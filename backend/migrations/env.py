@@ -0,0 +1,44 @@
+"""Alembic environment bound to the FocusGuard app database"""
+import os
+from logging.config import fileConfig
+from alembic import context
+from app import create_database_app
+from app.models import db
+
+config = context.config
+if config.config_file_name is not None:
+    fileConfig(config.config_file_name)
+
+# Only the database: a full app would start the scheduler and listeners,
+# rewrite the hosts file and create and stamp the schema before migrating
+app = create_database_app(os.getenv('FLASK_ENV', 'development'))
+target_metadata = db.metadata
+
+def run_migrations_offline():
+    """Emit SQL for the configured database without connecting"""
+    context.configure(
+        url=app.config['SQLALCHEMY_DATABASE_URI'],
+        target_metadata=target_metadata,
+        literal_binds=True,
+        render_as_batch=True
+    )
+    with context.begin_transaction():
+        context.run_migrations()
+
+def run_migrations_online():
+    """Run migrations against the app's engine"""
+    with app.app_context():
+        with db.engine.connect() as connection:
+            # SQLite cannot ALTER most things in place; batch mode rebuilds tables
+            context.configure(
+                connection=connection,
+                target_metadata=target_metadata,
+                render_as_batch=True
+            )
+            with context.begin_transaction():
+                context.run_migrations()
+
+if context.is_offline_mode():
+    run_migrations_offline()
+else:
+    run_migrations_online()
@@ -0,0 +1,84 @@
+"""Baseline schema as created by db.create_all()
+
+Revision ID: 0001
+Revises:
+Create Date: 2026-10-18
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = '0001'
+down_revision = None
+branch_labels = None
+depends_on = None
+
+def upgrade():
+    # Databases created by earlier releases already have these tables
+    existing = set(sa.inspect(op.get_bind()).get_table_names())
+    
+    if 'focus_sessions' not in existing:
+        op.create_table(
+            'focus_sessions',
+            sa.Column('id', sa.Integer(), primary_key=True),
+            sa.Column('session_id', sa.String(50), nullable=False, unique=True),
+            sa.Column('mode', sa.String(20), nullable=False),
+            sa.Column('duration_minutes', sa.Float(), nullable=False),
+            sa.Column('completed_minutes', sa.Float(), nullable=False),
+            sa.Column('completed', sa.Boolean()),
+            sa.Column('started_at', sa.DateTime(), nullable=False),
+            sa.Column('ended_at', sa.DateTime()),
+            sa.Column('date', sa.String(10))
+        )
+    
+    if 'daily_stats' not in existing:
+        op.create_table(
+            'daily_stats',
+            sa.Column('date', sa.String(10), primary_key=True),
+            sa.Column('sessions', sa.Integer(), nullable=False),
+            sa.Column('completed_sessions', sa.Integer(), nullable=False),
+            sa.Column('minutes', sa.Float(), nullable=False),
+            sa.Column('block_attempts', sa.Integer(), nullable=False)
+        )
+    
+    if 'streak_state' not in existing:
+        op.create_table(
+            'streak_state',
+            sa.Column('id', sa.Integer(), primary_key=True),
+            sa.Column('current', sa.Integer(), nullable=False),
+            sa.Column('best', sa.Integer(), nullable=False),
+            sa.Column('last_date', sa.String(10)),
+            sa.Column('total', sa.Integer(), nullable=False)
+        )
+    
+    if 'blocked_sites' not in existing:
+        op.create_table(
+            'blocked_sites',
+            sa.Column('id', sa.Integer(), primary_key=True),
+            sa.Column('url', sa.String(255), nullable=False, unique=True),
+            sa.Column('category', sa.String(50)),
+            sa.Column('added_at', sa.DateTime()),
+            sa.Column('is_active', sa.Boolean())
+        )
+    
+    if 'block_attempts' not in existing:
+        op.create_table(
+            'block_attempts',
+            sa.Column('id', sa.Integer(), primary_key=True),
+            sa.Column('url', sa.String(255), nullable=False),
+            sa.Column('timestamp', sa.DateTime()),
+            sa.Column('during_session', sa.Boolean())
+        )
+    
+    if 'settings' not in existing:
+        op.create_table(
+            'settings',
+            sa.Column('id', sa.Integer(), primary_key=True),
+            sa.Column('key', sa.String(50), nullable=False, unique=True),
+            sa.Column('value', sa.String(255), nullable=False),
+            sa.Column('updated_at', sa.DateTime())
+        )
+
+def downgrade():
+    for table in ['settings', 'block_attempts', 'blocked_sites',
+                  'streak_state', 'daily_stats', 'focus_sessions']:
+        op.drop_table(table)
@@ -0,0 +1,48 @@
+"""Typed date columns and indexes for analytics queries
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-18
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = '0002'
+down_revision = '0001'
+branch_labels = None
+depends_on = None
+
+INDEXES = [
+    ('ix_focus_sessions_date_completed', 'focus_sessions', ['date', 'completed']),
+    ('ix_focus_sessions_started_at', 'focus_sessions', ['started_at']),
+    ('ix_block_attempts_timestamp', 'block_attempts', ['timestamp']),
+]
+
+def _existing_indexes(table):
+    return {index['name'] for index in sa.inspect(op.get_bind()).get_indexes(table)}
+
+def _alter_date_columns(to_type, from_type):
+    # SQLite stores Date values as ISO 'YYYY-MM-DD' text, exactly what the
+    # String(10) columns already hold, so only the model type changes there.
+    # Rebuilding the tables in batch mode would also drop the unnamed UNIQUE
+    # constraints created by db.create_all().
+    if op.get_bind().dialect.name == 'sqlite':
+        return
+    op.alter_column('focus_sessions', 'date', type_=to_type, existing_type=from_type)
+    op.alter_column('daily_stats', 'date', type_=to_type, existing_type=from_type,
+                    existing_nullable=False)
+    op.alter_column('streak_state', 'last_date', type_=to_type, existing_type=from_type)
+
+def upgrade():
+    _alter_date_columns(sa.Date(), sa.String(10))
+    
+    for name, table, columns in INDEXES:
+        if name not in _existing_indexes(table):
+            op.create_index(name, table, columns)
+
+def downgrade():
+    for name, table, columns in INDEXES:
+        if name in _existing_indexes(table):
+            op.drop_index(name, table_name=table)
+    
+    _alter_date_columns(sa.String(10), sa.Date())
@@ -0,0 +1,32 @@
+"""Blocklist file subscriptions
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2026-10-18
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = '0003'
+down_revision = '0002'
+branch_labels = None
+depends_on = None
+
+def upgrade():
+    # db.create_all() may already have created it on app start
+    if 'blocklist_subscriptions' in sa.inspect(op.get_bind()).get_table_names():
+        return
+    
+    op.create_table(
+        'blocklist_subscriptions',
+        sa.Column('id', sa.Integer(), primary_key=True),
+        sa.Column('name', sa.String(40), nullable=False, unique=True),
+        sa.Column('path', sa.String(1024), nullable=False),
+        sa.Column('content_hash', sa.String(64)),
+        sa.Column('rule_count', sa.Integer()),
+        sa.Column('added_at', sa.DateTime()),
+        sa.Column('synced_at', sa.DateTime())
+    )
+
+def downgrade():
+    op.drop_table('blocklist_subscriptions')
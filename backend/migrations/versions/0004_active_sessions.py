@@ -0,0 +1,31 @@
+"""Active sessions shared between worker processes
+
+Revision ID: 0004
+Revises: 0003
+Create Date: 2026-10-18
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = '0004'
+down_revision = '0003'
+branch_labels = None
+depends_on = None
+
+def upgrade():
+    # db.create_all() may already have created it on app start
+    if 'active_sessions' in sa.inspect(op.get_bind()).get_table_names():
+        return
+    
+    op.create_table(
+        'active_sessions',
+        sa.Column('user_id', sa.String(64), primary_key=True),
+        sa.Column('session_id', sa.String(50), nullable=False, unique=True),
+        sa.Column('mode', sa.String(20), nullable=False),
+        sa.Column('duration_seconds', sa.Float(), nullable=False),
+        sa.Column('started_at', sa.DateTime(), nullable=False),
+        sa.Column('deadline', sa.Float(), nullable=False)
+    )
+
+def downgrade():
+    op.drop_table('active_sessions')
@@ -0,0 +1,32 @@
+"""Hourly and per-mode session rollup for insights
+
+Revision ID: 0005
+Revises: 0004
+Create Date: 2026-10-18
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = '0005'
+down_revision = '0004'
+branch_labels = None
+depends_on = None
+
+def upgrade():
+    # db.create_all() may already have created it on app start; the app
+    # fills it from focus_sessions on its next start either way
+    if 'hourly_stats' in sa.inspect(op.get_bind()).get_table_names():
+        return
+    
+    op.create_table(
+        'hourly_stats',
+        sa.Column('date', sa.Date(), primary_key=True),
+        sa.Column('hour', sa.Integer(), primary_key=True),
+        sa.Column('mode', sa.String(20), primary_key=True),
+        sa.Column('sessions', sa.Integer(), nullable=False),
+        sa.Column('completed_sessions', sa.Integer(), nullable=False),
+        sa.Column('minutes', sa.Float(), nullable=False)
+    )
+
+def downgrade():
+    op.drop_table('hourly_stats')
@@ -0,0 +1,60 @@
+"""Blocklist line parsing for hosts, adblock and plain lists"""
+import pytest
+
+from app.blocklist import parse_blocklist, parse_line
+
+@pytest.mark.parametrize('line, wildcards, rules', [
+    ('||example.com^', True, ['example.com', '*.example.com']),
+    ('||example.com^', False, ['example.com']),
+    ('||Example.COM^|', True, ['example.com', '*.example.com']),
+    ('||example.com', False, ['example.com']),
+    ('@@||m.example.com^', True, ['@@m.example.com']),
+    ('@@||m.example.com^', False, ['@@m.example.com']),
+])
+def test_adblock_domain_rules(line, wildcards, rules):
+    assert parse_line(line, wildcards) == rules
+
+@pytest.mark.parametrize('line', [
+    '||example.com/ads^',
+    '||example.com^$third-party',
+    '|https://example.com/',
+    '/banner/*',
+])
+def test_adblock_rules_narrower_than_a_domain_are_skipped(line):
+    assert parse_line(line, wildcards=True) == []
+
+@pytest.mark.parametrize('line', [
+    'example.com##.ad-banner',
+    '##.sponsored',
+    'example.com#@#.ad',
+    'example.com#?#div:has(> .ad)',
+    'example.com#$#body { overflow: auto }',
+])
+def test_cosmetic_rules_are_skipped(line):
+    assert parse_line(line, wildcards=True) == []
+
+@pytest.mark.parametrize('line', [
+    '',
+    '   ',
+    '# hosts comment',
+    '! adblock comment',
+    '[Adblock Plus 2.0]',
+])
+def test_comments_and_headers_are_skipped(line):
+    assert parse_line(line) == []
+
+@pytest.mark.parametrize('line, rules', [
+    ('0.0.0.0 ads.example.com', ['ads.example.com']),
+    ('127.0.0.1\tTracker.Example.com  # inline comment', ['tracker.example.com']),
+    ('::1 a.example.com b.example.com', ['a.example.com', 'b.example.com']),
+    ('example.com', ['example.com']),
+    ('*.example.com', ['*.example.com']),
+    ('@@M.example.com', ['@@m.example.com']),
+])
+def test_hosts_and_plain_lines(line, rules):
+    assert parse_line(line) == rules
+
+def test_parse_blocklist_chains_lines():
+    lines = ['! Title: test', '||a.com^', 'b.com##.ad', '0.0.0.0 c.com', '@@||d.com^']
+    assert list(parse_blocklist(lines)) == ['a.com', 'c.com', '@@d.com']
+    assert list(parse_blocklist(lines, wildcards=True)) == ['a.com', '*.a.com', 'c.com', '@@d.com']
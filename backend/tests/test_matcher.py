@@ -0,0 +1,56 @@
+"""DomainMatcher rule semantics"""
+import pytest
+
+from app.matcher import DomainMatcher
+
+def test_exact_rule_does_not_cover_subdomains():
+    matcher = DomainMatcher(['example.com'])
+    assert matcher.match('example.com') == 'example.com'
+    assert matcher.match('www.example.com') is None
+    assert matcher.match('notexample.com') is None
+
+def test_wildcard_covers_subdomains_but_not_the_domain_itself():
+    matcher = DomainMatcher(['*.example.com'])
+    assert matcher.match('example.com') is None
+    assert matcher.match('www.example.com') == '*.example.com'
+    assert matcher.match('a.b.example.com') == '*.example.com'
+    assert matcher.match('example.org') is None
+
+def test_domain_and_wildcard_together():
+    matcher = DomainMatcher(['example.com', '*.example.com'])
+    assert matcher.match('example.com') == 'example.com'
+    assert matcher.match('mail.example.com') == '*.example.com'
+
+def test_closest_wildcard_wins():
+    matcher = DomainMatcher(['*.example.com', '*.cdn.example.com'])
+    assert matcher.match('img.cdn.example.com') == '*.cdn.example.com'
+    assert matcher.match('www.example.com') == '*.example.com'
+
+def test_exception_under_blocked_parent():
+    matcher = DomainMatcher(['example.com', '*.example.com', '@@m.example.com'])
+    assert matcher.match('m.example.com') is None
+    assert matcher.match('www.example.com') == '*.example.com'
+    assert matcher.match('example.com') == 'example.com'
+    # Exceptions are exact: hosts below the excepted name stay blocked
+    assert matcher.match('a.m.example.com') == '*.example.com'
+
+@pytest.mark.parametrize('host', [
+    'www.example.com', 'WWW.Example.COM', 'www.example.com.', 'Www.Example.Com.'
+])
+def test_hosts_are_normalised(host):
+    assert DomainMatcher(['*.example.com']).match(host) == '*.example.com'
+
+def test_rules_are_normalised():
+    matcher = DomainMatcher([' Example.COM. ', '*.Example.com', '@@M.EXAMPLE.COM.'])
+    assert 'example.com' in matcher
+    assert 'www.example.com' in matcher
+    assert 'm.example.com' not in matcher
+
+@pytest.mark.parametrize('rule', ['', '*.', '@@', 'ads.*.example.com', '**.example.com'])
+def test_invalid_rules_raise(rule):
+    with pytest.raises(ValueError):
+        DomainMatcher([rule])
+
+def test_hosts_entries_fall_back_to_www_and_skip_exceptions():
+    matcher = DomainMatcher(['example.com', '*.example.com', '*.other.com', '@@www.other.com'])
+    assert matcher.hosts_entries() == ['example.com', 'www.example.com']
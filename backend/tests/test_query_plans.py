@@ -0,0 +1,97 @@
+"""Query plans of the hot analytics and archive queries use their indexes
+
+Runs the real code paths against a small SQLite database, records every
+SELECT they issue and checks EXPLAIN QUERY PLAN for each. The timings at
+scale live in benchmarks/bench_indexes.py.
+
+Run from the backend directory:
+    python -m pytest -q
+"""
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy import event
+
+from app import create_database_app
+from app.analytics import AnalyticsService, encode_cursor
+from app.archive import Archive, archive_rows
+from app.models import db, FocusSession, BlockAttempt
+
+@pytest.fixture
+def app(tmp_path):
+    app = create_database_app('production', f"sqlite:///{tmp_path / 'focusguard.db'}")
+    with app.app_context():
+        db.create_all()
+        now = datetime.now()
+        for days_ago in (0, 1, 2, 800):
+            started = now - timedelta(days=days_ago)
+            db.session.add(FocusSession(
+                session_id=f'session-{days_ago}',
+                mode='pomodoro',
+                duration_minutes=25,
+                completed_minutes=25,
+                completed=True,
+                started_at=started,
+                ended_at=started + timedelta(minutes=25),
+                date=started.date()
+            ))
+            db.session.add(BlockAttempt(url='youtube.com', timestamp=started))
+        db.session.commit()
+        yield app
+        db.session.remove()
+        db.engine.dispose()
+
+def query_plans(call):
+    """{SELECT statement: plan} for every query call() runs"""
+    statements = []
+    
+    def record(conn, cursor, statement, parameters, context, executemany):
+        if statement.lstrip().upper().startswith('SELECT'):
+            statements.append((statement, parameters))
+    
+    event.listen(db.engine, 'before_cursor_execute', record)
+    try:
+        call()
+    finally:
+        event.remove(db.engine, 'before_cursor_execute', record)
+    
+    assert statements, 'no queries recorded'
+    connection = db.session.connection()
+    return {
+        statement: ' | '.join(row[-1] for row in connection.exec_driver_sql(
+            f"EXPLAIN QUERY PLAN {statement}", parameters
+        ))
+        for statement, parameters in statements
+    }
+
+def test_history_pages_use_started_at_index(app):
+    with app.app_context():
+        def pages():
+            first = AnalyticsService.get_session_history(2)
+            AnalyticsService.get_session_history(2, encode_cursor(first[-1]))
+        
+        for statement, plan in query_plans(pages).items():
+            assert 'ix_focus_sessions_started_at' in plan, (statement, plan)
+
+@pytest.mark.parametrize('call', [
+    lambda: AnalyticsService.get_overview(7),
+    lambda: AnalyticsService.get_daily_stats(30),
+    lambda: AnalyticsService.get_insights(90)
+], ids=['overview', 'daily', 'insights'])
+def test_rollup_windows_search_by_date(app, call):
+    with app.app_context():
+        for statement, plan in query_plans(call).items():
+            assert 'SCAN' not in plan.replace('SCAN CONSTANT ROW', ''), (statement, plan)
+
+def test_data_version_seeks_newest_ids(app):
+    with app.app_context():
+        plan, = query_plans(AnalyticsService.data_version).values()
+        assert 'SEARCH focus_sessions' in plan and 'SEARCH block_attempts' in plan, plan
+
+def test_archive_selects_months_by_time_index(app, tmp_path):
+    with app.app_context():
+        cutoff = datetime.now() - timedelta(days=365)
+        plans = query_plans(lambda: archive_rows(Archive(str(tmp_path / 'archive')), cutoff))
+        for statement, plan in plans.items():
+            index = 'ix_block_attempts_timestamp' if 'block_attempts' in statement else 'ix_focus_sessions_started_at'
+            assert index in plan, (statement, plan)
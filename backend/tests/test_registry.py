@@ -0,0 +1,159 @@
+"""Session registries in different worker processes sharing one store
+
+Each SessionRegistry stands in for a worker; they share an active_sessions
+table, as gunicorn workers do. A manual scheduler fires minute and
+deadline callbacks on demand.
+"""
+import queue
+
+import pytest
+
+from app import create_database_app
+from app.models import db
+from app.registry import SessionRegistry
+from app.session_store import SessionStore
+
+USER = 'default'
+
+class ManualClock:
+    """time.monotonic stand-in that only moves when told to"""
+    
+    def __init__(self):
+        self.now = 1000.0
+    
+    def __call__(self):
+        return self.now
+
+class ManualScheduler:
+    """TimerScheduler stand-in; run_all() fires calls in deadline order,
+    moving the clock to each deadline first
+    """
+    
+    def __init__(self, clock):
+        self.clock = clock
+        self.calls = []
+    
+    def schedule(self, deadline, callback):
+        call = [deadline, callback, False]
+        self.calls.append(call)
+        return call
+    
+    def cancel(self, call):
+        call[2] = True
+    
+    def run_all(self):
+        """Fire every pending call, including ones scheduled meanwhile"""
+        while True:
+            pending = [call for call in self.calls if not call[2]]
+            if not pending:
+                return
+            call = min(pending, key=lambda call: call[0])
+            call[2] = True
+            self.clock.now = max(self.clock.now, call[0])
+            call[1]()
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = ManualClock()
+    monkeypatch.setattr('app.timer.time.monotonic', clock)
+    return clock
+
+@pytest.fixture
+def store(tmp_path):
+    app = create_database_app('production', f"sqlite:///{tmp_path / 'focusguard.db'}")
+    with app.app_context():
+        db.create_all()
+        engine = db.engine
+    yield SessionStore(engine)
+    engine.dispose()
+
+def worker(store, clock):
+    """(registry, scheduler, completed results) for one simulated worker"""
+    scheduler = ManualScheduler(clock)
+    registry = SessionRegistry(None, scheduler, store=store)
+    completed = []
+    registry.on_complete = completed.append
+    return registry, scheduler, completed
+
+def drain(events):
+    """Reasons and activity of every event queued for a subscriber"""
+    seen = []
+    while True:
+        try:
+            _, data = events.get_nowait()
+        except queue.Empty:
+            return seen
+        seen.append((data['reason'], data['is_active']))
+
+def test_stop_in_other_worker_cancels_local_timer_at_next_tick(store, clock):
+    a, a_scheduler, a_completed = worker(store, clock)
+    b, _, _ = worker(store, clock)
+    
+    assert 'error' not in a.start_session(USER, 25)
+    events = a.get(USER).events.subscribe()
+    assert 'error' not in b.stop_session(USER)
+    
+    # Minute boundaries and the old deadline all come due
+    a_scheduler.run_all()
+    
+    assert not a.get(USER).is_active
+    assert a_completed == []
+    assert drain(events) == [('stop', False)]
+    assert a.get_status(USER)['is_active'] is False
+
+def test_status_read_drops_timer_of_session_stopped_elsewhere(store, clock):
+    a, a_scheduler, a_completed = worker(store, clock)
+    b, _, _ = worker(store, clock)
+    
+    a.start_session(USER, 25)
+    events = a.get(USER).events.subscribe()
+    b.stop_session(USER)
+    
+    assert a.get_status(USER)['is_active'] is False
+    assert not a.get(USER).is_active
+    assert drain(events) == [('stop', False)]
+    a_scheduler.run_all()
+    assert a_completed == []
+
+def test_recovered_timers_stand_down_after_stop_elsewhere(store, clock):
+    a, _, _ = worker(store, clock)
+    a.start_session(USER, 25)
+    
+    # Every worker resumes the stored session after a restart
+    b, b_scheduler, b_completed = worker(store, clock)
+    c, c_scheduler, c_completed = worker(store, clock)
+    assert b.recover() == [] and c.recover() == []
+    assert b.get(USER).is_active and c.get(USER).is_active
+    
+    result = b.stop_session(USER)
+    assert 'error' not in result
+    b_scheduler.run_all()
+    c_scheduler.run_all()
+    
+    assert not c.get(USER).is_active
+    assert b_completed == [] and c_completed == []
+
+def test_deadline_completes_once_in_the_owning_worker(store, clock):
+    a, a_scheduler, a_completed = worker(store, clock)
+    b, b_scheduler, b_completed = worker(store, clock)
+    
+    a.start_session(USER, 25)
+    b.recover()
+    events = a.get(USER).events.subscribe()
+    a_scheduler.run_all()
+    b_scheduler.run_all()
+    
+    assert len(a_completed) + len(b_completed) == 1
+    assert a.get_status(USER)['is_active'] is False
+    reasons = drain(events)
+    assert reasons[-1] in (('complete', False), ('stop', False))
+    assert ('minute', True) in reasons
+
+def test_start_is_announced_after_the_store_holds_it(store, clock):
+    a, _, _ = worker(store, clock)
+    events = a.get(USER).events.subscribe()
+    
+    a.start_session(USER, 25)
+    
+    assert drain(events) == [('start', True)]
+    assert a.get_status(USER)['is_active'] is True
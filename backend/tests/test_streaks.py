@@ -0,0 +1,79 @@
+"""The running streak row agrees with a full rebuild from the daily rollup
+
+record_completed_day advances the streak one completed session at a time;
+rebuild_streaks recounts it from daily_stats. Whatever order sessions
+finish in, both must end up with the same row.
+"""
+from datetime import date, datetime, time, timedelta
+
+import pytest
+
+from app import create_database_app
+from app.models import db, FocusSession
+from app.rollups import get_streak_state, rebuild_streaks, record_session
+
+START = date(2026, 3, 2)
+
+@pytest.fixture
+def app(tmp_path):
+    app = create_database_app('production', f"sqlite:///{tmp_path / 'focusguard.db'}")
+    with app.app_context():
+        db.create_all()
+        yield app
+        db.session.remove()
+        db.engine.dispose()
+
+def finish(offset, completed=True):
+    """Record one 25 minute session on START + offset days, as finalize does"""
+    day = START + timedelta(days=offset)
+    started = datetime.combine(day, time(9))
+    session = FocusSession(
+        session_id=f'session-{FocusSession.query.count()}',
+        mode='pomodoro',
+        duration_minutes=25,
+        completed_minutes=25 if completed else 10,
+        completed=completed,
+        started_at=started,
+        ended_at=started + timedelta(minutes=25),
+        date=day
+    )
+    db.session.add(session)
+    record_session(session)
+    db.session.commit()
+
+def streak():
+    state = get_streak_state()
+    return state.current, state.best, state.total, state.last_date
+
+def assert_matches_rebuild():
+    incremental = streak()
+    rebuild_streaks()
+    assert streak() == incremental
+    return incremental
+
+def test_days_in_order(app):
+    with app.app_context():
+        for offset in (0, 0, 1, 2):
+            finish(offset)
+        finish(3, completed=False)
+        assert assert_matches_rebuild() == (3, 3, 4, START + timedelta(days=2))
+
+def test_gap_restarts_current_and_keeps_best(app):
+    with app.app_context():
+        for offset in (0, 1, 2, 5, 6):
+            finish(offset)
+        assert assert_matches_rebuild() == (2, 3, 5, START + timedelta(days=6))
+
+@pytest.mark.parametrize('offsets', [
+    (5, 6, 3),        # before the current run, leaving a gap
+    (5, 6, 4),        # just before the current run, joining it
+    (0, 1, 5, 6, 4),  # bridging two runs into a new best
+    (5, 6, 5),        # inside the current run
+    (6, 0)            # long before everything
+], ids=['gap-before-run', 'joins-run', 'bridges-runs', 'inside-run', 'far-back'])
+def test_late_days(app, offsets):
+    with app.app_context():
+        for offset in offsets:
+            finish(offset)
+        state = assert_matches_rebuild()
+        assert state[2] == len(offsets)
@@ -14,15 +14,11 @@ export default function Analytics() {
 
   const fetchAnalytics = async () => {
     try {
-      const [overviewRes, dailyRes, streaksRes] = await Promise.all([
-        analyticsAPI.getOverview(7),
-        analyticsAPI.getDaily(7),
-        analyticsAPI.getStreaks(),
-      ]);
+      const { data } = await analyticsAPI.getDashboard(7);
       
-      setOverview(overviewRes.data.data);
-      setDaily(dailyRes.data.data);
-      setStreaks(streaksRes.data);
+      setOverview(data.overview);
+      setDaily(data.daily);
+      setStreaks(data.streaks);
     } catch (error) {
       console.error('Error fetching analytics:', error);
     }
@@ -1,4 +1,4 @@
-import { useState, useEffect } from 'react';
+import { useState, useEffect, useRef } from 'react';
 import { Play, Pause, Square } from 'lucide-react';
 import { focusAPI } from '../services/api';
 
@@ -7,6 +7,7 @@ export default function Timer({ onSessionComplete }) {
   const [timeRemaining, setTimeRemaining] = useState(0);
   const [duration, setDuration] = useState(0);
   const [selectedDuration, setSelectedDuration] = useState(25);
+  const [deadline, setDeadline] = useState(null);
 
   const durations = [
     { label: 'Pomodoro', value: 25, mode: 'pomodoro' },
@@ -14,29 +15,64 @@ export default function Timer({ onSessionComplete }) {
     { label: 'Deep Work', value: 90, mode: 'deepwork' },
   ];
 
+  const completeRef = useRef(onSessionComplete);
+  completeRef.current = onSessionComplete;
+
+  // Status changes are pushed by the server; the countdown runs locally
   useEffect(() => {
-    let interval;
-    if (isActive) {
-      interval = setInterval(async () => {
-        try {
-          const { data } = await focusAPI.getStatus();
-          if (data.is_active) {
-            setTimeRemaining(data.time_remaining);
-            if (data.time_remaining <= 0) {
-              handleStop(true);
-            }
-          }
-        } catch (error) {
-          console.error('Error fetching status:', error);
+    let poll = null;
+    const applyStatus = (status) => {
+      if (status.is_active) {
+        const clockOffset = status.server_time_ms - Date.now();
+        setDeadline(status.deadline_ms - clockOffset);
+        setDuration(status.duration_seconds);
+        setIsActive(true);
+      } else {
+        setIsActive(false);
+        setDeadline(null);
+        setTimeRemaining(0);
+        if (status.reason === 'complete' && completeRef.current) {
+          completeRef.current();
         }
-      }, 1000);
+      }
+    };
+    const source = focusAPI.stream();
+    source.addEventListener('status', (event) => applyStatus(JSON.parse(event.data)));
+    // A server at its stream limit refuses the stream; poll instead
+    source.onerror = () => {
+      if (source.readyState === EventSource.CLOSED && poll === null) {
+        poll = setInterval(async () => {
+          try {
+            const { data } = await focusAPI.getStatus();
+            applyStatus(data);
+          } catch (error) {
+            console.error('Error fetching status:', error);
+          }
+        }, 5000);
+      }
+    };
+    return () => {
+      source.close();
+      clearInterval(poll);
+    };
+  }, []);
+
+  useEffect(() => {
+    let interval;
+    if (isActive && deadline !== null) {
+      const tick = () => {
+        setTimeRemaining(Math.max(0, Math.round((deadline - Date.now()) / 1000)));
+      };
+      tick();
+      interval = setInterval(tick, 1000);
     }
     return () => clearInterval(interval);
-  }, [isActive]);
+  }, [isActive, deadline]);
 
   const handleStart = async (mins, mode) => {
     try {
       const { data } = await focusAPI.start(mins, mode);
+      setDeadline(Date.now() + mins * 60 * 1000);
       setIsActive(true);
       setDuration(mins * 60);
       setTimeRemaining(mins * 60);
@@ -51,6 +87,7 @@ export default function Timer({ onSessionComplete }) {
     try {
       await focusAPI.stop(completed);
       setIsActive(false);
+      setDeadline(null);
       setTimeRemaining(0);
       if (completed && onSessionComplete) {
         onSessionComplete();
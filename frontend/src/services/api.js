@@ -17,6 +17,8 @@ export const focusAPI = {
     api.post('/focus/stop', { completed }),
   getStatus: () => 
     api.get('/focus/status'),
+  stream: () => 
+    new EventSource(`${API_BASE}/focus/stream`),
 };
 
 // Blocklist API
@@ -39,8 +41,12 @@ export const analyticsAPI = {
     api.get(`/analytics/daily?days=${days}`),
   getStreaks: () => 
     api.get('/analytics/streaks'),
-  getHistory: (limit = 50) => 
-    api.get(`/analytics/history?limit=${limit}`),
+  getHistory: (limit = 50, cursor = null) => 
+    api.get('/analytics/history', { params: { limit, cursor } }),
+  exportUrl: (format = 'ndjson') => 
+    `${API_BASE}/analytics/export?format=${format}`,
+  getDashboard: (days = 7, limit = 10) => 
+    api.get(`/analytics/dashboard?days=${days}&limit=${limit}`),
 };
 
 export default api;